@@ -0,0 +1,177 @@
+"""Benchmark a full BookingSpider crawl against replayed responses.
+
+Bookings from ``bookings.csv`` are written out as recorded Lighthouse
+responses, then the spider crawls them through ``ReplayMiddleware`` with no
+download delay and no network access. Results are printed as JSON and can be
+compared against a saved baseline. Run from the repository root with
+``python -m benchmarks.bench_crawl``.
+"""
+
+import argparse
+import json
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from scrapy.crawler import CrawlerProcess
+from scrapy.utils.project import get_project_settings
+
+from sheriffwebsites.middlewares.replay import load_bookings_csv, write_recordings
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def scale_rows(rows: list[dict[str, str]], scale: int) -> list[dict[str, str]]:
+    """Repeat rows with unique booking IDs.
+
+    Parameters
+    ----------
+    rows : list[dict[str, str]]
+        The exported rows.
+    scale : int
+        How many copies of each row to make.
+
+    Returns
+    -------
+    list[dict[str, str]]
+        The scaled rows.
+    """
+    return [
+        row | {"booking_id": f"{row['booking_id']}{copy:04d}"}
+        for copy in range(scale)
+        for row in rows
+    ]
+
+
+def run_crawl(replay_dir: Path, output_dir: Path) -> dict[str, Any]:
+    """Crawl the replayed responses and collect measurements.
+
+    Parameters
+    ----------
+    replay_dir : Path
+        The replay directory.
+    output_dir : Path
+        Where to write the feed blobs and county stats.
+
+    Returns
+    -------
+    dict[str, Any]
+        The measurements.
+    """
+    stats_file = output_dir / "county_stats.json"
+    settings = get_project_settings()
+    settings.setdict(
+        {
+            "REPLAY_DIR": str(replay_dir),
+            "DOWNLOAD_DELAY": 0,
+            "CONCURRENT_REQUESTS_PER_IP": 0,
+            "CONCURRENT_REQUESTS_PER_DOMAIN": 1,
+            "COUNTY_STATS_FILE": str(stats_file),
+            # Keep replayed crawls out of the project's site cache.
+            "SITE_CACHE_FILE": str(output_dir / "sitecache.json"),
+            # Export through the az:// storage, backed by a local directory.
+            "FEEDS": {
+                "az://bench/bookings.csv": {
+                    "format": "csv",
+                    "item_classes": ["sheriffwebsites.items.BookingItem"],
+                    "local_dir": str(output_dir / "blobs"),
+                }
+            },
+            "LOG_LEVEL": "WARNING",
+            "TELNETCONSOLE_ENABLED": False,
+        }
+    )
+    process = CrawlerProcess(settings)
+    crawler = process.create_crawler("sheriffwebsites")
+    process.crawl(crawler)
+    started = time.perf_counter()
+    process.start()
+    elapsed = time.perf_counter() - started
+    county_stats = json.loads(stats_file.read_text())
+    assert crawler.stats
+    items = crawler.stats.get_value("item_scraped_count", 0)
+    return {
+        "items": items,
+        "seconds": elapsed,
+        "items_per_second": items / elapsed,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "decode_seconds": sum(c["decode_time"] for c in county_stats.values()),
+        "validate_seconds": sum(c["validate_time"] for c in county_stats.values()),
+        "pages": sum(c["pages"] for c in county_stats.values()),
+        "details": sum(c["details"] for c in county_stats.values()),
+    }
+
+
+def find_regressions(
+    results: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """Compare results to a baseline.
+
+    Parameters
+    ----------
+    results : dict[str, Any]
+        The current measurements.
+    baseline : dict[str, Any]
+        The baseline measurements.
+    tolerance : float
+        The allowed relative slowdown, e.g. 0.1 for 10%.
+
+    Returns
+    -------
+    list[str]
+        A description of each regression.
+    """
+    regressions = []
+    if results["items_per_second"] < baseline["items_per_second"] * (1 - tolerance):
+        regressions.append(
+            f"items_per_second {results['items_per_second']:.1f} < "
+            f"baseline {baseline['items_per_second']:.1f}"
+        )
+    if results["peak_rss_mb"] > baseline["peak_rss_mb"] * (1 + tolerance):
+        regressions.append(
+            f"peak_rss_mb {results['peak_rss_mb']:.1f} > "
+            f"baseline {baseline['peak_rss_mb']:.1f}"
+        )
+    return regressions
+
+
+def main() -> int:
+    """Run the benchmark.
+
+    Returns
+    -------
+    int
+        The exit status.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--csv", type=Path, default=ROOT / "bookings.csv")
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--save", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        replay_dir = Path(tmp) / "replay"
+        rows = scale_rows(load_bookings_csv(args.csv), args.scale)
+        write_recordings(rows, replay_dir)
+        results = run_crawl(replay_dir, Path(tmp))
+
+    print(json.dumps(results, indent=2))
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        regressions = find_regressions(
+            results, json.loads(args.baseline.read_text()), args.tolerance
+        )
+        for regression in regressions:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
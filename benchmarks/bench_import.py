@@ -0,0 +1,138 @@
+"""Benchmark the cold-start import time of the crawl entry point.
+
+Each run imports the spider in a fresh interpreter with ``-X importtime``,
+so module caches never carry over. The median wall time and the slowest
+imports are printed as JSON. Run from the repository root with
+``python -m benchmarks.bench_import``.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any
+
+DEFAULT_MODULE = "sheriffwebsites.spiders.bookings"
+
+# Cold-start budget, in seconds, for importing the spider. The project's own
+# modules should stay a small share of it; most of it is Scrapy and Twisted.
+DEFAULT_TARGET = 1.0
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[int, int]]:
+    """Parse ``-X importtime`` output.
+
+    Parameters
+    ----------
+    stderr : str
+        The interpreter's standard error.
+
+    Returns
+    -------
+    dict[str, tuple[int, int]]
+        The self and cumulative microseconds for each module.
+    """
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def time_import(module: str) -> tuple[float, dict[str, tuple[int, int]]]:
+    """Import a module in a fresh interpreter.
+
+    Parameters
+    ----------
+    module : str
+        The module to import.
+
+    Returns
+    -------
+    tuple[float, dict[str, tuple[int, int]]]
+        The wall time in seconds, including interpreter startup, and the
+        per-module import times.
+    """
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return time.perf_counter() - started, parse_importtime(completed.stderr)
+
+
+def summarize(module: str, runs: int, top: int) -> dict[str, Any]:
+    """Time repeated cold imports.
+
+    Parameters
+    ----------
+    module : str
+        The module to import.
+    runs : int
+        The number of fresh interpreters to time.
+    top : int
+        How many of the slowest project and third-party imports to report.
+
+    Returns
+    -------
+    dict[str, Any]
+        The measurements.
+    """
+    walls = []
+    for _ in range(runs):
+        wall, times = time_import(module)
+        walls.append(wall)
+    project_us = sum(
+        self_us
+        for name, (self_us, _) in times.items()
+        if name.split(".")[0] == "sheriffwebsites"
+    )
+    slowest = sorted(times.items(), key=lambda item: item[1][0], reverse=True)
+    return {
+        "module": module,
+        "runs": runs,
+        "median_seconds": statistics.median(walls),
+        "min_seconds": min(walls),
+        "import_seconds": times[module][1] / 1e6,
+        "project_self_seconds": project_us / 1e6,
+        "slowest_self_ms": {
+            name: self_us / 1e3 for name, (self_us, _) in slowest[:top]
+        },
+    }
+
+
+def main() -> int:
+    """Run the benchmark.
+
+    Returns
+    -------
+    int
+        The exit status.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default=DEFAULT_MODULE)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--target", type=float, default=DEFAULT_TARGET)
+    args = parser.parse_args()
+
+    results = summarize(args.module, args.runs, args.top)
+    print(json.dumps(results, indent=2))
+    if results["median_seconds"] > args.target:
+        print(
+            f"REGRESSION: median cold start {results['median_seconds']:.3f}s > "
+            f"target {args.target:.3f}s",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""Microbenchmarks for the per-item hot path.
+
+Run with ``nox -s microbenchmark``, which saves each run and fails if the
+mean time of any benchmark regresses past the configured threshold.
+"""
+
+import io
+from pathlib import Path
+
+import pytest
+from scrapy.exporters import CsvItemExporter
+
+from sheriffwebsites.exporters import BookingCsvItemExporter
+from sheriffwebsites.items import BookingItem
+from sheriffwebsites.middlewares.replay import load_bookings_csv, to_lighthouse
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="module")
+def lighthouse_rows() -> list[dict[str, str]]:
+    """Load bookings.csv as raw Lighthouse records."""
+    return [
+        to_lighthouse(row) | {"county": row["county"]}
+        for row in load_bookings_csv(ROOT / "bookings.csv")
+    ]
+
+
+@pytest.fixture(scope="module")
+def booking_items(lighthouse_rows: list[dict[str, str]]) -> list[BookingItem]:
+    """Validate every booking once."""
+    return [BookingItem(**row) for row in lighthouse_rows]
+
+
+def test_booking_item_construction(
+    benchmark, lighthouse_rows: list[dict[str, str]]
+) -> None:
+    """Benchmark validating raw records into BookingItems."""
+    items = benchmark(lambda: [BookingItem(**row) for row in lighthouse_rows])
+    assert len(items) == len(lighthouse_rows)
+
+
+def test_model_dump(benchmark, booking_items: list[BookingItem]) -> None:
+    """Benchmark dumping BookingItems, including computed fields."""
+    dumped = benchmark(lambda: [item.model_dump() for item in booking_items])
+    assert "full_name" in dumped[0]
+
+
+def export_csv(
+    items: list[BookingItem], exporter_class: type[CsvItemExporter] = CsvItemExporter
+) -> bytes:
+    """Export items to CSV.
+
+    Parameters
+    ----------
+    items : list[BookingItem]
+        The items to export.
+    exporter_class : type[CsvItemExporter]
+        The exporter to use.
+
+    Returns
+    -------
+    bytes
+        The exported CSV.
+    """
+    output = io.BytesIO()
+    exporter = exporter_class(output, encoding="utf-8")
+    exporter.start_exporting()
+    for item in items:
+        exporter.export_item(item)
+    exporter.finish_exporting()
+    return output.getvalue()
+
+
+def test_csv_export(benchmark, booking_items: list[BookingItem]) -> None:
+    """Benchmark CSV serialization of BookingItems."""
+    exported = benchmark(export_csv, booking_items)
+    assert exported.startswith(b"county,booking_id")
+
+
+def test_booking_csv_export(benchmark, booking_items: list[BookingItem]) -> None:
+    """Benchmark the BookingItem CSV exporter against Scrapy's output."""
+    exported = benchmark(export_csv, booking_items, BookingCsvItemExporter)
+    assert exported == export_csv(booking_items)
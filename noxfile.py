@@ -1,9 +1,10 @@
 """Test, format, lint, and type-check files."""
 
 from pathlib import Path
+
 import nox
 
-LOCATIONS = ("sheriffwebsites", "tests", "noxfile.py")
+LOCATIONS = ("sheriffwebsites", "tests", "benchmarks", "noxfile.py")
 VERSIONS = ["3.13"]
 nox.options.default_venv_backend = "uv"
 nox.options.sessions = (
@@ -15,15 +16,20 @@ nox.options.sessions = (
 )
 
 
-def install(session: nox.Session) -> None:
+def install(session: nox.Session, *groups: str) -> None:
     """Install project dependencies.
 
     Arguments
     ---------
     session : nox.Session
         The nox session.
+    *groups : str
+        Dependency groups to install in addition to the test group.
     """
-    args = ["uv", "sync", "--python", str(session.python), "--group", "test"]
+    args = ["uv", "sync", "--python", str(session.python), "--all-extras"]
+    args += ["--group", "test"]
+    for group in groups:
+        args.extend(["--group", group])
     session.run_install(
         *args,
         env={"UV_PROJECT_ENVIRONMENT": session.virtualenv.location},
@@ -51,6 +57,78 @@ def tests(session: nox.Session) -> None:
     )
 
 
+@nox.session(python=VERSIONS, venv_backend="uv")
+def benchmark(session: nox.Session) -> None:
+    """Benchmark a full crawl against replayed responses.
+
+    Arguments
+    ---------
+    session : nox.Session
+        The nox session.
+    """
+    install(session)
+    session.run(
+        "uv",
+        "run",
+        "python",
+        "-m",
+        "benchmarks.bench_crawl",
+        *session.posargs,
+        env={"UV_PROJECT_ENVIRONMENT": session.virtualenv.location},
+    )
+
+
+@nox.session(python=VERSIONS, venv_backend="uv")
+def importtime(session: nox.Session) -> None:
+    """Benchmark cold-start imports, failing if they exceed the target.
+
+    Arguments
+    ---------
+    session : nox.Session
+        The nox session.
+    """
+    install(session)
+    session.run(
+        "uv",
+        "run",
+        "python",
+        "-m",
+        "benchmarks.bench_import",
+        *session.posargs,
+        env={"UV_PROJECT_ENVIRONMENT": session.virtualenv.location},
+    )
+
+
+@nox.session(python=VERSIONS, venv_backend="uv")
+def microbenchmark(session: nox.Session) -> None:
+    """Benchmark item validation and export, failing on regressions.
+
+    Each run is saved under ``.benchmarks/`` and compared against the most
+    recent saved run. The first run on a machine has nothing to compare
+    against, so it only records the baseline.
+
+    Arguments
+    ---------
+    session : nox.Session
+        The nox session.
+    """
+    args = session.posargs or ["--benchmark-autosave"]
+    if not session.posargs:
+        if any(Path(".benchmarks").glob("*/*.json")):
+            args += ["--benchmark-compare", "--benchmark-compare-fail=mean:15%"]
+        else:
+            session.log("No saved benchmarks yet; this run becomes the baseline.")
+    install(session, "bench")
+    session.run(
+        "uv",
+        "run",
+        "pytest",
+        "benchmarks",
+        *args,
+        env={"UV_PROJECT_ENVIRONMENT": session.virtualenv.location},
+    )
+
+
 @nox.session(python=VERSIONS[0])
 def format_files(session: nox.Session) -> None:
     """Format Python files with ruff.
@@ -0,0 +1,467 @@
+"""Consolidate exported booking feeds into a queryable Parquet archive.
+
+Bookings are stored under ``county=<county>/month=<YYYY-MM>/data.parquet``,
+partitioned by booking month, with one row per booking. Two sorted indexes
+under ``_index/`` point into those files: one by person and one by booking
+date, each grouped by county. Lookups binary-search an index and then read
+only the rows they need, instead of scanning every export.
+
+Run ``python -m sheriffwebsites.archive --help`` for the command line.
+"""
+
+import argparse
+import datetime as dt
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Literal
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from .items import REPEATED_FIELDS, BookingItem
+
+TIMESTAMP_COLUMNS = ("booking_date", "release_date", "birth_date", "court_date")
+COLUMN_TYPES = {name: pa.timestamp("us") for name in TIMESTAMP_COLUMNS}
+COLUMN_TYPES["bond_total"] = pa.float64()
+# Repeated strings are dictionary-encoded, in memory and in Parquet files, so
+# their size follows the number of distinct values rather than rows.
+COLUMN_TYPES.update(
+    dict.fromkeys(REPEATED_FIELDS, pa.dictionary(pa.int32(), pa.string()))
+)
+# The archive's columns: BookingItem's fields, with strings for enums.
+BOOKING_SCHEMA = pa.schema(
+    (name, COLUMN_TYPES.get(name, pa.string())) for name in BookingItem.model_fields
+)
+INDEX_SCHEMA = pa.schema(
+    [
+        ("county", pa.string()),
+        ("person_id", pa.string()),
+        ("booking_date", pa.timestamp("us")),
+        ("release_date", pa.timestamp("us")),
+        ("month", pa.string()),
+        ("row", pa.int64()),
+    ]
+)
+# Partitions are written in row groups of this many rows, so a lookup reads
+# only the groups holding the rows it needs.
+ROW_GROUP_SIZE = 4096
+
+
+def read_export(path: str | os.PathLike[str]) -> pa.Table:
+    """Read a CSV feed of BookingItems.
+
+    Repeated header rows, which appear when feeds are concatenated, are
+    dropped, and columns not on ``BookingItem`` are ignored.
+
+    Parameters
+    ----------
+    path : str | os.PathLike[str]
+        The CSV file.
+
+    Returns
+    -------
+    pa.Table
+        The bookings, with dates as timestamps and bonds as floats.
+    """
+    names = list(BookingItem.model_fields)
+    table = pacsv.read_csv(
+        path,
+        convert_options=pacsv.ConvertOptions(
+            column_types={name: pa.string() for name in names},
+            include_columns=names,
+            include_missing_columns=True,
+            strings_can_be_null=True,
+        ),
+    )
+    table = table.filter(pc.not_equal(table["county"], "county"))
+    return table.select(names).cast(BOOKING_SCHEMA)
+
+
+def _write_atomic(table: pa.Table, path: Path, **options: Any) -> None:
+    """Write a Parquet file that replaces ``path`` only once complete."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    os.close(fd)
+    try:
+        pq.write_table(table, tmp, **options)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class _SortedIndex:
+    """An index table grouped by county and sorted by one column within it.
+
+    Parameters
+    ----------
+    table : pa.Table
+        The index, sorted by county and then ``column``.
+    column : str
+        The column sorted within each county.
+    """
+
+    def __init__(self, table: pa.Table, column: str):
+        self.table = table
+        counties = table["county"].to_numpy(zero_copy_only=False)
+        self.values = table[column].to_numpy(zero_copy_only=False)
+        self.bounds: dict[str, tuple[int, int]] = {}
+        if len(counties):
+            starts = np.flatnonzero(np.r_[True, counties[1:] != counties[:-1]])
+            stops = np.r_[starts[1:], len(counties)]
+            for start, stop in zip(starts, stops):
+                self.bounds[counties[start]] = (int(start), int(stop))
+
+    def span(
+        self, county: str, low: Any, high: Any, inclusive: bool
+    ) -> tuple[int, int]:
+        """Get the positions of a county's index rows between two bounds.
+
+        Parameters
+        ----------
+        county : str
+            The county.
+        low : Any
+            The lowest value, inclusive, or None for no bound.
+        high : Any
+            The highest value, or None for no bound.
+        inclusive : bool
+            Whether ``high`` itself is included.
+
+        Returns
+        -------
+        tuple[int, int]
+            The first matching position and the one after the last.
+        """
+        start, stop = self.bounds.get(county, (0, 0))
+        values = self.values[start:stop]
+        first = 0 if low is None else int(np.searchsorted(values, low, "left"))
+        side: Literal["left", "right"] = "right" if inclusive else "left"
+        last = len(values) if high is None else int(np.searchsorted(values, high, side))
+        return start + first, start + max(first, last)
+
+    def range(self, county: str, low: Any, high: Any, inclusive: bool) -> pa.Table:
+        """Get index rows for a county with values between two bounds.
+
+        Parameters
+        ----------
+        county : str
+            The county.
+        low : Any
+            The lowest value, inclusive, or None for no bound.
+        high : Any
+            The highest value, or None for no bound.
+        inclusive : bool
+            Whether ``high`` itself is included.
+
+        Returns
+        -------
+        pa.Table
+            The matching index rows.
+        """
+        first, last = self.span(county, low, high, inclusive)
+        return self.table.slice(first, last - first)
+
+
+class _CustodyIndex(_SortedIndex):
+    """A booking date index that only scans stays that can overlap a time.
+
+    A released booking can only be held at a time if it was made within the
+    county's longest stay before it, so only that window of the index is
+    searched, along with the unreleased bookings made earlier.
+
+    Parameters
+    ----------
+    table : pa.Table
+        The index, sorted by county and then booking date.
+    """
+
+    def __init__(self, table: pa.Table):
+        super().__init__(table, "booking_date")
+        released = table["release_date"].to_numpy(zero_copy_only=False)
+        # Positions of bookings without a release date, in index order.
+        self.unreleased = np.flatnonzero(np.isnat(released))
+        stays = released - self.values
+        self.longest_stay: dict[str, np.timedelta64] = {}
+        for county, (start, stop) in self.bounds.items():
+            known = stays[start:stop][~np.isnat(stays[start:stop])]
+            longest = known.max() if len(known) else np.timedelta64(0, "us")
+            self.longest_stay[county] = max(longest, np.timedelta64(0, "us"))
+
+    def held(self, county: str, moment: np.datetime64) -> pa.Table:
+        """Get index rows for a county's bookings held at a time.
+
+        Parameters
+        ----------
+        county : str
+            The county.
+        moment : np.datetime64
+            The point in time.
+
+        Returns
+        -------
+        pa.Table
+            Index rows booked by ``moment`` and not released by then.
+        """
+        longest = self.longest_stay.get(county, np.timedelta64(0, "us"))
+        first, last = self.span(county, moment - longest, moment, inclusive=True)
+        county_start = self.bounds.get(county, (0, 0))[0]
+        lo, hi = np.searchsorted(self.unreleased, [county_start, first])
+        rows = np.r_[self.unreleased[lo:hi], np.arange(first, last)]
+        hits = self.table.take(rows)
+        held = pc.or_kleene(
+            pc.is_null(hits["release_date"]),
+            pc.greater(hits["release_date"], pa.scalar(moment)),
+        )
+        return hits.filter(held)
+
+
+class BookingArchive:
+    """A Parquet archive of bookings, partitioned by county and month.
+
+    Parameters
+    ----------
+    root : str | os.PathLike[str]
+        The archive directory.
+    """
+
+    def __init__(self, root: str | os.PathLike[str]):
+        self.root = Path(root)
+        self._by_person: _SortedIndex | None = None
+        self._by_date: _CustodyIndex | None = None
+
+    def partition_path(self, county: str, month: str) -> Path:
+        """Get the data file for a county and month.
+
+        Parameters
+        ----------
+        county : str
+            The county.
+        month : str
+            The booking month, as ``YYYY-MM``.
+
+        Returns
+        -------
+        Path
+            The Parquet file.
+        """
+        return self.root / f"county={county}" / f"month={month}" / "data.parquet"
+
+    def append(self, bookings: pa.Table) -> int:
+        """Merge bookings into the archive and update the indexes.
+
+        Each affected partition is rewritten with its old and new rows,
+        keeping the newest copy of each booking, sorted by person and
+        booking date. Only the rewritten partitions are read back into the
+        indexes.
+
+        Parameters
+        ----------
+        bookings : pa.Table
+            Bookings, as returned by ``read_export``.
+
+        Returns
+        -------
+        int
+            The number of partitions rewritten.
+        """
+        months = pc.strftime(bookings["booking_date"], format="%Y-%m")
+        bookings = bookings.append_column("month", months)
+        keys = bookings.select(["county", "month"]).group_by(["county", "month"])
+        partitions = keys.aggregate([]).to_pylist()
+        for partition in partitions:
+            county, month = partition["county"], partition["month"]
+            mask = pc.and_(
+                pc.equal(bookings["county"], county), pc.equal(bookings["month"], month)
+            )
+            rows = bookings.filter(mask).drop_columns(["county", "month"])
+            path = self.partition_path(county, month)
+            if path.exists():
+                # Cast, as partitions written before encoding have plain strings.
+                archived = pq.read_table(path).cast(rows.schema)
+                rows = pa.concat_tables([archived, rows])
+            _write_atomic(_latest_bookings(rows), path, row_group_size=ROW_GROUP_SIZE)
+        index_path = self.root / "_index" / "by_person.parquet"
+        if not index_path.exists():
+            self.rebuild_indexes()
+            return len(partitions)
+        # Keep the index rows of untouched partitions, and replace the rest.
+        index = pq.read_table(index_path, schema=INDEX_SCHEMA)
+        touched = pa.table(
+            {
+                "county": [p["county"] for p in partitions],
+                "month": [p["month"] for p in partitions],
+            }
+        )
+        kept = index.join(touched, ["county", "month"], join_type="left anti")
+        pieces = [self._partition_keys(p["county"], p["month"]) for p in partitions]
+        self._write_indexes(
+            pa.concat_tables([kept.select(INDEX_SCHEMA.names), *pieces])
+        )
+        return len(partitions)
+
+    def rebuild_indexes(self) -> None:
+        """Rebuild the person and date indexes from every partition."""
+        pieces = []
+        for path in sorted(self.root.glob("county=*/month=*/data.parquet")):
+            county = path.parent.parent.name.removeprefix("county=")
+            month = path.parent.name.removeprefix("month=")
+            pieces.append(self._partition_keys(county, month))
+        self._write_indexes(
+            pa.concat_tables(pieces) if pieces else INDEX_SCHEMA.empty_table()
+        )
+
+    def _partition_keys(self, county: str, month: str) -> pa.Table:
+        """Read a partition's index rows."""
+        keys = pq.read_table(
+            self.partition_path(county, month),
+            columns=["person_id", "booking_date", "release_date"],
+        )
+        return (
+            keys.append_column("county", pa.array([county] * len(keys)))
+            .append_column("month", pa.array([month] * len(keys)))
+            .append_column("row", pa.array(np.arange(len(keys))))
+            .select(INDEX_SCHEMA.names)
+            .cast(INDEX_SCHEMA)
+        )
+
+    def _write_indexes(self, index: pa.Table) -> None:
+        """Sort and write the person and date indexes."""
+        for name, column in (("by_person", "person_id"), ("by_date", "booking_date")):
+            _write_atomic(
+                index.sort_by([("county", "ascending"), (column, "ascending")]),
+                self.root / "_index" / f"{name}.parquet",
+            )
+        self._by_person = self._by_date = None
+
+    def bookings_for(self, county: str, person_id: str) -> pa.Table:
+        """Get every archived booking of a person in a county.
+
+        Parameters
+        ----------
+        county : str
+            The county.
+        person_id : str
+            The county's ID for the person.
+
+        Returns
+        -------
+        pa.Table
+            The bookings, oldest first.
+        """
+        if self._by_person is None:
+            self._by_person = _SortedIndex(self._load_index("by_person"), "person_id")
+        hits = self._by_person.range(county, person_id, person_id, inclusive=True)
+        return self._fetch(county, hits)
+
+    def in_custody(self, county: str, when: dt.datetime) -> pa.Table:
+        """Get the bookings of everyone held in a county's jail at a time.
+
+        Parameters
+        ----------
+        county : str
+            The county.
+        when : dt.datetime
+            The point in time.
+
+        Returns
+        -------
+        pa.Table
+            Bookings made by ``when`` and not released by then, oldest first.
+        """
+        if self._by_date is None:
+            self._by_date = _CustodyIndex(self._load_index("by_date"))
+        return self._fetch(
+            county, self._by_date.held(county, np.datetime64(when, "us"))
+        )
+
+    def _load_index(self, name: str) -> pa.Table:
+        """Read an index, building the indexes first if there are none."""
+        path = self.root / "_index" / f"{name}.parquet"
+        if not path.exists():
+            self.rebuild_indexes()
+        return pq.read_table(path, schema=INDEX_SCHEMA)
+
+    def _fetch(self, county: str, hits: pa.Table) -> pa.Table:
+        """Read the rows an index points to, sorted by booking date."""
+        tables = []
+        for month in sorted(set(hits["month"].to_pylist())):
+            rows = hits.filter(pc.equal(hits["month"], month))["row"].to_numpy()
+            part = _read_rows(self.partition_path(county, month), rows)
+            counties = pa.array([county] * len(part)).dictionary_encode()
+            tables.append(part.add_column(0, "county", counties))
+        if not tables:
+            return BOOKING_SCHEMA.empty_table()
+        return pa.concat_tables(tables).sort_by("booking_date")
+
+
+def _read_rows(path: Path, rows: np.ndarray) -> pa.Table:
+    """Read rows of a Parquet file, decoding only the row groups holding them."""
+    file = pq.ParquetFile(path)
+    sizes = [file.metadata.row_group(i).num_rows for i in range(file.num_row_groups)]
+    starts = np.r_[0, np.cumsum(sizes)]
+    groups = np.searchsorted(starts, rows, "right") - 1
+    needed = np.unique(groups)
+    table = file.read_row_groups(needed.tolist())
+    # Where each needed group starts within the rows that were read.
+    offsets = np.r_[0, np.cumsum(np.asarray(sizes)[needed])]
+    positions = rows - starts[groups] + offsets[np.searchsorted(needed, groups)]
+    return table.take(positions)
+
+
+def _latest_bookings(rows: pa.Table) -> pa.Table:
+    """Keep the last copy of each booking, sorted by person and date."""
+    rows = rows.append_column("_order", pa.array(np.arange(len(rows))))
+    latest = rows.group_by(["person_id", "booking_date"], use_threads=False).aggregate(
+        [("_order", "max")]
+    )
+    rows = rows.take(latest["_order_max"]).drop_columns(["_order"])
+    return rows.sort_by([("person_id", "ascending"), ("booking_date", "ascending")])
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Append feeds to, or query, an archive from the command line.
+
+    Parameters
+    ----------
+    argv : list[str] | None
+        The arguments, or None to use ``sys.argv``.
+
+    Returns
+    -------
+    int
+        The exit status.
+    """
+    parser = argparse.ArgumentParser(description="Query the booking archive.")
+    parser.add_argument("root", type=Path)
+    commands = parser.add_subparsers(dest="command", required=True)
+    append = commands.add_parser("append", help="Merge CSV feeds into the archive.")
+    append.add_argument("feeds", nargs="+", type=Path)
+    held = commands.add_parser("in-custody", help="Who was held at a time.")
+    held.add_argument("county")
+    held.add_argument("when", type=dt.datetime.fromisoformat)
+    person = commands.add_parser("person", help="A person's bookings.")
+    person.add_argument("county")
+    person.add_argument("person_id")
+    args = parser.parse_args(argv)
+
+    archive = BookingArchive(args.root)
+    if args.command == "append":
+        for feed in args.feeds:
+            archive.append(read_export(feed))
+        return 0
+    if args.command == "in-custody":
+        result = archive.in_custody(args.county, args.when)
+    else:
+        result = archive.bookings_for(args.county, args.person_id)
+    pacsv.write_csv(result, sys.stdout.buffer)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,439 @@
+"""Checkpoint crawl progress so an interrupted crawl can resume."""
+
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import Counter, deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Any, Self
+
+from scrapy import signals
+from scrapy.crawler import Crawler
+from scrapy.extensions.feedexport import FeedSlot, ItemFilter
+from scrapy.settings import BaseSettings
+from scrapy.statscollectors import StatsCollector
+from scrapy.utils.conf import feed_complete_default_values_from_settings
+from scrapy.utils.misc import load_object
+
+logger = logging.getLogger(__name__)
+
+
+def atomic_write_json(path: str | Path, data: Any) -> None:
+    """Write JSON to a file atomically.
+
+    The data is written to a temporary file in the same directory, which then
+    replaces the target, so readers never see a partial file.
+
+    Parameters
+    ----------
+    path : str | Path
+        The target file.
+    data : Any
+        JSON-serializable data.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def feed_filters(settings: BaseSettings) -> dict[str, ItemFilter]:
+    """Load the item filter of each feed in ``FEEDS``, as FeedExporter does.
+
+    Parameters
+    ----------
+    settings : BaseSettings
+        The crawler settings.
+
+    Returns
+    -------
+    dict[str, ItemFilter]
+        The filters, keyed by feed URI template.
+    """
+    filters = {}
+    for uri, options in settings.getdict("FEEDS").items():
+        uri = str(uri) if not isinstance(uri, Path) else uri.absolute().as_uri()
+        options = feed_complete_default_values_from_settings(options, settings)
+        filters[uri] = load_object(options.get("item_filter", ItemFilter))(options)
+    return filters
+
+
+def unbatched_feeds(settings: BaseSettings) -> list[str]:
+    """List the feeds in ``FEEDS`` that are only stored when the crawl ends.
+
+    Parameters
+    ----------
+    settings : BaseSettings
+        The crawler settings.
+
+    Returns
+    -------
+    list[str]
+        The URI templates of feeds without a batch item count.
+    """
+    return [
+        str(uri)
+        for uri, options in settings.getdict("FEEDS").items()
+        if not feed_complete_default_values_from_settings(options, settings)[
+            "batch_item_count"
+        ]
+    ]
+
+
+@dataclass
+class StagedChange:
+    """A change to crawl progress, waiting until its items are stored.
+
+    Attributes
+    ----------
+    apply : Callable[[], None]
+        Records the change in the checkpoint.
+    unscraped : set[int]
+        The ids of the change's items that have not been scraped yet.
+    marks : dict[str, int]
+        For each feed, the number of items it must have stored for every
+        item of the change to be among them.
+    """
+
+    apply: Callable[[], None]
+    unscraped: set[int] = field(default_factory=set)
+    marks: dict[str, int] = field(default_factory=dict)
+
+
+class Checkpoint:
+    """Per-county crawl progress, persisted to a local JSON file.
+
+    For each county started, the checkpoint holds the next results offset to
+    request (None once every page is done) and the detail requests that are
+    still pending, keyed by booking ID. Changes are written in batches: after
+    ``batch_size`` changes or ``interval`` seconds, whichever comes first.
+
+    A page or detail only counts as done once its items are stored. Its
+    change is staged until each item is scraped and every feed that accepts
+    the item has stored the batch holding it, so an interrupted crawl never
+    skips items that were yielded but not exported. A county's changes are
+    recorded in the order they were staged, and nothing is recorded past a
+    batch that failed to store.
+
+    Parameters
+    ----------
+    path : str | Path
+        The checkpoint file.
+    batch_size : int
+        The number of changes between writes.
+    interval : float
+        The maximum number of seconds between writes.
+    feeds : dict[str, ItemFilter] | None
+        The item filter of each feed, keyed by URI template.
+    stats : StatsCollector | None
+        The crawler stats, used to tell when a feed batch failed to store.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        batch_size: int = 50,
+        interval: float = 30,
+        feeds: dict[str, ItemFilter] | None = None,
+        stats: StatsCollector | None = None,
+    ):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.interval = interval
+        self.feeds = feeds or {}
+        self.stats = stats
+        self.offsets: dict[str, int | None] = {}
+        self.pending: dict[str, dict[str, dict[str, Any]]] = {}
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self.offsets = data["offsets"]
+            self.pending = data["pending"]
+        self._changes = 0
+        self._flushed = time.monotonic()
+        self._staged: dict[str, deque[StagedChange]] = {}
+        self._owners: dict[int, StagedChange] = {}
+        # Items each feed has exported, and stored in consecutive batches.
+        self._exported: Counter[str] = Counter()
+        self._stored: Counter[str] = Counter()
+        # Stored batches waiting for an earlier one, by feed and batch ID.
+        self._out_of_order: dict[str, dict[int, int]] = {}
+        self._next_batch: dict[str, int] = {}
+        self._store_failures = 0
+        self._reason: str | None = None
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> Self | None:
+        """Create a checkpoint for a crawler, if configured.
+
+        Parameters
+        ----------
+        crawler : Crawler
+            The crawler.
+
+        Returns
+        -------
+        Self | None
+            The checkpoint, connected to the crawler's item and feed signals,
+            or None if ``CHECKPOINT_FILE`` is not set.
+        """
+        settings = crawler.settings
+        path = settings.get("CHECKPOINT_FILE")
+        if not path:
+            return None
+        if unbatched := unbatched_feeds(settings):
+            # Progress is only recorded once its items are stored.
+            logger.warning(
+                "Feeds %s are not batched, so nothing will be checkpointed "
+                "until the crawl ends. Set FEED_EXPORT_BATCH_ITEM_COUNT or "
+                "their batch_item_count.",
+                ", ".join(unbatched),
+            )
+        checkpoint = cls(
+            path,
+            batch_size=settings.getint("CHECKPOINT_BATCH_SIZE", 50),
+            interval=settings.getfloat("CHECKPOINT_INTERVAL", 30),
+            feeds=feed_filters(settings),
+            stats=crawler.stats,
+        )
+        crawler.signals.connect(checkpoint.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(checkpoint.item_dropped, signal=signals.item_dropped)
+        crawler.signals.connect(
+            checkpoint.feed_slot_closed, signal=signals.feed_slot_closed
+        )
+        crawler.signals.connect(checkpoint.close, signal=signals.spider_closed)
+        return checkpoint
+
+    def resume_offset(self, county: str) -> int | None:
+        """Get the offset at which to resume a county.
+
+        Parameters
+        ----------
+        county : str
+            The county.
+
+        Returns
+        -------
+        int | None
+            The next offset to request, or None if every page is done.
+        """
+        return self.offsets.get(county, 0)
+
+    def reset(self, counties: Iterable[str]) -> None:
+        """Forget the progress of some counties, so they start from the top.
+
+        Parameters
+        ----------
+        counties : Iterable[str]
+            The counties.
+        """
+        for county in counties:
+            self.offsets.pop(county, None)
+            self.pending.pop(county, None)
+        if self.offsets or self.pending:
+            self.flush()
+        else:
+            self.path.unlink(missing_ok=True)
+
+    def page_done(
+        self,
+        county: str,
+        next_offset: int | None,
+        pending: dict[str, dict[str, Any]],
+        items: Iterable[Any] = (),
+    ) -> None:
+        """Stage a completed results page.
+
+        Call this before the page's items are yielded, so that none of them
+        is scraped before it is tracked.
+
+        Parameters
+        ----------
+        county : str
+            The county.
+        next_offset : int | None
+            The next offset to request, or None if this was the last page.
+        pending : dict[str, dict[str, Any]]
+            Raw bookings that need a detail request, keyed by booking ID.
+        items : Iterable[Any]
+            The items found on the page.
+        """
+        self._stage(
+            county, partial(self._page_done, county, next_offset, pending), items
+        )
+
+    def detail_done(
+        self, county: str, booking_id: str, items: Iterable[Any] = ()
+    ) -> None:
+        """Stage a completed detail request.
+
+        Parameters
+        ----------
+        county : str
+            The county.
+        booking_id : str
+            The ID of the booking the detail was requested for.
+        items : Iterable[Any]
+            The items parsed from the detail, not yet yielded.
+        """
+        self._stage(county, partial(self._detail_done, county, booking_id), items)
+
+    def item_scraped(self, item: Any) -> None:
+        """Count an exported item towards its feeds and its staged change.
+
+        Parameters
+        ----------
+        item : Any
+            The scraped item.
+        """
+        change = self._owners.pop(id(item), None)
+        for uri, item_filter in self.feeds.items():
+            if item_filter.accepts(item):
+                self._exported[uri] += 1
+                if change is not None:
+                    change.marks[uri] = self._exported[uri]
+        if change is not None:
+            change.unscraped.discard(id(item))
+            self._commit()
+
+    def item_dropped(self, item: Any) -> None:
+        """Stop waiting for an item that will not be exported.
+
+        Parameters
+        ----------
+        item : Any
+            The dropped item.
+        """
+        change = self._owners.pop(id(item), None)
+        if change is not None:
+            change.unscraped.discard(id(item))
+            self._commit()
+
+    def feed_slot_closed(self, slot: FeedSlot) -> None:
+        """Count the items of a feed batch that was stored.
+
+        Parameters
+        ----------
+        slot : FeedSlot
+            The closed feed slot.
+        """
+        if self._store_failed():
+            return
+        uri = slot.uri_template
+        # Batches can finish uploading out of order; count them in order.
+        waiting = self._out_of_order.setdefault(uri, {})
+        waiting[slot.batch_id] = slot.itemcount
+        while (count := waiting.pop(self._next_batch.get(uri, 1), None)) is not None:
+            self._stored[uri] += count
+            self._next_batch[uri] = self._next_batch.get(uri, 1) + 1
+        self._commit()
+
+    def _store_failed(self) -> bool:
+        """Check whether the feed batch that just closed failed to store."""
+        if self.stats is None:
+            return False
+        failures: int = sum(
+            value
+            for key, value in self.stats.get_stats().items()
+            if key.startswith("feedexport/failed_count/")
+        )
+        failed = failures > self._store_failures
+        self._store_failures = failures
+        return failed
+
+    def _stage(
+        self, county: str, apply: Callable[[], None], items: Iterable[Any]
+    ) -> None:
+        """Hold a change until its items are stored."""
+        change = StagedChange(apply)
+        for item in items:
+            self._owners[id(item)] = change
+            change.unscraped.add(id(item))
+        self._staged.setdefault(county, deque()).append(change)
+        self._commit()
+
+    def _commit(self) -> None:
+        """Record each county's staged changes whose items are all stored."""
+        committed = False
+        for queue in self._staged.values():
+            while queue and self._is_stored(queue[0]):
+                queue.popleft().apply()
+                committed = True
+        if committed and self._reason is not None:
+            # Batches stored after the spider closed are written at once.
+            self._finish()
+
+    def _is_stored(self, change: StagedChange) -> bool:
+        """Check whether every item of a change is scraped and stored."""
+        return not change.unscraped and all(
+            self._stored[uri] >= mark for uri, mark in change.marks.items()
+        )
+
+    def _page_done(
+        self, county: str, next_offset: int | None, pending: dict[str, dict[str, Any]]
+    ) -> None:
+        """Record a results page whose items are stored."""
+        self.offsets[county] = next_offset
+        self.pending.setdefault(county, {}).update(pending)
+        self._prune(county)
+        self._changed()
+
+    def _detail_done(self, county: str, booking_id: str) -> None:
+        """Record a detail request whose item is stored."""
+        if self.pending.get(county, {}).pop(booking_id, None) is not None:
+            self._prune(county)
+            self._changed()
+
+    def _prune(self, county: str) -> None:
+        """Drop a county's pending details once there are none left."""
+        if not self.pending.get(county):
+            self.pending.pop(county, None)
+
+    def _changed(self) -> None:
+        """Count a change and write the checkpoint if the batch is full."""
+        self._changes += 1
+        if (
+            self._changes >= self.batch_size
+            or time.monotonic() - self._flushed >= self.interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the checkpoint."""
+        atomic_write_json(self.path, {"offsets": self.offsets, "pending": self.pending})
+        self._changes = 0
+        self._flushed = time.monotonic()
+
+    def close(self, reason: str) -> None:
+        """Write the checkpoint, or delete it if the crawl finished.
+
+        Feeds are stored after the spider closes, so changes still staged
+        then are written as their batches are stored. A finished crawl's
+        checkpoint is only deleted once none are left.
+
+        Parameters
+        ----------
+        reason : str
+            The reason the spider closed.
+        """
+        self._reason = reason
+        self._finish()
+
+    def _finish(self) -> None:
+        """Write or delete the checkpoint of a closed crawl."""
+        if self._reason == "finished" and not any(self._staged.values()):
+            self.path.unlink(missing_ok=True)
+        else:
+            self.flush()
@@ -0,0 +1,348 @@
+"""Re-crawl each county on its own schedule from one long-running process."""
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import sys
+import time
+from pathlib import Path
+from typing import Any, Self
+
+from scrapy import Spider, signals
+from scrapy.crawler import CrawlerRunner
+from scrapy.settings import BaseSettings
+from scrapy.utils.defer import deferred_from_coro, maybe_deferred_to_future
+from scrapy.utils.log import configure_logging, failure_to_exc_info
+from scrapy.utils.ossignal import install_shutdown_handlers
+from scrapy.utils.project import get_project_settings
+from scrapy.utils.reactor import install_reactor
+from twisted.internet import defer, task
+from twisted.python.failure import Failure
+
+from sheriffwebsites.checkpoint import Checkpoint
+from sheriffwebsites.sitecache import SiteCache
+
+logger = logging.getLogger(__name__)
+
+# The site cache key holding each county's refresh interval and last digest.
+REFRESH_KEY = "refresh"
+
+
+def item_digest(item: Any) -> int:
+    """Hash an item's content.
+
+    Parameters
+    ----------
+    item : Any
+        A BookingItem or RawBooking.
+
+    Returns
+    -------
+    int
+        A 64-bit hash that is stable across processes.
+    """
+    if isinstance(item, dict):
+        data = json.dumps(item, sort_keys=True, default=str).encode()
+    else:
+        data = item.model_dump_json().encode()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest())
+
+
+class RefreshSchedule:
+    """When each county is next due, with intervals that follow its changes.
+
+    Every county is due at once when the schedule is created. After each
+    crawl, a county's interval is divided by ``backoff`` if its bookings
+    changed and multiplied by it if they did not, within the minimum and
+    maximum. Changes are detected by comparing an order-independent digest of
+    the county's items with the previous crawl's. Intervals and digests are
+    kept in the site cache, so a restarted daemon keeps what it learned.
+
+    Parameters
+    ----------
+    counties : list[str]
+        The counties to schedule.
+    cache_path : str | Path | None
+        The site cache file, if any.
+    min_interval : float
+        The shortest interval in seconds, also used for new counties.
+    max_interval : float
+        The longest interval in seconds.
+    backoff : float
+        The factor by which intervals grow or shrink.
+    """
+
+    def __init__(
+        self,
+        counties: list[str],
+        cache_path: str | Path | None = None,
+        min_interval: float = 900,
+        max_interval: float = 21600,
+        backoff: float = 2.0,
+    ):
+        self.cache_path = cache_path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        cache = SiteCache(cache_path)
+        self.intervals: dict[str, float] = {}
+        self.digests: dict[str, int | None] = {}
+        for county in counties:
+            state = cache.get(county, REFRESH_KEY, math.inf) or {}
+            self.intervals[county] = state.get("interval", min_interval)
+            self.digests[county] = state.get("digest")
+        self.due = dict.fromkeys(counties, 0.0)
+
+    @classmethod
+    def from_settings(cls, settings: BaseSettings, counties: list[str]) -> Self:
+        """Create a schedule from Scrapy settings.
+
+        Parameters
+        ----------
+        settings : BaseSettings
+            The crawler settings.
+        counties : list[str]
+            The counties to schedule.
+
+        Returns
+        -------
+        Self
+            The schedule.
+        """
+        return cls(
+            counties,
+            settings.get("SITE_CACHE_FILE"),
+            min_interval=settings.getfloat("REFRESH_MIN_INTERVAL", 900),
+            max_interval=settings.getfloat("REFRESH_MAX_INTERVAL", 21600),
+            backoff=settings.getfloat("REFRESH_BACKOFF", 2.0),
+        )
+
+    def due_counties(self, now: float) -> list[str]:
+        """Get the counties due for a crawl.
+
+        Parameters
+        ----------
+        now : float
+            The current ``time.monotonic()``.
+
+        Returns
+        -------
+        list[str]
+            The due counties.
+        """
+        return [county for county, due in self.due.items() if due <= now]
+
+    def next_due(self) -> float:
+        """Get when the next county is due.
+
+        Returns
+        -------
+        float
+            A ``time.monotonic()`` value.
+        """
+        return min(self.due.values())
+
+    def record(self, county: str, digest: int | None, now: float) -> None:
+        """Record a county's crawl and schedule its next one.
+
+        Parameters
+        ----------
+        county : str
+            The county.
+        digest : int | None
+            The digest of the county's items, or None if it had none, in
+            which case its interval is kept.
+        now : float
+            The current ``time.monotonic()``.
+        """
+        interval = self.intervals[county]
+        previous = self.digests[county]
+        if digest is not None:
+            if previous is not None and digest != previous:
+                interval = max(self.min_interval, interval / self.backoff)
+            elif previous is not None:
+                interval = min(self.max_interval, interval * self.backoff)
+            self.digests[county] = digest
+        self.intervals[county] = interval
+        self.due[county] = now + interval
+        # Reloaded so that metadata the spider cached during the crawl is kept.
+        SiteCache(self.cache_path).set(
+            county, REFRESH_KEY, {"interval": interval, "digest": self.digests[county]}
+        )
+
+
+class RefreshDaemon:
+    """Crawl due counties repeatedly with one CrawlerRunner.
+
+    The reactor, imports, and item schemas stay loaded between crawls, and
+    with ``DOWNLOAD_SHARED_POOL`` set so do idle HTTP connections. Each crawl
+    reuses the site cache file of the last one. Counties that come due
+    together are crawled together.
+
+    Every crawl is a full refresh of its counties: their progress is cleared
+    from the checkpoint first, so a county that an interrupted crawl had
+    finished is not skipped the next time it is due.
+
+    Parameters
+    ----------
+    runner : CrawlerRunner
+        The runner for the crawls.
+    schedule : RefreshSchedule
+        The county schedule.
+    spider : str
+        The name of the spider to run.
+    checkpoint_path : str | Path | None
+        The crawls' ``CHECKPOINT_FILE``, if any.
+    """
+
+    def __init__(
+        self,
+        runner: CrawlerRunner,
+        schedule: RefreshSchedule,
+        spider: str = "sheriffwebsites",
+        checkpoint_path: str | Path | None = None,
+    ):
+        self.runner = runner
+        self.schedule = schedule
+        self.spider = spider
+        self.checkpoint_path = checkpoint_path
+        self.stopping = False
+        self._sleep: defer.Deferred[None] | None = None
+
+    async def run(self) -> None:
+        """Crawl counties as they come due until stopped."""
+        from twisted.internet import reactor
+
+        while not self.stopping:
+            now = time.monotonic()
+            due = self.schedule.due_counties(now)
+            if not due:
+                delay = self.schedule.next_due() - now
+                logger.info("Next county due in %.0f seconds", delay)
+                self._sleep = task.deferLater(reactor, delay)  # type: ignore[arg-type]
+                try:
+                    await maybe_deferred_to_future(self._sleep)
+                except defer.CancelledError:
+                    pass
+                self._sleep = None
+                continue
+            digests = await self.crawl(due)
+            # mypy keeps the loop condition's narrowing across the await.
+            if self.stopping:
+                break  # type: ignore[unreachable]
+            now = time.monotonic()
+            for county in due:
+                self.schedule.record(county, digests.get(county), now)
+
+    async def crawl(self, counties: list[str]) -> dict[str, int]:
+        """Crawl some counties.
+
+        Parameters
+        ----------
+        counties : list[str]
+            The counties to crawl.
+
+        Returns
+        -------
+        dict[str, int]
+            The digest of each county's items, or nothing if the crawl did not
+            finish, so that partial results do not count as changes.
+        """
+        digests: dict[str, int] = {}
+        reasons: list[str] = []
+
+        def item_scraped(item: Any) -> None:
+            if isinstance(item, dict):
+                county = item["county"]
+            else:
+                county = item.county
+            # Summed so that the digest does not depend on item order.
+            digests[county] = (digests.get(county, 0) + item_digest(item)) % 2**64
+
+        def spider_closed(spider: Spider, reason: str) -> None:
+            reasons.append(reason)
+
+        if self.checkpoint_path:
+            Checkpoint(self.checkpoint_path).reset(counties)
+        crawler = self.runner.create_crawler(self.spider)
+        crawler.signals.connect(item_scraped, signal=signals.item_scraped, weak=False)
+        crawler.signals.connect(spider_closed, signal=signals.spider_closed, weak=False)
+        logger.info("Crawling %s", ", ".join(counties))
+        await maybe_deferred_to_future(
+            self.runner.crawl(crawler, counties=",".join(counties))
+        )
+        return digests if reasons == ["finished"] else {}
+
+    def stop(self) -> defer.Deferred[Any]:
+        """Stop crawling, interrupting any crawl in progress.
+
+        Returns
+        -------
+        defer.Deferred[Any]
+            Fires once every crawl has stopped.
+        """
+        self.stopping = True
+        if self._sleep is not None:
+            self._sleep.cancel()
+        return self.runner.stop()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the refresh daemon until interrupted.
+
+    Parameters
+    ----------
+    argv : list[str] | None
+        The arguments, or None to use ``sys.argv``.
+
+    Returns
+    -------
+    int
+        The exit status, non-zero if the daemon failed.
+    """
+    parser = argparse.ArgumentParser(description="Re-crawl counties on a schedule.")
+    parser.add_argument("--counties", help="Comma-separated counties to schedule.")
+    args = parser.parse_args(argv)
+
+    settings = get_project_settings()
+    # Idle connections outlive each crawl, ready for the next one.
+    settings.set("DOWNLOAD_SHARED_POOL", True)
+    install_reactor(settings["TWISTED_REACTOR"], settings["ASYNCIO_EVENT_LOOP"])
+    configure_logging(settings)
+    from twisted.internet import reactor
+
+    if args.counties:
+        counties = [county.strip() for county in args.counties.split(",")]
+    else:
+        counties = list(settings.getdict("SHERIFF_SITES"))
+    daemon = RefreshDaemon(
+        CrawlerRunner(settings),
+        RefreshSchedule.from_settings(settings, counties),
+        checkpoint_path=settings.get("CHECKPOINT_FILE"),
+    )
+    install_shutdown_handlers(
+        lambda signum, frame: reactor.callFromThread(  # type: ignore[attr-defined]
+            daemon.stop
+        )
+    )
+
+    failures: list[Failure] = []
+
+    def log_failure(failure: Failure) -> None:
+        logger.error("Refresh daemon failed", exc_info=failure_to_exc_info(failure))
+        failures.append(failure)
+
+    def stop_reactor(result: Any) -> None:
+        reactor.stop()  # type: ignore[attr-defined]
+
+    finished: defer.Deferred[None] = deferred_from_coro(daemon.run())
+    finished.addErrback(log_failure)
+    finished.addBoth(stop_reactor)
+    reactor.run(installSignalHandlers=False)  # type: ignore[attr-defined]
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""Download roster pages over persistent connections, or HTTP/2 where enabled."""
+
+import logging
+from typing import Any
+from urllib.parse import urlparse
+
+from scrapy import Request, Spider
+from scrapy.core.downloader.handlers.http11 import HTTP11DownloadHandler
+from scrapy.crawler import Crawler
+from scrapy.http import Response
+from scrapy.settings import BaseSettings
+from scrapy.statscollectors import StatsCollector
+from scrapy.utils.httpobj import urlparse_cached
+from twisted.internet.defer import Deferred, succeed
+from twisted.web.client import HTTPConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# Shared by every crawl in the process when DOWNLOAD_SHARED_POOL is set, so
+# idle connections survive from one crawl to the next.
+_shared_pool: HTTPConnectionPool | None = None
+
+
+def get_shared_pool(pool: HTTPConnectionPool) -> HTTPConnectionPool:
+    """Get the connection pool shared by crawls, adopting one on first use.
+
+    The shared pool's connections are closed when the reactor shuts down.
+
+    Parameters
+    ----------
+    pool : HTTPConnectionPool
+        A configured pool, shared if none is yet.
+
+    Returns
+    -------
+    HTTPConnectionPool
+        The shared pool.
+    """
+    global _shared_pool
+    if _shared_pool is None:
+        from twisted.internet import reactor
+
+        _shared_pool = pool
+        reactor.addSystemEventTrigger(  # type: ignore[attr-defined]
+            "before", "shutdown", pool.closeCachedConnections
+        )
+    return _shared_pool
+
+
+class CountingEndpoint:
+    """An endpoint that counts the connections it opens.
+
+    Parameters
+    ----------
+    endpoint : Any
+        The endpoint to connect to.
+    stats : StatsCollector
+        Where to count connections.
+    """
+
+    def __init__(self, endpoint: Any, stats: StatsCollector):
+        self.endpoint = endpoint
+        self.stats = stats
+        self.opened = 0
+
+    def connect(self, factory: Any) -> Deferred[Any]:
+        """Open a connection, counting it.
+
+        Parameters
+        ----------
+        factory : Any
+            Builds the connection's protocol.
+
+        Returns
+        -------
+        Deferred[Any]
+            The connected protocol.
+        """
+        self.opened += 1
+        self.stats.inc_value("downloader/connections_opened")
+        connection: Deferred[Any] = self.endpoint.connect(factory)
+        return connection
+
+
+class CountingConnectionPool:
+    """Wrap a connection pool to count opened and reused connections.
+
+    Only the pool's public interface is used: it opens a connection through
+    the endpoint passed to ``getConnection`` only when it has no idle one
+    cached, so each endpoint is wrapped to count the connections it opens.
+    Any other attribute is read from the wrapped pool.
+
+    Parameters
+    ----------
+    pool : HTTPConnectionPool
+        The pool to wrap.
+    stats : StatsCollector
+        Where to count connections.
+    """
+
+    def __init__(self, pool: HTTPConnectionPool, stats: StatsCollector):
+        self.pool = pool
+        self.stats = stats
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.pool, name)
+
+    def getConnection(self, key: Any, endpoint: Any) -> Deferred[Any]:
+        """Get a cached connection, or open a new one.
+
+        Parameters
+        ----------
+        key : Any
+            The host key.
+        endpoint : Any
+            The endpoint to connect to.
+
+        Returns
+        -------
+        Deferred[Any]
+            The connection.
+        """
+        counting = CountingEndpoint(endpoint, self.stats)
+        # The pool only calls the endpoint's connect, which the wrapper has.
+        connection = self.pool.getConnection(key, counting)  # type: ignore[arg-type]
+        if not counting.opened:
+            self.stats.inc_value("downloader/connections_reused")
+        return connection
+
+
+class RosterDownloadHandler(HTTP11DownloadHandler):
+    """Keep connections to each county alive, and use HTTP/2 where enabled.
+
+    Every county is one host receiving many sequential requests, so reusing a
+    connection saves a TCP and TLS handshake per page. Connections are counted
+    in ``downloader/connections_opened`` and ``downloader/connections_reused``,
+    and responses that close the connection in
+    ``downloader/connections_closed_by_server``. Sites whose ``SHERIFF_SITES``
+    entry sets ``http2`` are fetched with Scrapy's HTTP/2 handler instead.
+
+    With ``DOWNLOAD_SHARED_POOL`` set, every crawl in the process uses one
+    HTTP/1.1 connection pool, which is left open when a crawl closes, so a
+    long-running process can reuse connections across crawls.
+
+    Parameters
+    ----------
+    settings : BaseSettings
+        The crawler settings.
+    crawler : Crawler
+        The crawler.
+    """
+
+    def __init__(self, settings: BaseSettings, crawler: Crawler):
+        super().__init__(settings, crawler)
+        assert crawler.stats
+        self.stats = crawler.stats
+        # Scrapy's pool keeps its own configuration; it is only wrapped.
+        pool = self._pool
+        self.shared_pool = settings.getbool("DOWNLOAD_SHARED_POOL")
+        if self.shared_pool:
+            pool = get_shared_pool(pool)
+        self._pool = CountingConnectionPool(pool, self.stats)  # type: ignore[assignment]
+        delay = settings.getfloat("DOWNLOAD_DELAY")
+        if delay >= pool.cachedConnectionTimeout:
+            logger.warning(
+                "DOWNLOAD_DELAY (%ss) is not shorter than the idle connection "
+                "timeout (%ss), so connections will not be reused.",
+                delay,
+                pool.cachedConnectionTimeout,
+            )
+        self.h2_hosts = {
+            urlparse(site["site"]).netloc
+            for site in settings.getdict("SHERIFF_SITES").values()
+            if site.get("http2")
+        }
+        self._h2_handler: Any = None
+
+    def download_request(self, request: Request, spider: Spider) -> Deferred[Response]:
+        """Download a request with the handler for its host.
+
+        Parameters
+        ----------
+        request : Request
+            The request.
+        spider : Spider
+            The spider.
+
+        Returns
+        -------
+        Deferred[Response]
+            The response.
+        """
+        parsed = urlparse_cached(request)
+        if parsed.scheme == "https" and parsed.netloc in self.h2_hosts:
+            h2: Deferred[Response] = self._get_h2_handler().download_request(
+                request, spider
+            )
+            return h2
+        deferred = super().download_request(request, spider)
+        deferred.addCallback(self._check_keep_alive)
+        return deferred
+
+    def close(self) -> Deferred[None]:
+        """Close cached connections for both handlers.
+
+        Connections in the shared pool are left open for the next crawl.
+
+        Returns
+        -------
+        Deferred[None]
+            Fires when HTTP/1.1 connections are closed.
+        """
+        if self._h2_handler is not None:
+            self._h2_handler.close()
+        if self.shared_pool:
+            return succeed(None)
+        return super().close()
+
+    def _get_h2_handler(self) -> Any:
+        """Create the HTTP/2 handler on first use, as it needs ``h2``."""
+        if self._h2_handler is None:
+            from scrapy.core.downloader.handlers.http2 import H2DownloadHandler
+
+            self._h2_handler = H2DownloadHandler.from_crawler(self._crawler)
+        return self._h2_handler
+
+    def _check_keep_alive(self, response: Response) -> Response:
+        """Count responses after which the server closes the connection."""
+        if (response.headers.get(b"Connection") or b"").lower() == b"close":
+            self.stats.inc_value("downloader/connections_closed_by_server")
+        return response
@@ -0,0 +1,82 @@
+"""Feed exporters specialized for booking items."""
+
+import operator
+from io import BytesIO
+from typing import Any
+
+from scrapy.exporters import CsvItemExporter
+
+from .items import BookingItem
+
+
+class BookingCsvItemExporter(CsvItemExporter):
+    """A CSV exporter with a fast path for ``BookingItem``.
+
+    Scrapy's exporter adapts every item and looks up each field's metadata
+    before serializing it. The fields of a ``BookingItem`` are known up front,
+    so its values are read with one ``operator.attrgetter`` call and left for
+    ``csv.writer`` to format in C: None as an empty string, datetimes with
+    ``str``, enums as their values, and floats with ``repr``. That is what the
+    generic path writes, so the output is byte for byte the same.
+
+    Rows are buffered and written ``batch_size`` at a time with ``writerows``.
+    Other items, or any item once ``fields_to_export`` is set to other fields,
+    such as those of an item exported first, use the generic path, after any
+    buffered rows.
+
+    Parameters
+    ----------
+    file : BytesIO
+        The output file.
+    batch_size : int
+        The number of rows to buffer between writes.
+    **kwargs : Any
+        Options for ``CsvItemExporter``.
+    """
+
+    fields: tuple[str, ...] = tuple(BookingItem.model_fields)
+    _values = operator.attrgetter(*fields)
+
+    def __init__(self, file: BytesIO, batch_size: int = 1000, **kwargs: Any):
+        super().__init__(file, **kwargs)
+        self.batch_size = batch_size
+        self._rows: list[tuple[Any, ...]] = []
+
+    def export_item(self, item: Any) -> None:
+        """Export an item.
+
+        Parameters
+        ----------
+        item : Any
+            The item to export.
+        """
+        if type(item) is not BookingItem or not self._exports_all_fields():
+            self._flush()
+            super().export_item(item)
+            return
+        if self._headers_not_written:
+            self._headers_not_written = False
+            self.fields_to_export = list(self.fields)
+            if self.include_headers_line:
+                self.csv_writer.writerow(self.fields)
+        self._rows.append(self._values(item))
+        if len(self._rows) >= self.batch_size:
+            self._flush()
+
+    def _exports_all_fields(self) -> bool:
+        """Check whether the columns are, or can still be, every field."""
+        fields = self.fields_to_export
+        return fields is None or (
+            isinstance(fields, (list, tuple)) and tuple(fields) == self.fields
+        )
+
+    def finish_exporting(self) -> None:
+        """Write any buffered rows and release the file."""
+        self._flush()
+        super().finish_exporting()
+
+    def _flush(self) -> None:
+        """Write the buffered rows."""
+        if self._rows:
+            self.csv_writer.writerows(self._rows)
+            self._rows.clear()
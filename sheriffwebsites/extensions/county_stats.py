@@ -0,0 +1,444 @@
+"""Record per-county crawl performance statistics."""
+
+import json
+import random
+import statistics
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Self
+
+from scrapy import signals
+from scrapy.crawler import Crawler
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Request, Response
+from twisted.internet.interfaces import IListeningPort
+from twisted.web.resource import Resource
+from twisted.web.server import Request as WebRequest
+from twisted.web.server import Site
+
+from sheriffwebsites.parsing import DetailResult, PageResult, ParseResult
+from sheriffwebsites.signals import response_parsed
+
+PROMETHEUS_PREFIX = "sheriffwebsites_county_"
+# Summary statistics that only ever increase, exported as Prometheus counters.
+PROMETHEUS_COUNTERS = frozenset(
+    {"pages", "details", "bytes", "decode_time", "validate_time", "fallbacks", "items"}
+)
+LATENCY_SAMPLES = 1024
+
+
+def percentile(values: list[float], pct: int) -> float | None:
+    """Compute a percentile of a list of values.
+
+    Parameters
+    ----------
+    values : list[float]
+        The observed values.
+    pct : int
+        The percentile, from 1 to 99.
+
+    Returns
+    -------
+    float | None
+        The percentile, or None if there are no values.
+    """
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+def add_sample(samples: list[float], seen: int, value: float) -> None:
+    """Add a value to a uniform reservoir sample of ``LATENCY_SAMPLES``.
+
+    Parameters
+    ----------
+    samples : list[float]
+        The reservoir.
+    seen : int
+        The number of values observed, including this one.
+    value : float
+        The new value.
+    """
+    if len(samples) < LATENCY_SAMPLES:
+        samples.append(value)
+        return
+    index = random.randrange(seen)
+    if index < LATENCY_SAMPLES:
+        samples[index] = value
+
+
+@dataclass
+class CountyCounters:
+    """Running performance counters for one county.
+
+    Attributes
+    ----------
+    pages : int
+        Results pages parsed.
+    details : int
+        Detail responses parsed.
+    bytes : int
+        Response bytes received from the network, before decompression.
+    latencies : list[float]
+        A uniform sample of at most ``LATENCY_SAMPLES`` download latencies,
+        in seconds.
+    latency_count : int
+        The number of latencies observed.
+    decode_time : float
+        Seconds spent decoding JSON.
+    validate_time : float
+        Seconds spent validating bookings.
+    rows : int
+        Bookings found on results pages.
+    fallbacks : int
+        Bookings that needed a detail request.
+    items : int
+        Items scraped.
+    item_latencies : list[float]
+        A uniform sample of at most ``LATENCY_SAMPLES`` item latencies: the
+        seconds from a booking's results page arriving to its item being
+        scraped.
+    item_latency_count : int
+        The number of item latencies observed.
+    """
+
+    pages: int = 0
+    details: int = 0
+    bytes: int = 0
+    latencies: list[float] = field(default_factory=list)
+    latency_count: int = 0
+    decode_time: float = 0.0
+    validate_time: float = 0.0
+    rows: int = 0
+    fallbacks: int = 0
+    items: int = 0
+    item_latencies: list[float] = field(default_factory=list)
+    item_latency_count: int = 0
+
+    def add_latency(self, latency: float) -> None:
+        """Add a latency to the reservoir sample.
+
+        Parameters
+        ----------
+        latency : float
+            The download latency in seconds.
+        """
+        self.latency_count += 1
+        add_sample(self.latencies, self.latency_count, latency)
+
+    def add_item_latency(self, latency: float) -> None:
+        """Add an item latency to its reservoir sample.
+
+        Parameters
+        ----------
+        latency : float
+            The item latency in seconds.
+        """
+        self.item_latency_count += 1
+        add_sample(self.item_latencies, self.item_latency_count, latency)
+
+    def summary(self) -> dict[str, int | float | None]:
+        """Summarize the counters.
+
+        Returns
+        -------
+        dict[str, int | float | None]
+            The summary statistics.
+        """
+        return {
+            "pages": self.pages,
+            "details": self.details,
+            "bytes": self.bytes,
+            "latency_p50": percentile(self.latencies, 50),
+            "latency_p90": percentile(self.latencies, 90),
+            "latency_p99": percentile(self.latencies, 99),
+            "decode_time": self.decode_time,
+            "validate_time": self.validate_time,
+            "fallback_rate": self.fallbacks / self.rows if self.rows else 0.0,
+            "fallbacks": self.fallbacks,
+            "items": self.items,
+            "item_latency_p50": percentile(self.item_latencies, 50),
+            "item_latency_p90": percentile(self.item_latencies, 90),
+        }
+
+
+class CountyStats:
+    """Record page counts, bytes, latencies, and parse costs per county.
+
+    Validation failures are counted in the crawl stats as
+    ``validation/<county>/<soft|fallback>/<field>/<error type>``. Summary
+    statistics are added under ``county_stats/``, and optionally written to
+    ``COUNTY_STATS_FILE`` as JSON when the spider closes. If
+    ``COUNTY_STATS_PROMETHEUS_PORT`` is set, a Prometheus text endpoint is
+    served on that port for the duration of the crawl.
+
+    The scheduler queue depth, the number of requests enqueued but not yet
+    dequeued, is sampled as each response arrives. Its peak is recorded as
+    ``scheduler/depth_max``, and its current value is served as a gauge.
+
+    Parameters
+    ----------
+    crawler : Crawler
+        The crawler.
+
+    Raises
+    ------
+    NotConfigured
+        Raised if the extension is disabled.
+    """
+
+    def __init__(self, crawler: Crawler):
+        if not crawler.settings.getbool("COUNTY_STATS_ENABLED"):
+            raise NotConfigured
+        self.crawler = crawler
+        self.output_file = crawler.settings.get("COUNTY_STATS_FILE")
+        self.prometheus_port = crawler.settings.getint("COUNTY_STATS_PROMETHEUS_PORT")
+        self.counties: dict[str, CountyCounters] = {}
+        self.queue_depth = 0
+        self._port: IListeningPort | None = None
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> Self:
+        """Create the extension and connect its signals.
+
+        Parameters
+        ----------
+        crawler : Crawler
+            The crawler.
+
+        Returns
+        -------
+        Self
+            The extension.
+        """
+        extension = cls(crawler)
+        crawler.signals.connect(extension.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(extension.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(
+            extension.response_received, signal=signals.response_received
+        )
+        crawler.signals.connect(extension.bytes_received, signal=signals.bytes_received)
+        crawler.signals.connect(extension.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(extension.response_parsed, signal=response_parsed)
+        return extension
+
+    def counters(self, county: str) -> CountyCounters:
+        """Get the counters for a county.
+
+        Parameters
+        ----------
+        county : str
+            The county.
+
+        Returns
+        -------
+        CountyCounters
+            The county's counters.
+        """
+        if county not in self.counties:
+            self.counties[county] = CountyCounters()
+        return self.counties[county]
+
+    def bytes_received(self, data: bytes, request: Request) -> None:
+        """Record raw body bytes as they arrive from the network.
+
+        Parameters
+        ----------
+        data : bytes
+            A chunk of the undecompressed response body.
+        request : Request
+            The request being downloaded.
+        """
+        county = request.cb_kwargs.get("county")
+        if county is not None:
+            self.counters(county).bytes += len(data)
+
+    def response_received(self, response: Response, request: Request) -> None:
+        """Record the download latency for a county response.
+
+        Parameters
+        ----------
+        response : Response
+            The downloaded response.
+        request : Request
+            The request that produced it.
+        """
+        stats = self.crawler.stats
+        assert stats
+        self.queue_depth = stats.get_value("scheduler/enqueued", 0) - stats.get_value(
+            "scheduler/dequeued", 0
+        )
+        stats.max_value("scheduler/depth_max", self.queue_depth)
+        county = request.cb_kwargs.get("county")
+        latency = request.meta.get("download_latency")
+        if county is not None and latency is not None:
+            self.counters(county).add_latency(latency)
+
+    def response_parsed(self, county: str, result: ParseResult) -> None:
+        """Record parsing costs and validation failures for a county response.
+
+        Parameters
+        ----------
+        county : str
+            The county.
+        result : ParseResult
+            The parsed response.
+        """
+        counters = self.counters(county)
+        counters.decode_time += result.decode_time
+        counters.validate_time += result.validate_time
+        if isinstance(result, PageResult):
+            counters.pages += 1
+            counters.rows += len(result.items) + len(result.failed)
+            counters.fallbacks += len(result.failed)
+        elif isinstance(result, DetailResult):
+            counters.details += 1
+        stats = self.crawler.stats
+        assert stats
+        for kind, failures in (
+            ("soft", result.soft_failures),
+            ("fallback", result.fallback_failures),
+        ):
+            for (field_name, error_type), count in failures.items():
+                stats.inc_value(
+                    f"validation/{county}/{kind}/{field_name}/{error_type}", count
+                )
+
+    def item_scraped(self, item: Any, response: Response | None = None) -> None:
+        """Count a scraped item and record its latency.
+
+        Parameters
+        ----------
+        item : Any
+            The scraped item.
+        response : Response | None
+            The response the item was scraped from.
+        """
+        if isinstance(item, dict):
+            county = item.get("county")
+        else:
+            county = getattr(item, "county", None)
+        if county is None:
+            return
+        counters = self.counters(county)
+        counters.items += 1
+        discovered_at = response.meta.get("discovered_at") if response else None
+        if discovered_at is not None:
+            counters.add_item_latency(time.monotonic() - discovered_at)
+
+    def summary(self) -> dict[str, dict[str, int | float | None]]:
+        """Summarize the counters for every county.
+
+        Returns
+        -------
+        dict[str, dict[str, int | float | None]]
+            Summary statistics keyed by county.
+        """
+        return {
+            county: counters.summary()
+            for county, counters in sorted(self.counties.items())
+        }
+
+    def spider_opened(self) -> None:
+        """Start the Prometheus endpoint, if configured."""
+        if self.prometheus_port:
+            from twisted.internet import reactor
+
+            self._port = reactor.listenTCP(  # type: ignore[attr-defined]
+                self.prometheus_port,
+                Site(MetricsResource(self)),  # type: ignore[no-untyped-call]
+            )
+
+    def spider_closed(self) -> None:
+        """Publish the summary to the crawl stats and the output file."""
+        assert self.crawler.stats
+        summary = self.summary()
+        for county, stats in summary.items():
+            for key, value in stats.items():
+                if value is not None:
+                    self.crawler.stats.set_value(f"county_stats/{county}/{key}", value)
+        if self.output_file:
+            Path(self.output_file).write_text(json.dumps(summary, indent=2))
+        if self._port is not None:
+            self._port.stopListening()  # type: ignore[misc]
+            self._port = None
+
+
+class MetricsResource(Resource):
+    """Serve county statistics in the Prometheus text format.
+
+    Parameters
+    ----------
+    extension : CountyStats
+        The extension holding the statistics.
+    """
+
+    isLeaf = True
+
+    def __init__(self, extension: CountyStats):
+        super().__init__()  # type: ignore[no-untyped-call]
+        self.extension = extension
+
+    def render_GET(self, request: WebRequest) -> bytes:
+        """Render the current statistics.
+
+        Parameters
+        ----------
+        request : WebRequest
+            The HTTP request.
+
+        Returns
+        -------
+        bytes
+            The metrics in the Prometheus text format.
+        """
+        request.setHeader(  # type: ignore[no-untyped-call]
+            b"content-type", b"text/plain; version=0.0.4"
+        )
+        return render_prometheus(
+            self.extension.summary(), self.extension.queue_depth
+        ).encode()
+
+
+def render_prometheus(
+    summary: dict[str, dict[str, int | float | None]], queue_depth: int | None = None
+) -> str:
+    """Render county statistics in the Prometheus text format.
+
+    Statistics in ``PROMETHEUS_COUNTERS`` are exported as counters, with the
+    ``_total`` suffix, and the rest as gauges.
+
+    Parameters
+    ----------
+    summary : dict[str, dict[str, int | float | None]]
+        Summary statistics keyed by county.
+    queue_depth : int | None
+        The scheduler queue depth, if known.
+
+    Returns
+    -------
+    str
+        The metrics text.
+    """
+    metrics: dict[tuple[str, str], list[str]] = {}
+    for county, stats in summary.items():
+        for key, value in stats.items():
+            if value is not None:
+                name = PROMETHEUS_PREFIX + key
+                kind = "counter" if key in PROMETHEUS_COUNTERS else "gauge"
+                if kind == "counter":
+                    name += "_total"
+                metrics.setdefault((name, kind), []).append(
+                    f'{name}{{county="{county}"}} {value}'
+                )
+    lines = []
+    if queue_depth is not None:
+        lines.append("# TYPE sheriffwebsites_queue_depth gauge")
+        lines.append(f"sheriffwebsites_queue_depth {queue_depth}")
+    for (name, kind), samples in metrics.items():
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
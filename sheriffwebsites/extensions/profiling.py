@@ -0,0 +1,236 @@
+"""Profile a sample of spider callbacks and item exports per county."""
+
+import cProfile
+import functools
+import inspect
+import io
+import logging
+import pstats
+import random
+from collections.abc import AsyncIterator, Callable
+from pathlib import Path
+from typing import Any, Self
+
+from scrapy import Request, Spider, signals
+from scrapy.crawler import Crawler
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Response
+
+from sheriffwebsites.offload import run_inline
+
+logger = logging.getLogger(__name__)
+
+
+class CallbackProfiler:
+    """Profile a fraction of county callbacks and scraped items with cProfile.
+
+    A sampled callback is profiled while each step of its output is produced,
+    and its parsing runs inline so that decoding and validation are included
+    without the callback waiting on another thread. A sampled item is profiled
+    while ``item_scraped`` handlers, such as feed export, process it; this
+    needs the extension to load before ``FeedExporter``, so give it a negative
+    order in ``EXTENSIONS``.
+
+    Profiles are merged per county and written to ``PROFILE_DIR`` as
+    ``<county>.prof`` when the spider closes, along with ``summary.txt``, the
+    ``PROFILE_TOP`` functions with the most cumulative time. When
+    ``PROFILE_ENABLED`` is false the extension is not loaded at all.
+
+    Parameters
+    ----------
+    crawler : Crawler
+        The crawler.
+
+    Raises
+    ------
+    NotConfigured
+        Raised if profiling is disabled.
+    """
+
+    def __init__(self, crawler: Crawler):
+        if not crawler.settings.getbool("PROFILE_ENABLED"):
+            raise NotConfigured
+        self.crawler = crawler
+        self.sample_rate = crawler.settings.getfloat("PROFILE_SAMPLE_RATE", 0.05)
+        self.output_dir = Path(crawler.settings.get("PROFILE_DIR", "profiles"))
+        self.top = crawler.settings.getint("PROFILE_TOP", 30)
+        self.stats: dict[str, pstats.Stats] = {}
+        self._item_profile: tuple[str, cProfile.Profile] | None = None
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> Self:
+        """Create the extension and connect its signals.
+
+        Parameters
+        ----------
+        crawler : Crawler
+            The crawler.
+
+        Returns
+        -------
+        Self
+            The extension.
+        """
+        extension = cls(crawler)
+        # Connected now, so this runs before later extensions' handlers, and
+        # item_exported at spider open, so it runs after them.
+        crawler.signals.connect(extension.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(extension.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(extension.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(
+            extension.response_received, signal=signals.response_received
+        )
+        return extension
+
+    def spider_opened(self, spider: Spider) -> None:
+        """Start listening for the end of item processing.
+
+        Parameters
+        ----------
+        spider : Spider
+            The spider.
+        """
+        self.crawler.signals.connect(self.item_exported, signal=signals.item_scraped)
+
+    def response_received(self, response: Response, request: Request) -> None:
+        """Decide whether to profile the callback for a county response.
+
+        Requests are wrapped only once dequeued, so queued requests still
+        serialize with their original callbacks.
+
+        Parameters
+        ----------
+        response : Response
+            The downloaded response.
+        request : Request
+            The request that produced it.
+        """
+        county = request.cb_kwargs.get("county")
+        callback = request.callback
+        if (
+            county is None
+            or not inspect.isasyncgenfunction(callback)
+            or random.random() >= self.sample_rate
+        ):
+            return
+        request.callback = functools.partial(self.profile_callback, callback)
+
+    async def profile_callback(
+        self,
+        callback: Callable[..., AsyncIterator[Any]],
+        response: Response,
+        **kwargs: Any,
+    ) -> AsyncIterator[Any]:
+        """Run a callback, profiling each step of its output.
+
+        Parameters
+        ----------
+        callback : Callable[..., AsyncIterator[Any]]
+            The spider callback.
+        response : Response
+            The response.
+        **kwargs : Any
+            The request's callback keyword arguments, including its county.
+
+        Yields
+        ------
+        Any
+            The callback's output.
+        """
+        profile = cProfile.Profile()
+        output = callback(response, **kwargs)
+        try:
+            while True:
+                token = run_inline.set(True)
+                enabled = self._enable(profile)
+                try:
+                    result = await output.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    if enabled:
+                        profile.disable()
+                    run_inline.reset(token)
+                yield result
+        finally:
+            self._add(kwargs["county"], profile)
+            assert self.crawler.stats
+            self.crawler.stats.inc_value("profile/callbacks")
+
+    def item_scraped(self, item: Any) -> None:
+        """Start profiling a sampled item's processing.
+
+        Parameters
+        ----------
+        item : Any
+            The scraped item.
+        """
+        if random.random() >= self.sample_rate:
+            return
+        if isinstance(item, dict):
+            county = item.get("county")
+        else:
+            county = getattr(item, "county", None)
+        profile = cProfile.Profile()
+        if county is not None and self._enable(profile):
+            self._item_profile = (county, profile)
+
+    def item_exported(self, item: Any) -> None:
+        """Stop profiling an item once every other handler has run.
+
+        Parameters
+        ----------
+        item : Any
+            The scraped item.
+        """
+        if self._item_profile is None:
+            return
+        county, profile = self._item_profile
+        profile.disable()
+        self._item_profile = None
+        self._add(county, profile)
+        assert self.crawler.stats
+        self.crawler.stats.inc_value("profile/items")
+
+    def spider_closed(self, spider: Spider) -> None:
+        """Write the per-county profiles and the summary.
+
+        Parameters
+        ----------
+        spider : Spider
+            The spider.
+        """
+        if not self.stats:
+            return
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for county, stats in self.stats.items():
+            stats.dump_stats(self.output_dir / f"{county}.prof")
+        summary = io.StringIO()
+        combined = pstats.Stats(stream=summary)
+        combined.add(*self.stats.values())
+        combined.sort_stats("cumulative").print_stats(self.top)
+        (self.output_dir / "summary.txt").write_text(summary.getvalue())
+        logger.info(
+            "Wrote profiles for %d counties to %s", len(self.stats), self.output_dir
+        )
+
+    def _add(self, county: str, profile: cProfile.Profile) -> None:
+        """Merge a profile into its county's stats."""
+        try:
+            if county in self.stats:
+                self.stats[county].add(profile)
+            else:
+                self.stats[county] = pstats.Stats(profile)
+        except TypeError:
+            # Raised by pstats for a profile that recorded no calls.
+            pass
+
+    @staticmethod
+    def _enable(profile: cProfile.Profile) -> bool:
+        """Start a profile, unless another profiler is active."""
+        try:
+            profile.enable()
+        except ValueError:
+            logger.debug("Skipping a profile sample: another profiler is active.")
+            return False
+        return True
@@ -1,15 +1,104 @@
 """Store scraped items as a CSV in Azure blob storage."""
 
+import logging
 import os
-from typing import Any
+import threading
+import time
+from typing import IO, Any, Self
 from urllib.parse import urlparse
 
+from scrapy.crawler import Crawler
 from scrapy.extensions.feedexport import BlockingFeedStorage
+from twisted.internet.defer import Deferred
+from twisted.internet.threads import deferToThreadPool
+from twisted.python.threadpool import ThreadPool
+
+logger = logging.getLogger(__name__)
+
+# Large feeds are uploaded one block at a time, so memory use is bounded by
+# the block size rather than the size of the feed.
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+
+# Shared by every feed in the process, so batches reuse connections and the
+# number of concurrent uploads stays bounded.
+_services: dict[tuple[str | None, ...], Any] = {}
+_upload_pool: ThreadPool | None = None
+_lock = threading.Lock()
+
+
+def get_upload_pool(size: int) -> ThreadPool:
+    """Get the shared upload thread pool, starting it on first use.
+
+    The pool is stopped when the reactor shuts down.
+
+    Parameters
+    ----------
+    size : int
+        The most uploads to run at once. Only the first call sets it.
+
+    Returns
+    -------
+    ThreadPool
+        The running pool.
+    """
+    global _upload_pool
+    with _lock:
+        if _upload_pool is None:
+            from twisted.internet import reactor
+
+            _upload_pool = ThreadPool(
+                minthreads=0, maxthreads=size, name="azure-upload"
+            )
+            _upload_pool.start()
+            reactor.addSystemEventTrigger(  # type: ignore[attr-defined]
+                "during", "shutdown", _upload_pool.stop
+            )
+        return _upload_pool
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Check whether an upload error may succeed on a later attempt.
+
+    Parameters
+    ----------
+    exc : Exception
+        The error.
+
+    Returns
+    -------
+    bool
+        True for connection errors, throttling, and server errors.
+    """
+    from azure.core.exceptions import (
+        HttpResponseError,
+        ServiceRequestError,
+        ServiceResponseError,
+    )
+
+    if isinstance(exc, HttpResponseError) and not isinstance(exc, ServiceResponseError):
+        return exc.status_code is not None and (
+            exc.status_code == 429 or exc.status_code >= 500
+        )
+    return isinstance(exc, (ServiceRequestError, ServiceResponseError, OSError))
 
 
 class AzureBlobFeedStorage(BlockingFeedStorage):
     """Store items in Azure blob storage.
 
+    Setting the ``local_dir`` feed option, or the
+    ``AZURE_STORAGE_LOCAL_DIR`` environment variable, stores blobs under a
+    local directory with ``LocalBlobService`` instead of Azure.
+
+    Feeds no larger than the ``block_size`` feed option are uploaded in one
+    request. Larger feeds are read from the temporary file into a reusable
+    buffer and staged block by block, so only one block is held in memory.
+
+    When built by a crawler, uploads run in a shared pool of
+    ``AZURE_UPLOAD_THREADS`` threads, so batches upload in parallel while the
+    crawl continues, and failed uploads are retried ``AZURE_UPLOAD_RETRIES``
+    times with exponential backoff. ``FeedExporter`` waits for every pending
+    upload before the spider finishes closing.
+
     Parameters
     ----------
     uri : str
@@ -34,30 +123,124 @@ class AzureBlobFeedStorage(BlockingFeedStorage):
         self.container = parsed.netloc
         self.blob_path = parsed.path.lstrip("/")
         self.feed_options = feed_options or {}
+        # Only this storage reads the environment, so load .env here rather
+        # than on every settings import.
+        from dotenv import load_dotenv
+
+        load_dotenv()
         self._account_url = self.feed_options.get("account_url") or os.getenv(
             "AZURE_STORAGE_ACCOUNT_URL"
         )
         self._connection_string = self.feed_options.get(
             "connection_string"
         ) or os.getenv("AZURE_STORAGE_CONNECTION_STRING")
+        self._local_dir = self.feed_options.get("local_dir") or os.getenv(
+            "AZURE_STORAGE_LOCAL_DIR"
+        )
+        self.block_size = int(self.feed_options.get("block_size", DEFAULT_BLOCK_SIZE))
+        self.pool: ThreadPool | None = None
+        self.retries = 0
+        self.backoff = 0.0
 
-    def _get_service(self):
-        """Get the Azure Blob Service client."""
-        from azure.identity import DefaultAzureCredential
+    @classmethod
+    def from_crawler(
+        cls, crawler: Crawler, uri: str, *, feed_options: dict[str, Any] | None = None
+    ) -> Self:
+        """Create a storage that uploads in the shared pool.
+
+        Parameters
+        ----------
+        crawler : Crawler
+            The crawler.
+        uri : str
+            The URI for the feed.
+        feed_options : dict[str, Any] | None
+            Feed-specific options, if any.
+
+        Returns
+        -------
+        Self
+            The storage.
+        """
+        storage = cls(uri, feed_options=feed_options)
+        storage.retries = crawler.settings.getint("AZURE_UPLOAD_RETRIES", 3)
+        storage.backoff = crawler.settings.getfloat("AZURE_UPLOAD_BACKOFF", 1.0)
+        storage.pool = get_upload_pool(
+            crawler.settings.getint("AZURE_UPLOAD_THREADS", 4)
+        )
+        return storage
+
+    def store(self, file: IO[bytes]) -> Deferred[None] | None:
+        """Upload the feed in the upload pool, or Twisted's default pool.
+
+        Parameters
+        ----------
+        file : IO[bytes]
+            The finished feed file.
+
+        Returns
+        -------
+        Deferred[None] | None
+            Fires when the upload finishes.
+        """
+        if self.pool is None:
+            return super().store(file)
+        from twisted.internet import reactor
+
+        return deferToThreadPool(
+            reactor,  # type: ignore[arg-type]
+            self.pool,
+            self._store_with_retries,
+            file,
+        )
+
+    def _store_with_retries(self, file: IO[bytes]) -> None:
+        """Upload the feed, retrying errors that may be transient."""
+        for attempt in range(self.retries + 1):
+            try:
+                self._store_in_thread(file)
+                return
+            except Exception as exc:
+                if attempt == self.retries or not is_retryable(exc):
+                    raise
+                delay = self.backoff * 2**attempt
+                logger.warning(
+                    "Upload of %s failed (%r); retrying in %.1fs",
+                    self.blob_path,
+                    exc,
+                    delay,
+                )
+                time.sleep(delay)
+
+    def _get_service(self) -> Any:
+        """Get the shared client for this storage's account."""
+        key = (self._local_dir, self._connection_string, self._account_url)
+        with _lock:
+            if key not in _services:
+                _services[key] = self._create_service()
+            return _services[key]
+
+    def _create_service(self) -> Any:
+        """Create the Azure Blob Service client."""
+        if self._local_dir:
+            from .local_blob import LocalBlobService
+
+            return LocalBlobService(self._local_dir)
         from azure.storage.blob import BlobServiceClient
 
-        credential = DefaultAzureCredential()
         if self._connection_string:
             return BlobServiceClient.from_connection_string(self._connection_string)
         if not self._account_url:
             raise RuntimeError(
                 "account_url or connection_string are required for MSI auth"
             )
-        return BlobServiceClient(account_url=self._account_url, credential=credential)
+        from azure.identity import DefaultAzureCredential
 
-    def _store_in_thread(self, file):
-        file.seek(0)
-        data = file.read()
+        return BlobServiceClient(
+            account_url=self._account_url, credential=DefaultAzureCredential()
+        )
+
+    def _store_in_thread(self, file: IO[bytes]) -> None:
         from azure.storage.blob import ContentSettings
 
         content_settings = ContentSettings(content_type="text/csv; charset=utf-8")
@@ -68,4 +251,30 @@ class AzureBlobFeedStorage(BlockingFeedStorage):
         except:  # noqa E722
             pass
         blob = service.get_blob_client(self.container, self.blob_path)
-        blob.upload_blob(data, overwrite=True, content_settings=content_settings)
+        size = file.seek(0, os.SEEK_END)
+        file.seek(0)
+        if size <= self.block_size:
+            blob.upload_blob(
+                file.read(), overwrite=True, content_settings=content_settings
+            )
+        else:
+            self._upload_blocks(blob, file, content_settings)
+
+    def _upload_blocks(self, blob: Any, file: IO[bytes], content_settings: Any) -> None:
+        """Stage a file block by block, then commit the blocks in order.
+
+        Each block is staged before the next is read, so a slow upload holds
+        back reading rather than letting blocks pile up in memory.
+        """
+        from azure.storage.blob import BlobBlock
+
+        buffer = bytearray(self.block_size)
+        view = memoryview(buffer)
+        blocks: list[BlobBlock] = []
+        # Feeds are spooled to buffered files, which IO does not declare
+        # readinto for.
+        while size := file.readinto(buffer):  # type: ignore[attr-defined]
+            block_id = f"{len(blocks):08d}"
+            blob.stage_block(block_id, bytes(view[:size]))
+            blocks.append(BlobBlock(block_id))
+        blob.commit_block_list(blocks, content_settings=content_settings)
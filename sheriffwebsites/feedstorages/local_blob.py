@@ -0,0 +1,215 @@
+"""Emulate the parts of Azure Blob Storage used by the feed storage on disk."""
+
+import json
+import os
+import shutil
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO
+from urllib.parse import quote
+
+from sheriffwebsites.checkpoint import atomic_write_json
+
+
+class LocalBlobService:
+    """Map containers and blobs to directories and files under a root.
+
+    Implements the subset of ``BlobServiceClient`` that
+    ``AzureBlobFeedStorage`` uses, so ``az://`` feeds can be written and
+    benchmarked without Azure or Azurite.
+
+    Parameters
+    ----------
+    root : str | os.PathLike[str]
+        The directory holding one subdirectory per container.
+    """
+
+    def __init__(self, root: str | os.PathLike[str]):
+        self.root = Path(root)
+
+    def get_container_client(self, container: str) -> "LocalContainer":
+        """Get a container.
+
+        Parameters
+        ----------
+        container : str
+            The container name.
+
+        Returns
+        -------
+        LocalContainer
+            The container.
+        """
+        return LocalContainer(self.root / container)
+
+    def get_blob_client(self, container: str, blob: str) -> "LocalBlob":
+        """Get a blob.
+
+        Parameters
+        ----------
+        container : str
+            The container name.
+        blob : str
+            The blob path within the container.
+
+        Returns
+        -------
+        LocalBlob
+            The blob.
+        """
+        return LocalBlob(self.root / container, blob)
+
+
+class LocalContainer:
+    """A container stored as a directory.
+
+    Parameters
+    ----------
+    path : Path
+        The container directory.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def create_container(self, **kwargs: Any) -> None:
+        """Create the container directory.
+
+        Parameters
+        ----------
+        **kwargs : Any
+            Ignored, for compatibility with ``ContainerClient``.
+
+        Raises
+        ------
+        FileExistsError
+            Raised if the container exists, as Azure raises
+            ``ResourceExistsError``.
+        """
+        self.path.mkdir(parents=True)
+
+
+class LocalBlob:
+    """A blob stored as a file, with its content settings in a sidecar.
+
+    Blobs only appear once complete: uploads and block lists are written to a
+    temporary file beside the blob and renamed into place. Staged blocks are
+    kept under ``.blocks/`` and content settings under ``.metadata/``.
+
+    Parameters
+    ----------
+    container : Path
+        The container directory.
+    blob : str
+        The blob path within the container.
+    """
+
+    def __init__(self, container: Path, blob: str):
+        self.container = container
+        self.path = container / blob
+        self.blocks_dir = container / ".blocks" / quote(blob, safe="")
+        self.metadata_path = container / ".metadata" / f"{quote(blob, safe='')}.json"
+
+    def exists(self) -> bool:
+        """Check whether the blob has been committed.
+
+        Returns
+        -------
+        bool
+            Whether the blob exists.
+        """
+        return self.path.is_file()
+
+    def get_blob_properties(self) -> dict[str, Any]:
+        """Get the blob's size and content settings.
+
+        Returns
+        -------
+        dict[str, Any]
+            The ``size`` and ``content_settings`` of the blob.
+        """
+        return {
+            "size": self.path.stat().st_size,
+            "content_settings": json.loads(self.metadata_path.read_text()),
+        }
+
+    def upload_blob(
+        self, data: bytes, overwrite: bool = False, content_settings: Any = None
+    ) -> None:
+        """Write the blob in one piece.
+
+        Parameters
+        ----------
+        data : bytes
+            The blob contents.
+        overwrite : bool
+            Whether to replace an existing blob.
+        content_settings : Any
+            A ``ContentSettings``, or None.
+
+        Raises
+        ------
+        FileExistsError
+            Raised if the blob exists and ``overwrite`` is false.
+        """
+        if not overwrite and self.exists():
+            raise FileExistsError(f"Blob {self.path} already exists.")
+        with self._replace() as file:
+            file.write(data)
+        self._write_metadata(content_settings)
+
+    def stage_block(self, block_id: str, data: bytes) -> None:
+        """Save an uncommitted block.
+
+        Parameters
+        ----------
+        block_id : str
+            The block ID.
+        data : bytes
+            The block contents.
+        """
+        self.blocks_dir.mkdir(parents=True, exist_ok=True)
+        (self.blocks_dir / quote(block_id, safe="")).write_bytes(data)
+
+    def commit_block_list(
+        self, blocks: list[Any], content_settings: Any = None
+    ) -> None:
+        """Replace the blob with staged blocks, in order.
+
+        Parameters
+        ----------
+        blocks : list[Any]
+            ``BlobBlock`` objects, or anything with an ``id``.
+        content_settings : Any
+            A ``ContentSettings``, or None.
+        """
+        with self._replace() as file:
+            for block in blocks:
+                with open(self.blocks_dir / quote(block.id, safe=""), "rb") as staged:
+                    shutil.copyfileobj(staged, file)
+        self._write_metadata(content_settings)
+        # Like Azure, committing discards every uncommitted block.
+        shutil.rmtree(self.blocks_dir, ignore_errors=True)
+
+    @contextmanager
+    def _replace(self) -> Iterator[BinaryIO]:
+        """Open a temporary file that replaces the blob on a clean exit."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                yield file
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _write_metadata(self, content_settings: Any) -> None:
+        """Save the content settings next to the blob."""
+        fields = ("content_type", "content_encoding", "content_language")
+        atomic_write_json(
+            self.metadata_path,
+            {field: getattr(content_settings, field, None) for field in fields},
+        )
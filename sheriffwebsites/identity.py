@@ -0,0 +1,317 @@
+"""Link bookings of the same person across counties.
+
+A ``person_id`` is only unique within its county. ``IdentityIndex`` gives
+every county person a stable cross-county person number, kept in SQLite so
+it can be updated after each crawl. Candidates are only compared within a
+block of people sharing a normalized last name, birth date and first
+initial, so linking is roughly linear in the number of bookings.
+
+Run ``python -m sheriffwebsites.identity --help`` for the command line.
+"""
+
+import argparse
+import csv
+import datetime as dt
+import os
+import re
+import sqlite3
+import sys
+import unicodedata
+from collections.abc import Iterable, Iterator, Mapping
+from functools import lru_cache
+from itertools import islice
+from types import TracebackType
+from typing import Any, Self
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS people (id INTEGER PRIMARY KEY AUTOINCREMENT);
+CREATE TABLE IF NOT EXISTS members (
+    county TEXT NOT NULL,
+    person_id TEXT NOT NULL,
+    person INTEGER NOT NULL REFERENCES people (id),
+    block TEXT,
+    first_name TEXT,
+    PRIMARY KEY (county, person_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS members_block ON members (block);
+CREATE INDEX IF NOT EXISTS members_person ON members (person);
+"""
+
+NAME_SUFFIXES = frozenset({"JR", "SR", "II", "III", "IV"})
+NON_LETTERS = re.compile(r"[^A-Z ]")
+
+
+@lru_cache(maxsize=65536)
+def normalize_name(name: str | None) -> str:
+    """Normalize a name for comparison.
+
+    Accents, punctuation and generational suffixes are removed, and letters
+    are upper-cased, so ``"O'Neal Jr."`` becomes ``"ONEAL"``.
+
+    Parameters
+    ----------
+    name : str | None
+        The name.
+
+    Returns
+    -------
+    str
+        The normalized name, or an empty string.
+    """
+    if not name:
+        return ""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore")
+    words = NON_LETTERS.sub("", ascii_name.decode().upper()).split()
+    while len(words) > 1 and words[-1] in NAME_SUFFIXES:
+        words.pop()
+    return "".join(words)
+
+
+def blocking_key(booking: Mapping[str, Any]) -> str | None:
+    """Get the block of people a booking's person may be linked within.
+
+    Parameters
+    ----------
+    booking : Mapping[str, Any]
+        A booking with ``first_name``, ``last_name`` and ``birth_date``.
+        The birth date may be a datetime or an exported date string.
+
+    Returns
+    -------
+    str | None
+        The last name, birth date and first initial, or None if any is
+        missing, in which case the person is never linked.
+    """
+    last_name = normalize_name(booking.get("last_name"))
+    first_name = normalize_name(booking.get("first_name"))
+    birth_date = booking.get("birth_date")
+    if isinstance(birth_date, dt.datetime):
+        birth_date = birth_date.strftime("%Y-%m-%d")
+    elif birth_date:
+        birth_date = str(birth_date)[:10]
+    if not (last_name and first_name and birth_date):
+        return None
+    return f"{last_name}|{birth_date}|{first_name[0]}"
+
+
+def names_compatible(first: str, second: str) -> bool:
+    """Check whether two normalized first names may be the same person's.
+
+    Parameters
+    ----------
+    first : str
+        A normalized first name.
+    second : str
+        Another normalized first name.
+
+    Returns
+    -------
+    bool
+        Whether one name equals or abbreviates the other.
+    """
+    return first.startswith(second) or second.startswith(first)
+
+
+class IdentityIndex:
+    """Stable cross-county person numbers, stored in SQLite.
+
+    A county person joins the first person in their block who has a
+    compatible first name and no other ``person_id`` in the same county,
+    since counties already tell their own people apart. Otherwise they
+    become a new person. Numbers are never reassigned, so they can be
+    stored alongside exported bookings.
+
+    Parameters
+    ----------
+    path : str | os.PathLike[str]
+        The database file, or ``":memory:"``.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database."""
+        self.connection.close()
+
+    def link(
+        self, bookings: Iterable[Mapping[str, Any]], batch_size: int = 10_000
+    ) -> int:
+        """Give every new county person in some bookings a person number.
+
+        Bookings of county people already in the index are skipped. Each
+        batch is committed separately, so an interrupted run keeps its
+        progress.
+
+        Parameters
+        ----------
+        bookings : Iterable[Mapping[str, Any]]
+            Bookings with at least ``county`` and ``person_id``.
+        batch_size : int
+            The number of bookings per transaction.
+
+        Returns
+        -------
+        int
+            The number of county people added.
+        """
+        added = 0
+        bookings = iter(bookings)
+        while batch := list(islice(bookings, batch_size)):
+            with self.connection:
+                for booking in batch:
+                    added += self._link_one(booking)
+        return added
+
+    def person_for(self, county: str, person_id: str) -> int | None:
+        """Get the person number of a county person.
+
+        Parameters
+        ----------
+        county : str
+            The county.
+        person_id : str
+            The county's ID for the person.
+
+        Returns
+        -------
+        int | None
+            The person number, or None if they have not been linked.
+        """
+        row = self.connection.execute(
+            "SELECT person FROM members WHERE county = ? AND person_id = ?",
+            (county, person_id),
+        ).fetchone()
+        return row[0] if row else None
+
+    def members(self, person: int) -> list[tuple[str, str]]:
+        """Get the county people linked as one person.
+
+        Parameters
+        ----------
+        person : int
+            The person number.
+
+        Returns
+        -------
+        list[tuple[str, str]]
+            The county and ``person_id`` of each, sorted.
+        """
+        return self.connection.execute(
+            "SELECT county, person_id FROM members WHERE person = ? "
+            "ORDER BY county, person_id",
+            (person,),
+        ).fetchall()
+
+    def _link_one(self, booking: Mapping[str, Any]) -> bool:
+        """Add a booking's county person if they are new."""
+        county, person_id = booking["county"], booking["person_id"]
+        if self.person_for(county, person_id) is not None:
+            return False
+        block = blocking_key(booking)
+        first_name = normalize_name(booking.get("first_name"))
+        person = None
+        if block is not None:
+            person = self._find_match(block, county, first_name)
+        if person is None:
+            person = self.connection.execute(
+                "INSERT INTO people DEFAULT VALUES"
+            ).lastrowid
+        self.connection.execute(
+            "INSERT INTO members VALUES (?, ?, ?, ?, ?)",
+            (county, person_id, person, block, first_name),
+        )
+        return True
+
+    def _find_match(self, block: str, county: str, first_name: str) -> int | None:
+        """Find the lowest-numbered person in a block a county person matches."""
+        candidates = []
+        taken = set()
+        rows = self.connection.execute(
+            "SELECT person, county, first_name FROM members WHERE block = ? "
+            "ORDER BY person",
+            (block,),
+        )
+        for person, member_county, member_first_name in rows:
+            if member_county == county:
+                taken.add(person)
+            if names_compatible(first_name, member_first_name):
+                candidates.append(person)
+        return next((person for person in candidates if person not in taken), None)
+
+
+def read_bookings(path: str | os.PathLike[str]) -> Iterator[dict[str, str]]:
+    """Stream bookings from a CSV feed, skipping repeated header rows.
+
+    Parameters
+    ----------
+    path : str | os.PathLike[str]
+        The CSV file.
+
+    Yields
+    ------
+    dict[str, str]
+        Each booking.
+    """
+    with open(path, newline="", encoding="utf-8") as file:
+        for row in csv.DictReader(file):
+            if row["county"] != "county":
+                yield row
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Link feeds into, or query, an identity index from the command line.
+
+    Parameters
+    ----------
+    argv : list[str] | None
+        The arguments, or None to use ``sys.argv``.
+
+    Returns
+    -------
+    int
+        The exit status.
+    """
+    parser = argparse.ArgumentParser(description="Link people across counties.")
+    parser.add_argument("database")
+    commands = parser.add_subparsers(dest="command", required=True)
+    link = commands.add_parser("link", help="Link the people in CSV feeds.")
+    link.add_argument("feeds", nargs="+")
+    person = commands.add_parser("person", help="A county person's links.")
+    person.add_argument("county")
+    person.add_argument("person_id")
+    args = parser.parse_args(argv)
+
+    with IdentityIndex(args.database) as index:
+        if args.command == "link":
+            for feed in args.feeds:
+                print(f"{feed}: {index.link(read_bookings(feed))} people added")
+            return 0
+        number = index.person_for(args.county, args.person_id)
+        if number is None:
+            print(
+                f"{args.county} person {args.person_id} is not linked", file=sys.stderr
+            )
+            return 1
+        print(number)
+        for county, person_id in index.members(number):
+            print(f"{county}\t{person_id}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,19 @@
 """Pydantic models for scraped data."""
 
-from collections.abc import Callable
 import datetime as dt
+from collections import Counter
+from collections.abc import Callable
 from enum import StrEnum
-from typing import Annotated, TypeVar
+from typing import Annotated, Any, TypeVar
 
 from pydantic import (
     AfterValidator,
-    BeforeValidator,
     AliasChoices,
     BaseModel,
+    BeforeValidator,
+    ConfigDict,
     Field,
+    ValidationError,
     ValidationInfo,
     computed_field,
     field_validator,
@@ -19,7 +22,6 @@ from pydantic import (
 from .utils import allows_none
 from .validators import convert_date, soft_validate, validate_state
 
-
 X = TypeVar("X")
 Y = TypeVar("Y")
 
@@ -75,6 +77,14 @@ class Race(StrEnum):
     WHITE = "W"
 
 
+class RawBooking(dict[str, Any]):
+    """An unvalidated booking, keyed by ``BookingItem`` field names.
+
+    Exported instead of ``BookingItem`` when ``BOOKING_RAW_CAPTURE`` is set,
+    and validated later, in bulk, by ``sheriffwebsites.normalize``.
+    """
+
+
 State = Annotated[str, AfterValidator(validate_state)]
 ZipCode = Annotated[str, Field(pattern=r"^\d{5}(?:-\d{4})?")]
 
@@ -130,6 +140,12 @@ class BookingItem(BaseModel):
         The court date as recorded by the agency, if any.
     """
 
+    # The schema is built on first validation, not at import, so commands that
+    # never validate a booking start faster.
+    model_config = ConfigDict(
+        validate_by_alias=True, validate_by_name=True, defer_build=True
+    )
+
     county: str
     booking_id: str | None = Field(default=None, validation_alias="BookingID")
     person_id: str = Field(validation_alias=AliasChoices("InmateID", "InmateId"))
@@ -227,10 +243,20 @@ class BookingItem(BaseModel):
         ValueError
             Raised if the field name is missing.
         """
-        if info.field_name is None:
+        field_name = info.field_name
+        if field_name is None:
             raise ValueError("Field name not defined.")
-        if allows_none(cls.model_fields[info.field_name].annotation):
-            return None if value == "" else soft_validate(value, handler)
+        if field_name in OPTIONAL_FIELDS:
+            if value == "":
+                return None
+            failures = (info.context or {}).get("failures")
+            if failures is None:
+                return soft_validate(value, handler)
+            return soft_validate(
+                value,
+                handler,
+                lambda exc: count_failures(failures, exc, field_name),
+            )
         return handler(value)
 
     @field_validator("*", mode="before")
@@ -251,3 +277,138 @@ class BookingItem(BaseModel):
         if isinstance(value, str):
             return value.strip()
         return value
+
+
+# Resolved once so validation doesn't inspect annotations per row and field.
+OPTIONAL_FIELDS: frozenset[str] = frozenset(
+    name
+    for name, info in BookingItem.model_fields.items()
+    if allows_none(info.annotation)
+)
+REQUIRED_FIELDS: tuple[str, ...] = tuple(
+    name for name in BookingItem.model_fields if name not in OPTIONAL_FIELDS
+)
+
+# The keys each field is validated from, in the order pydantic tries them.
+FIELD_KEYS: dict[str, tuple[str, ...]] = {
+    name: (
+        *(
+            str(alias)
+            for alias in (
+                info.validation_alias.choices
+                if isinstance(info.validation_alias, AliasChoices)
+                else [info.validation_alias]
+            )
+            if isinstance(alias, str)
+        ),
+        name,
+    )
+    for name, info in BookingItem.model_fields.items()
+}
+
+FIELD_BY_ALIAS: dict[str, str] = {
+    alias: name
+    for name, info in BookingItem.model_fields.items()
+    for alias in (
+        info.validation_alias.choices
+        if isinstance(info.validation_alias, AliasChoices)
+        else [info.validation_alias or name]
+    )
+    if isinstance(alias, str)
+}
+
+# Fields that repeat a handful of values across a county's bookings.
+REPEATED_FIELDS = (
+    "county",
+    "classification",
+    "arresting_agency",
+    "held_for",
+    "city",
+    "state",
+)
+
+
+class StringPool:
+    """Share one copy of each repeated string for the life of a crawl.
+
+    Parsed items each hold their own copy of values such as the county or the
+    arresting agency. Replacing them with pooled copies makes the memory for
+    those fields scale with the number of distinct values rather than items.
+    Unlike ``sys.intern``, the pool is dropped with the crawl. A field whose
+    first ``sample_size`` values are mostly new to the pool stops being
+    pooled, since its entries would cost memory without being shared.
+
+    Parameters
+    ----------
+    fields : tuple[str, ...]
+        The fields to pool.
+    sample_size : int
+        The number of values of a field to see before judging it.
+    max_ratio : float
+        The largest share of new values a pooled field may have.
+    """
+
+    def __init__(
+        self,
+        fields: tuple[str, ...] = REPEATED_FIELDS,
+        sample_size: int = 1000,
+        max_ratio: float = 0.5,
+    ):
+        self.fields = fields
+        self.sample_size = sample_size
+        self.max_ratio = max_ratio
+        self.strings: dict[str, str] = {}
+        self._seen = dict.fromkeys(fields, 0)
+        self._new = dict.fromkeys(fields, 0)
+
+    def intern_item(self, item: BookingItem | RawBooking) -> None:
+        """Replace an item's repeated strings with pooled copies.
+
+        Parameters
+        ----------
+        item : BookingItem | RawBooking
+            The item, changed in place.
+        """
+        values = item if isinstance(item, dict) else item.__dict__
+        strings = self.strings
+        for name in self.fields:
+            value = values.get(name)
+            if type(value) is not str:
+                continue
+            pooled = strings.get(value)
+            if pooled is None:
+                strings[value] = pooled = value
+                self._new[name] += 1
+            values[name] = pooled
+            self._seen[name] += 1
+            if (
+                self._seen[name] == self.sample_size
+                and self._new[name] > self.max_ratio * self.sample_size
+            ):
+                self.fields = tuple(f for f in self.fields if f != name)
+
+
+def count_failures(
+    failures: Counter[tuple[str, str]],
+    exc: ValidationError,
+    field_name: str | None = None,
+) -> None:
+    """Count validation failures by field and error type.
+
+    Parameters
+    ----------
+    failures : Counter[tuple[str, str]]
+        The counter of ``(field, error type)`` pairs.
+    exc : ValidationError
+        The validation error.
+    field_name : str | None
+        The field being validated, if the error is for a single field.
+    """
+    for error in exc.errors():
+        if field_name is not None:
+            field = field_name
+        elif error["loc"]:
+            field = FIELD_BY_ALIAS.get(str(error["loc"][0]), str(error["loc"][0]))
+        else:
+            field = "__root__"
+        failures[(field, error["type"])] += 1
@@ -0,0 +1,294 @@
+"""Record and replay Lighthouse responses without touching the network."""
+
+import csv
+import datetime as dt
+import json
+from collections import defaultdict
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, Self
+from urllib.parse import parse_qs, urlparse
+
+from pydantic import AliasChoices
+from scrapy import Request, Spider
+from scrapy.crawler import Crawler
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Response, TextResponse
+
+from sheriffwebsites.items import FIELD_BY_ALIAS, BookingItem
+from sheriffwebsites.utils import get_county_info
+
+LIGHTHOUSE_FIELDS: dict[str, str] = {
+    name: (
+        str(info.validation_alias.choices[0])
+        if isinstance(info.validation_alias, AliasChoices)
+        else str(info.validation_alias or name)
+    )
+    for name, info in BookingItem.model_fields.items()
+    if name != "county"
+}
+
+
+def recording_path(directory: Path, request: Request) -> Path | None:
+    """Get the recording path for a county request.
+
+    Parameters
+    ----------
+    directory : Path
+        The replay directory.
+    request : Request
+        The request.
+
+    Returns
+    -------
+    Path | None
+        The path for the recorded response, or None if the request is not for
+        a county. Results pages are keyed by offset and limit, so page size
+        probes of the first page are recorded separately.
+    """
+    county: str | None = request.cb_kwargs.get("county")
+    if county is None:
+        return None
+    if request.method == "POST":
+        form = parse_qs(request.body.decode())
+        offset = form.get("offset", ["0"])[0]
+        limit = form.get("limit", ["0"])[0]
+        return directory / county / f"read-{offset}-{limit}.json"
+    query = parse_qs(urlparse(request.url).query)
+    if not query:
+        return None
+    (booking_id,) = next(iter(query.values()))
+    return directory / county / f"booking-{booking_id}.json"
+
+
+class ReplayMiddleware:
+    """Serve recorded responses from ``REPLAY_DIR``.
+
+    Requests without a recording get an empty 404 response, so a replayed
+    crawl never touches the network. Every response served is flagged
+    ``replayed``, so it is never mistaken for the site's own, for instance
+    by caches.
+
+    Parameters
+    ----------
+    directory : str | Path
+        The replay directory.
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> Self:
+        """Create the middleware from the crawler settings.
+
+        Parameters
+        ----------
+        crawler : Crawler
+            The crawler.
+
+        Returns
+        -------
+        Self
+            The middleware.
+
+        Raises
+        ------
+        NotConfigured
+            Raised if no replay directory is configured, or if recording.
+        """
+        directory = crawler.settings.get("REPLAY_DIR")
+        if not directory or crawler.settings.getbool("REPLAY_RECORD"):
+            raise NotConfigured
+        return cls(directory)
+
+    def process_request(self, request: Request, spider: Spider) -> Response:
+        """Serve the recorded response for a request.
+
+        Parameters
+        ----------
+        request : Request
+            The request.
+        spider : Spider
+            The running spider.
+
+        Returns
+        -------
+        Response
+            The recorded response, or a 404 response.
+        """
+        path = recording_path(self.directory, request)
+        if path is None or not path.exists():
+            return Response(
+                request.url, status=404, flags=["replayed"], request=request
+            )
+        return TextResponse(
+            request.url,
+            body=path.read_bytes(),
+            headers={"Content-Type": "application/json"},
+            encoding="utf-8",
+            flags=["replayed"],
+            request=request,
+        )
+
+
+class RecordMiddleware:
+    """Save downloaded county responses to ``REPLAY_DIR``.
+
+    This middleware must run after ``HttpCompressionMiddleware`` has inflated
+    the body, so it is ordered below it. Text bodies are re-encoded as UTF-8,
+    which is what ``ReplayMiddleware`` declares when serving them.
+
+    Parameters
+    ----------
+    directory : str | Path
+        The replay directory.
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> Self:
+        """Create the middleware from the crawler settings.
+
+        Parameters
+        ----------
+        crawler : Crawler
+            The crawler.
+
+        Returns
+        -------
+        Self
+            The middleware.
+
+        Raises
+        ------
+        NotConfigured
+            Raised if recording is not enabled.
+        """
+        directory = crawler.settings.get("REPLAY_DIR")
+        if not directory or not crawler.settings.getbool("REPLAY_RECORD"):
+            raise NotConfigured
+        return cls(directory)
+
+    def process_response(
+        self, request: Request, response: Response, spider: Spider
+    ) -> Response:
+        """Save a downloaded response.
+
+        Parameters
+        ----------
+        request : Request
+            The request.
+        response : Response
+            The downloaded response.
+        spider : Spider
+            The running spider.
+
+        Returns
+        -------
+        Response
+            The unchanged response.
+        """
+        if response.status == 200:
+            path = recording_path(self.directory, request)
+            if path is not None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                if isinstance(response, TextResponse):
+                    path.write_text(response.text, encoding="utf-8")
+                else:
+                    path.write_bytes(response.body)
+        return response
+
+
+def load_bookings_csv(path: str | Path) -> list[dict[str, str]]:
+    """Load exported bookings, skipping repeated header rows.
+
+    Parameters
+    ----------
+    path : str | Path
+        The CSV export.
+
+    Returns
+    -------
+    list[dict[str, str]]
+        The exported rows.
+    """
+    with open(path, newline="", encoding="utf-8") as file:
+        return [row for row in csv.DictReader(file) if row["county"] != "county"]
+
+
+def to_lighthouse(row: dict[str, str]) -> dict[str, str]:
+    """Map an exported row back to raw Lighthouse field names.
+
+    Parameters
+    ----------
+    row : dict[str, str]
+        An exported row.
+
+    Returns
+    -------
+    dict[str, str]
+        The row as a Lighthouse API record.
+    """
+    record = {
+        alias: row[name] for name, alias in LIGHTHOUSE_FIELDS.items() if name in row
+    }
+    birth_date = LIGHTHOUSE_FIELDS["birth_date"]
+    if record.get(birth_date):
+        record[birth_date] = dt.datetime.fromisoformat(record[birth_date]).strftime(
+            "%m/%d/%Y"
+        )
+    return record
+
+
+def write_recordings(rows: Iterable[dict[str, str]], directory: str | Path) -> int:
+    """Write replayable Lighthouse responses for exported rows.
+
+    Each county gets ``Read.php`` pages at its configured limit, plus a
+    ``getbookie.php`` response for every booking.
+
+    Parameters
+    ----------
+    rows : Iterable[dict[str, str]]
+        Exported rows.
+    directory : str | Path
+        The replay directory.
+
+    Returns
+    -------
+    int
+        The number of bookings written.
+    """
+    by_county: defaultdict[str, list[dict[str, str]]] = defaultdict(list)
+    for row in rows:
+        record = to_lighthouse(row)
+        booking_key = get_county_info(row["county"], "booking_key", "BookingID")
+        default_key = LIGHTHOUSE_FIELDS[FIELD_BY_ALIAS[booking_key]]
+        record[booking_key] = record.pop(default_key)
+        by_county[row["county"]].append(record)
+    written = 0
+    for county, records in by_county.items():
+        county_dir = Path(directory) / county
+        county_dir.mkdir(parents=True, exist_ok=True)
+        results_key = get_county_info(county, "results_key", "bookings")
+        data_key = get_county_info(county, "key")
+        booking_key = get_county_info(county, "booking_key", "BookingID")
+        limit = get_county_info(county, "limit", 100)
+        for offset in range(0, len(records) + 1, limit):
+            page: dict[str, Any] = {
+                "offset": offset,
+                "limit": limit,
+                "total": len(records),
+                "data": records[offset : offset + limit],
+            }
+            (county_dir / f"read-{offset}-{limit}.json").write_text(
+                json.dumps({results_key: page})
+            )
+        for record in records:
+            (county_dir / f"booking-{record[booking_key]}.json").write_text(
+                json.dumps({data_key: [record]})
+            )
+        written += len(records)
+    return written
@@ -0,0 +1,267 @@
+"""Reuse robots.txt rules and observed rate limits between crawls."""
+
+import email.utils
+import time
+from typing import Self
+
+from scrapy import Request, Spider
+from scrapy.crawler import Crawler
+from scrapy.http import Response
+from scrapy.utils.httpobj import urlparse_cached
+
+from sheriffwebsites.sitecache import SiteCache
+
+# Statuses with which sites tell us to slow down.
+RATE_LIMIT_STATUSES = (429, 503)
+
+
+class RobotsTxtCacheMiddleware:
+    """Reuse each host's robots.txt for ``ROBOTSTXT_CACHE_TTL`` seconds.
+
+    Scrapy's ``RobotsTxtMiddleware`` fetches every host's robots.txt before
+    its first request, under the same per-IP limit and delay as real work.
+    Its robots.txt requests pass through this middleware like any other, so
+    downloaded responses are kept in the site cache, keyed by host, and later
+    crawls are answered from there instead of downloading them again.
+
+    Only successful responses and genuine 404 or 410 responses are cached.
+    Other errors, such as 401, 403, 429, and server errors, are fetched again
+    on the next crawl, as are responses served by ``ReplayMiddleware``.
+
+    Parameters
+    ----------
+    crawler : Crawler
+        The crawler.
+    """
+
+    def __init__(self, crawler: Crawler):
+        self.crawler = crawler
+        self.site_cache = SiteCache.from_settings(crawler.settings)
+        self.ttl = crawler.settings.getfloat("ROBOTSTXT_CACHE_TTL")
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> Self:
+        """Create the middleware.
+
+        Parameters
+        ----------
+        crawler : Crawler
+            The crawler.
+
+        Returns
+        -------
+        Self
+            The middleware.
+        """
+        return cls(crawler)
+
+    def process_request(self, request: Request, spider: Spider) -> Response | None:
+        """Answer a robots.txt request from the cache, if possible.
+
+        Parameters
+        ----------
+        request : Request
+            The request.
+        spider : Spider
+            The spider.
+
+        Returns
+        -------
+        Response | None
+            The cached robots.txt response, or None to download it.
+        """
+        if not is_robots_txt(request):
+            return None
+        cached = self.site_cache.get(
+            urlparse_cached(request).netloc, "robots.txt", self.ttl
+        )
+        if not isinstance(cached, dict):
+            return None
+        assert self.crawler.stats
+        self.crawler.stats.inc_value("robotstxt/cache_hit")
+        return Response(
+            request.url,
+            status=cached["status"],
+            # Latin-1 round-trips any bytes through the JSON cache.
+            body=cached["body"].encode("latin-1"),
+            flags=["cached"],
+            request=request,
+        )
+
+    def process_response(
+        self, request: Request, response: Response, spider: Spider
+    ) -> Response:
+        """Cache a downloaded robots.txt response.
+
+        Parameters
+        ----------
+        request : Request
+            The request.
+        response : Response
+            The response.
+        spider : Spider
+            The spider.
+
+        Returns
+        -------
+        Response
+            The response, unchanged.
+        """
+        if (
+            is_robots_txt(request)
+            and (200 <= response.status < 300 or response.status in (404, 410))
+            and not {"cached", "replayed"} & set(response.flags)
+        ):
+            self.site_cache.set(
+                urlparse_cached(request).netloc,
+                "robots.txt",
+                {"status": response.status, "body": response.body.decode("latin-1")},
+            )
+        return response
+
+
+def is_robots_txt(request: Request) -> bool:
+    """Check whether a request is ``RobotsTxtMiddleware`` fetching robots.txt.
+
+    Parameters
+    ----------
+    request : Request
+        The request.
+
+    Returns
+    -------
+    bool
+        True for a robots.txt request that is exempt from robots.txt rules.
+    """
+    return bool(request.meta.get("dont_obey_robotstxt")) and (
+        urlparse_cached(request).path == "/robots.txt"
+    )
+
+
+class RateLimitMiddleware:
+    """Remember when sites limit our rate, and slow down for them.
+
+    A 429 or 503 response sets the host's download delay to its Retry-After,
+    or to twice the current delay without one, up to
+    ``RATE_LIMIT_MAX_DELAY``. The delay is kept in the site cache for
+    ``RATE_LIMIT_TTL`` seconds, so later crawls start at the pace the site
+    asked for rather than being limited again.
+
+    Parameters
+    ----------
+    crawler : Crawler
+        The crawler.
+    """
+
+    def __init__(self, crawler: Crawler):
+        self.crawler = crawler
+        self.site_cache = SiteCache.from_settings(crawler.settings)
+        self.ttl = crawler.settings.getfloat("RATE_LIMIT_TTL")
+        self.max_delay = crawler.settings.getfloat("RATE_LIMIT_MAX_DELAY")
+        self._delays: dict[str, float | None] = {}
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> Self:
+        """Create the middleware.
+
+        Parameters
+        ----------
+        crawler : Crawler
+            The crawler.
+
+        Returns
+        -------
+        Self
+            The middleware.
+        """
+        return cls(crawler)
+
+    def process_request(self, request: Request, spider: Spider) -> None:
+        """Apply a host's remembered delay to its download slot.
+
+        Parameters
+        ----------
+        request : Request
+            The request.
+        spider : Spider
+            The spider.
+        """
+        netloc = urlparse_cached(request).netloc
+        if netloc not in self._delays:
+            self._delays[netloc] = self.site_cache.get(netloc, "rate_limit", self.ttl)
+        if (delay := self._delays[netloc]) is not None:
+            self._slow_down(request, delay)
+
+    def process_response(
+        self, request: Request, response: Response, spider: Spider
+    ) -> Response:
+        """Record the delay a rate-limited response asks for.
+
+        Parameters
+        ----------
+        request : Request
+            The request.
+        response : Response
+            The response.
+        spider : Spider
+            The spider.
+
+        Returns
+        -------
+        Response
+            The response, unchanged.
+        """
+        if response.status not in RATE_LIMIT_STATUSES:
+            return response
+        netloc = urlparse_cached(request).netloc
+        current = self._slow_down(request, 0)
+        delay = retry_after(response) or 2 * max(current, 1)
+        delay = min(max(delay, self._delays.get(netloc) or 0), self.max_delay)
+        self._delays[netloc] = delay
+        self.site_cache.set(netloc, "rate_limit", delay)
+        self._slow_down(request, delay)
+        assert self.crawler.stats
+        self.crawler.stats.inc_value("ratelimit/response_count")
+        return response
+
+    def _slow_down(self, request: Request, delay: float) -> float:
+        """Raise a request's slot delay to at least ``delay`` and return it."""
+        assert self.crawler.engine
+        downloader = self.crawler.engine.downloader
+        key = downloader.get_slot_key(request)
+        if key in downloader.slots:
+            slot = downloader.slots[key]
+            slot.delay = max(slot.delay, delay)
+            return slot.delay
+        # The slot is created with these settings on its first request.
+        settings = downloader.per_slot_settings.setdefault(key, {})
+        default = self.crawler.settings.getfloat("DOWNLOAD_DELAY")
+        slot_delay: float = max(settings.get("delay", default), delay)
+        settings["delay"] = slot_delay
+        return slot_delay
+
+
+def retry_after(response: Response) -> float | None:
+    """Get the delay a response's Retry-After header asks for.
+
+    Parameters
+    ----------
+    response : Response
+        The response.
+
+    Returns
+    -------
+    float | None
+        The delay in seconds, or None if the header is missing or invalid.
+    """
+    value = response.headers.get(b"Retry-After")
+    if not value:
+        return None
+    text = value.decode("latin-1").strip()
+    if text.isdigit():
+        return float(text)
+    try:
+        when = email.utils.parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
@@ -0,0 +1,363 @@
+"""Validate raw bookings in bulk, a column at a time.
+
+Bookings exported with ``BOOKING_RAW_CAPTURE`` are validated here after the
+crawl. Each column is stripped, parsed and checked with Arrow compute
+functions instead of two Python validator calls per field and row. Rows
+with any value off the common path, such as an unusual date format, an
+invalid enum or a non-string ID, are validated by ``BookingItem`` itself,
+so the result always matches what the crawl would have exported.
+
+Run ``python -m sheriffwebsites.normalize --help`` for the command line.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from pydantic import ValidationError
+
+from .archive import BOOKING_SCHEMA, TIMESTAMP_COLUMNS
+from .items import OPTIONAL_FIELDS, BookingItem, Race, Sex, count_failures
+from .validators import lookup_state
+
+# The characters str.strip() removes, as utf8_trim_whitespace differs.
+WHITESPACE = (
+    "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004"
+    "\u2005\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000"
+)
+
+# Values in these forms parse the same in Arrow and pydantic. Years before
+# 1000, time zones and other forms are left to pydantic.
+ISO_DATETIME = r"^[1-9]\d{3}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d{1,6})?)?)?$"
+US_DATE = r"^(\d{2})/(\d{2})/([1-9]\d{3})$"
+DECIMAL = r"^[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d{1,2})?$"
+ZIP_CODE = r"^\d{5}(?:-\d{4})?"
+
+ENUM_VALUES = {
+    "sex": pa.array([member.value for member in Sex]),
+    "race": pa.array([member.value for member in Race]),
+}
+
+
+@dataclass
+class NormalizedBookings:
+    """Bookings validated in bulk.
+
+    Attributes
+    ----------
+    table : pa.Table
+        The valid bookings, in input order, with ``BOOKING_SCHEMA``.
+        Timezone-aware dates are converted to UTC.
+    rejected : list[dict[str, Any]]
+        The raw bookings missing a valid required field, or with text that
+        is not valid Unicode.
+    fallback_rows : int
+        The number of rows validated one at a time by ``BookingItem``.
+    soft_failures : Counter[tuple[str, str]]
+        Optional fields set to None, by field and error type.
+    rejected_failures : Counter[tuple[str, str]]
+        Required field failures of rejected rows, by field and error type.
+    """
+
+    table: pa.Table
+    rejected: list[dict[str, Any]] = field(default_factory=list)
+    fallback_rows: int = 0
+    soft_failures: Counter[tuple[str, str]] = field(default_factory=Counter)
+    rejected_failures: Counter[tuple[str, str]] = field(default_factory=Counter)
+
+
+def _strings(values: list[Any]) -> tuple[pa.Array, pa.Array]:
+    """Convert values to stripped strings, marking non-strings as invalid."""
+    try:
+        array = pa.array(values, type=pa.string())
+        ok = pa.repeat(True, len(values))
+    except (pa.ArrowException, UnicodeEncodeError):
+        texts = [value if _is_text(value) else None for value in values]
+        array = pa.array(texts, type=pa.string())
+        ok = pa.array([value is None or _is_text(value) for value in values])
+    return pc.utf8_trim(array, characters=WHITESPACE), ok
+
+
+def _is_text(value: Any) -> bool:
+    """Check that a value is a string Arrow can store."""
+    if not isinstance(value, str):
+        return False
+    try:
+        value.encode()
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def _cast(strings: pa.Array, target: pa.DataType) -> tuple[pa.Array, pa.Array]:
+    """Cast strings, marking those that do not convert as invalid."""
+    try:
+        cast = strings.cast(target)
+    except pa.ArrowInvalid:
+        values = []
+        for value in strings:
+            try:
+                values.append(value.cast(target))
+            except pa.ArrowInvalid:
+                values.append(pa.scalar(None, target))
+        cast = pa.array(values, type=target)
+    return cast, pc.or_(pc.is_null(strings), pc.is_valid(cast))
+
+
+def _timestamps(strings: pa.Array, name: str) -> tuple[pa.Array, pa.Array]:
+    """Parse ISO dates, or for birth dates also MM/DD/YYYY ones."""
+    if name == "birth_date":
+        us_date = pc.match_substring_regex(strings, US_DATE)
+        iso = pc.replace_substring_regex(strings, US_DATE, r"\3-\1-\2")
+        strings = pc.if_else(us_date, iso, strings)
+    matched = pc.fill_null(pc.match_substring_regex(strings, ISO_DATETIME), False)
+    parsed, ok = _cast(pc.if_else(matched, strings, None), pa.timestamp("us"))
+    return parsed, pc.and_(ok, pc.or_(matched, pc.is_null(strings)))
+
+
+def _floats(values: list[Any]) -> tuple[pa.Array, pa.Array]:
+    """Convert numbers and decimal strings to floats, and blanks to None."""
+    try:
+        return pa.array(values, type=pa.float64()), pa.repeat(True, len(values))
+    except (pa.ArrowException, UnicodeEncodeError):
+        pass
+    numbers = pa.array(
+        [
+            value
+            if type(value) in (float, bool)
+            or type(value) is int
+            and abs(value) <= 2**53
+            else None
+            for value in values
+        ],
+        type=pa.float64(),
+    )
+    texts, _ = _strings([value if type(value) is str else None for value in values])
+    decimal = pc.fill_null(pc.match_substring_regex(texts, DECIMAL), False)
+    parsed, parsed_ok = _cast(pc.if_else(decimal, texts, None), pa.float64())
+    ok = pc.or_(
+        pa.array([value is None for value in values]),
+        pc.or_(pc.is_valid(numbers), pc.fill_null(pc.equal(texts, ""), False)),
+    )
+    ok = pc.or_(ok, pc.and_(decimal, parsed_ok))
+    return pc.coalesce(numbers, parsed), ok
+
+
+def _states(strings: pa.Array) -> tuple[pa.Array, pa.Array]:
+    """Map state names to abbreviations, looking up each distinct value once."""
+    names = pc.unique(strings.drop_null())
+    abbreviations = pa.array(
+        [lookup_state(name) for name in names.to_pylist()], type=pa.string()
+    )
+    states = pc.take(abbreviations, pc.index_in(strings, names))
+    return states, pc.or_kleene(pc.is_null(strings), pc.is_valid(states))
+
+
+def _column(name: str, values: list[Any]) -> tuple[pa.Array, pa.Array]:
+    """Validate a field's values on the common path.
+
+    Parameters
+    ----------
+    name : str
+        The field.
+    values : list[Any]
+        The raw values, with None for missing ones.
+
+    Returns
+    -------
+    tuple[pa.Array, pa.Array]
+        The validated values, and whether each one is certain to match
+        ``BookingItem``.
+    """
+    if name == "bond_total":
+        return _floats(values)
+    strings, ok = _strings(values)
+    if name in OPTIONAL_FIELDS:
+        strings = pc.if_else(pc.equal(strings, ""), None, strings)
+    if name in TIMESTAMP_COLUMNS:
+        result, valid = _timestamps(strings, name)
+    elif name in ENUM_VALUES:
+        result = strings
+        valid = pc.fill_null(pc.is_in(strings, ENUM_VALUES[name]), False)
+    elif name == "state":
+        result, valid = _states(strings)
+    elif name == "zipcode":
+        zip_code = pc.and_(
+            pc.string_is_ascii(strings), pc.match_substring_regex(strings, ZIP_CODE)
+        )
+        result, valid = strings, pc.or_kleene(pc.is_null(strings), zip_code)
+    else:
+        result, valid = strings, pa.repeat(True, len(values))
+    ok = pc.and_(ok, valid)
+    if name not in OPTIONAL_FIELDS:
+        ok = pc.and_(ok, pc.is_valid(result))
+    return result, pc.fill_null(ok, False)
+
+
+def normalize_bookings(rows: list[dict[str, Any]]) -> NormalizedBookings:
+    """Validate raw bookings as ``BookingItem`` would.
+
+    Parameters
+    ----------
+    rows : list[dict[str, Any]]
+        ``RawBooking`` rows, keyed by field name.
+
+    Returns
+    -------
+    NormalizedBookings
+        The valid bookings and the rejected rows.
+    """
+    columns = {}
+    fast = np.ones(len(rows), dtype=bool)
+    for name in BookingItem.model_fields:
+        column, ok = _column(name, [row.get(name) for row in rows])
+        columns[name] = column
+        fast &= ok.to_numpy(zero_copy_only=False)
+
+    result = NormalizedBookings(pa.table(columns, schema=BOOKING_SCHEMA).filter(fast))
+    order = [np.flatnonzero(fast)]
+    validated = []
+    for index in np.flatnonzero(~fast):
+        result.fallback_rows += 1
+        soft_failures: Counter[tuple[str, str]] = Counter()
+        try:
+            item = BookingItem.model_validate(
+                rows[index], context={"failures": soft_failures}
+            )
+        except ValidationError as exc:
+            count_failures(result.rejected_failures, exc)
+            result.rejected.append(rows[index])
+            continue
+        booking = {name: getattr(item, name) for name in BookingItem.model_fields}
+        # Unpaired surrogates pass validation, but cannot be stored or exported.
+        unencodable = [
+            name
+            for name, value in booking.items()
+            if isinstance(value, str) and not _is_text(value)
+        ]
+        if unencodable:
+            result.rejected_failures.update(
+                (name, "string_unicode") for name in unencodable
+            )
+            result.rejected.append(rows[index])
+            continue
+        result.soft_failures.update(soft_failures)
+        validated.append(booking)
+        order.append(np.array([index]))
+    if validated:
+        fallback = pa.Table.from_pylist(validated, schema=BOOKING_SCHEMA)
+        table = pa.concat_tables([result.table, fallback])
+        result.table = table.take(np.argsort(np.concatenate(order), kind="stable"))
+    return result
+
+
+def read_raw(lines: Iterable[bytes | str]) -> list[dict[str, Any]]:
+    """Read raw bookings from a JSON Lines feed.
+
+    Parameters
+    ----------
+    lines : Iterable[bytes | str]
+        The feed's lines.
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        The raw bookings.
+    """
+    return [json.loads(line) for line in lines if line.strip()]
+
+
+def csv_rows(table: pa.Table) -> Iterator[tuple[Any, ...]]:
+    """Get a bookings table's rows as Scrapy's CSV exporter would write them.
+
+    Dates are formatted like ``str(datetime)``, and bonds are left as floats
+    for ``csv.writer`` to format.
+
+    Parameters
+    ----------
+    table : pa.Table
+        Bookings with ``BOOKING_SCHEMA``.
+
+    Returns
+    -------
+    Iterator[tuple[Any, ...]]
+        The rows, without the header.
+    """
+    columns = []
+    for name in table.column_names:
+        column = table[name]
+        if name in TIMESTAMP_COLUMNS:
+            column = pc.replace_substring_regex(
+                column.cast(pa.string()), r"\.000000$", ""
+            )
+        columns.append(column.to_pylist())
+    return zip(*columns)
+
+
+def write_csv(table: pa.Table, file: BinaryIO) -> None:
+    """Write bookings as the crawl's CSV feed would.
+
+    Parameters
+    ----------
+    table : pa.Table
+        Bookings with ``BOOKING_SCHEMA``.
+    file : BinaryIO
+        The output file.
+    """
+    stream = io.TextIOWrapper(file, encoding="utf-8", newline="", write_through=True)
+    writer = csv.writer(stream)
+    writer.writerow(table.column_names)
+    writer.writerows(csv_rows(table))
+    stream.detach()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Normalize a raw JSON Lines feed from the command line.
+
+    Parameters
+    ----------
+    argv : list[str] | None
+        The arguments, or None to use ``sys.argv``.
+
+    Returns
+    -------
+    int
+        The exit status.
+    """
+    parser = argparse.ArgumentParser(description="Validate raw bookings.")
+    parser.add_argument("raw", help="A JSON Lines feed of RawBooking rows.")
+    parser.add_argument("output", help="A .csv or .parquet file.")
+    parser.add_argument("--rejected", help="A JSON Lines file for rejected rows.")
+    args = parser.parse_args(argv)
+
+    with open(args.raw, "rb") as file:
+        result = normalize_bookings(read_raw(file))
+    if os.path.splitext(args.output)[1] == ".parquet":
+        pq.write_table(result.table, args.output)
+    else:
+        with open(args.output, "wb") as file:
+            write_csv(result.table, file)
+    if args.rejected:
+        with open(args.rejected, "w", encoding="utf-8") as file:
+            file.writelines(json.dumps(row) + "\n" for row in result.rejected)
+    print(
+        f"{result.table.num_rows} valid, {len(result.rejected)} rejected, "
+        f"{result.fallback_rows} validated individually",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
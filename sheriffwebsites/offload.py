@@ -0,0 +1,120 @@
+"""Run CPU-bound parsing work off the reactor thread."""
+
+import multiprocessing
+import threading
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+from scrapy.settings import BaseSettings
+from scrapy.utils.defer import maybe_deferred_to_future
+from twisted.internet.threads import deferToThread
+
+X = TypeVar("X")
+
+OFFLOAD_MODES = ("inline", "thread", "process")
+
+# Set to run parsing inline whatever the mode, such as while profiling a call.
+run_inline: ContextVar[bool] = ContextVar("run_inline", default=False)
+
+
+class Offloader:
+    """Run parsing work inline, in a thread, or in a process pool.
+
+    Thread mode keeps the reactor responsive while a large page is parsed.
+    Process mode additionally spreads validation across CPU cores. Bodies
+    smaller than ``min_bytes`` are always parsed inline, since handing them
+    off costs more than parsing them.
+
+    Parameters
+    ----------
+    mode : str
+        One of ``"inline"``, ``"thread"``, or ``"process"``.
+    max_workers : int | None
+        The size of the process pool, if used.
+    min_bytes : int
+        The smallest body size worth offloading.
+
+    Raises
+    ------
+    ValueError
+        Raised if the mode is not supported.
+    """
+
+    def __init__(
+        self, mode: str = "thread", max_workers: int | None = None, min_bytes: int = 0
+    ):
+        if mode not in OFFLOAD_MODES:
+            raise ValueError(f"Unsupported offload mode: {mode}.")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.min_bytes = min_bytes
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: BaseSettings) -> "Offloader":
+        """Create an offloader from Scrapy settings.
+
+        Parameters
+        ----------
+        settings : BaseSettings
+            The crawler settings.
+
+        Returns
+        -------
+        Offloader
+            The configured offloader.
+        """
+        return cls(
+            mode=settings.get("BOOKING_OFFLOAD_MODE", "thread"),
+            max_workers=settings.getint("BOOKING_OFFLOAD_MAX_WORKERS") or None,
+            min_bytes=settings.getint("BOOKING_OFFLOAD_MIN_BYTES"),
+        )
+
+    async def run(self, size: int, func: Callable[..., X], *args: Any) -> X:
+        """Run a parsing function according to the offload mode.
+
+        Parameters
+        ----------
+        size : int
+            The size of the body being parsed.
+        func : Callable[..., X]
+            The parsing function. Must be picklable in process mode.
+        *args : Any
+            Arguments for the parsing function.
+
+        Returns
+        -------
+        X
+            The result of the parsing function.
+        """
+        if self.mode == "inline" or size < self.min_bytes or run_inline.get():
+            return func(*args)
+        return await maybe_deferred_to_future(
+            deferToThread(self._call, func, *args)  # type: ignore[no-untyped-call]
+        )
+
+    def _call(self, func: Callable[..., X], *args: Any) -> X:
+        """Call the function in this thread or hand it to the process pool."""
+        if self.mode == "process":
+            return self._get_executor().submit(func, *args).result()
+        return func(*args)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Get the process pool, creating it if needed."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def close(self) -> None:
+        """Shut down the process pool, if any."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,284 @@
+"""Decode and validate Lighthouse responses.
+
+The functions in this module are pure: they take raw response bodies and
+return plain data, so they can run on the reactor thread, in a worker thread,
+or in a worker process.
+"""
+
+import codecs
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any
+
+from pydantic import ValidationError
+
+from .items import (
+    FIELD_KEYS,
+    REQUIRED_FIELDS,
+    BookingItem,
+    RawBooking,
+    count_failures,
+)
+from .vendors import VendorAdapter
+
+
+@dataclass
+class ParseResult:
+    """Costs and validation failures from parsing a response.
+
+    Attributes
+    ----------
+    decode_time : float
+        Seconds spent decoding JSON.
+    validate_time : float
+        Seconds spent validating bookings.
+    soft_failures : Counter[tuple[str, str]]
+        Optional fields set to None, by field and error type.
+    fallback_failures : Counter[tuple[str, str]]
+        Required field failures that forced a detail request, by field and
+        error type.
+    """
+
+    decode_time: float = field(default=0.0, kw_only=True)
+    validate_time: float = field(default=0.0, kw_only=True)
+    soft_failures: Counter[tuple[str, str]] = field(
+        default_factory=Counter, kw_only=True
+    )
+    fallback_failures: Counter[tuple[str, str]] = field(
+        default_factory=Counter, kw_only=True
+    )
+
+
+@dataclass
+class PageResult(ParseResult):
+    """The parsed contents of a single results page.
+
+    Attributes
+    ----------
+    offset : int
+        The offset of the page.
+    total : int
+        The total number of bookings available.
+    limit : int
+        The page size used by the site.
+    items : list[BookingItem | RawBooking]
+        The bookings that validated, or in raw mode, that have every
+        required field.
+    failed : list[dict[str, Any]]
+        The raw bookings that need a detail request.
+    """
+
+    offset: int
+    total: int
+    limit: int
+    items: list[BookingItem | RawBooking] = field(default_factory=list)
+    failed: list[dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class DetailResult(ParseResult):
+    """The parsed contents of an individual booking response.
+
+    Attributes
+    ----------
+    item : BookingItem | RawBooking
+        The parsed booking.
+    """
+
+    item: BookingItem | RawBooking
+
+
+def decode_json(body: bytes, encoding: str = "utf-8") -> Any:
+    """Decode a JSON response body.
+
+    Like ``TextResponse.json``, bodies that are not UTF-8, UTF-16, or UTF-32
+    are decoded with the response's declared encoding.
+
+    Parameters
+    ----------
+    body : bytes
+        The raw response body.
+    encoding : str
+        The response encoding.
+
+    Returns
+    -------
+    Any
+        The decoded JSON data.
+    """
+    try:
+        return json.loads(body)
+    except UnicodeDecodeError:
+        return json.loads(body.decode(encoding))
+
+
+def build_booking_item(
+    data: dict[str, Any],
+    county: str,
+    failures: Counter[tuple[str, str]] | None = None,
+) -> BookingItem:
+    """Create a BookingItem from scraped data.
+
+    Parameters
+    ----------
+    data : dict[str, Any]
+        The scraped data.
+    county : str
+        The county from which the data was scraped.
+    failures : Counter[tuple[str, str]] | None
+        If provided, counts optional fields that failed validation.
+
+    Returns
+    -------
+    BookingItem
+        The booking item.
+    """
+    return BookingItem.model_validate(
+        data | {"county": county}, context={"failures": failures}
+    )
+
+
+def raw_booking(data: dict[str, Any], county: str) -> RawBooking:
+    """Capture scraped data under ``BookingItem`` field names, unvalidated.
+
+    Each field takes the first of its aliases present, as validation would.
+
+    Parameters
+    ----------
+    data : dict[str, Any]
+        The scraped data.
+    county : str
+        The county from which the data was scraped.
+
+    Returns
+    -------
+    RawBooking
+        The booking's fields, with missing ones omitted.
+    """
+    data = data | {"county": county}
+    booking = RawBooking()
+    for name, keys in FIELD_KEYS.items():
+        for key in keys:
+            if key in data:
+                booking[name] = data[key]
+                break
+    return booking
+
+
+def parse_page(
+    body: bytes,
+    county: str,
+    adapter: VendorAdapter,
+    encoding: str = "utf-8",
+    stream: bool = False,
+    raw: bool = False,
+) -> PageResult:
+    """Decode a results page and validate each booking on it.
+
+    When streaming, each booking is validated as soon as it is parsed, so the
+    decoded page is never held in memory at once. Decode time then includes
+    only the first pass over the page metadata.
+
+    In raw mode bookings are captured with ``raw_booking`` instead, and only
+    fall back to a detail request if a required field is missing or null.
+
+    Parameters
+    ----------
+    body : bytes
+        The raw response body.
+    county : str
+        The county jail being scraped.
+    adapter : VendorAdapter
+        The adapter for the county's roster vendor.
+    encoding : str
+        The response encoding.
+    stream : bool
+        Whether to parse bookings incrementally. UTF-8 bodies only; others
+        are decoded in full.
+    raw : bool
+        Whether to capture ``RawBooking`` rows rather than validate them.
+
+    Returns
+    -------
+    PageResult
+        The parsed page.
+    """
+    started = perf_counter()
+    if stream and codecs.lookup(encoding).name == "utf-8":
+        info = adapter.stream_page(body, county)
+    else:
+        info = adapter.extract_page(decode_json(body, encoding), county)
+    decoded = perf_counter()
+    page = PageResult(offset=info.offset, total=info.total, limit=info.limit)
+    for booking in info.rows:
+        if raw:
+            captured = raw_booking(adapter.normalize(booking), county)
+            missing = [name for name in REQUIRED_FIELDS if captured.get(name) is None]
+            if missing:
+                page.fallback_failures.update((name, "missing") for name in missing)
+                page.failed.append(booking)
+            else:
+                page.items.append(captured)
+            continue
+        # Rows that fall back are re-validated, and counted, in parse_detail.
+        soft_failures: Counter[tuple[str, str]] = Counter()
+        try:
+            page.items.append(
+                build_booking_item(adapter.normalize(booking), county, soft_failures)
+            )
+            page.soft_failures.update(soft_failures)
+        except ValidationError as exc:
+            count_failures(page.fallback_failures, exc)
+            page.failed.append(booking)
+    page.decode_time = decoded - started
+    page.validate_time = perf_counter() - decoded
+    return page
+
+
+def parse_detail(
+    body: bytes,
+    county: str,
+    adapter: VendorAdapter,
+    encoding: str = "utf-8",
+    raw: bool = False,
+) -> DetailResult:
+    """Decode and validate an individual booking.
+
+    Parameters
+    ----------
+    body : bytes
+        The raw response body.
+    county : str
+        The county jail being scraped.
+    adapter : VendorAdapter
+        The adapter for the county's roster vendor.
+    encoding : str
+        The response encoding.
+    raw : bool
+        Whether to capture a ``RawBooking`` rather than validate it.
+
+    Returns
+    -------
+    DetailResult
+        The parsed booking.
+    """
+    started = perf_counter()
+    person = adapter.extract_booking(decode_json(body, encoding), county)
+    decoded = perf_counter()
+    if raw:
+        captured = raw_booking(adapter.normalize(person), county)
+        return DetailResult(
+            captured,
+            decode_time=decoded - started,
+            validate_time=perf_counter() - decoded,
+        )
+    soft_failures: Counter[tuple[str, str]] = Counter()
+    item = build_booking_item(adapter.normalize(person), county, soft_failures)
+    return DetailResult(
+        item,
+        decode_time=decoded - started,
+        validate_time=perf_counter() - decoded,
+        soft_failures=soft_failures,
+    )
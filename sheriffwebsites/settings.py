@@ -7,10 +7,6 @@
 #     https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
 #     https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
-from dotenv import load_dotenv
-
-load_dotenv()
-
 BOT_NAME = "sheriffwebsites"
 
 SPIDER_MODULES = ["sheriffwebsites.spiders"]
@@ -48,15 +44,45 @@ DOWNLOAD_DELAY = 10
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-# DOWNLOADER_MIDDLEWARES = {
-#    "sheriffwebsites.middlewares.SheriffwebsitesDownloaderMiddleware": 543,
-# }
+DOWNLOADER_MIDDLEWARES = {
+    "sheriffwebsites.middlewares.sitecache.RateLimitMiddleware": 560,
+    "sheriffwebsites.middlewares.replay.RecordMiddleware": 580,
+    "sheriffwebsites.middlewares.sitecache.RobotsTxtCacheMiddleware": 910,
+    "sheriffwebsites.middlewares.replay.ReplayMiddleware": 950,
+}
+
+# Fingerprint roster requests by county, endpoint, and offset or booking ID,
+# and remember seen requests compactly.
+REQUEST_FINGERPRINTER_CLASS = "sheriffwebsites.dupefilters.RosterRequestFingerprinter"
+DUPEFILTER_CLASS = "sheriffwebsites.dupefilters.CompactDupeFilter"
+
+# Serve recorded responses from REPLAY_DIR instead of the network, or record
+# real responses there when REPLAY_RECORD is set.
+REPLAY_DIR = None
+REPLAY_RECORD = False
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
-# EXTENSIONS = {
-#    "scrapy.extensions.telnet.TelnetConsole": None,
-# }
+EXTENSIONS = {
+    "sheriffwebsites.extensions.county_stats.CountyStats": 500,
+    # Loaded before FeedExporter (0) so that export is inside item profiles.
+    "sheriffwebsites.extensions.profiling.CallbackProfiler": -10,
+}
+
+# Per-county performance stats. Set COUNTY_STATS_FILE to dump them as JSON at
+# spider close, and COUNTY_STATS_PROMETHEUS_PORT to serve them for scraping.
+COUNTY_STATS_ENABLED = True
+COUNTY_STATS_FILE = None
+COUNTY_STATS_PROMETHEUS_PORT = 0
+
+# Profile PROFILE_SAMPLE_RATE of county callbacks and scraped items with
+# cProfile, writing per-county .prof files and a summary of the PROFILE_TOP
+# slowest functions to PROFILE_DIR at spider close. Sampled callbacks parse
+# inline so their profiles include decoding and validation.
+PROFILE_ENABLED = False
+PROFILE_SAMPLE_RATE = 0.05
+PROFILE_DIR = ".scrapy/profiles"
+PROFILE_TOP = 30
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
@@ -88,6 +114,22 @@ DOWNLOAD_DELAY = 10
 # Set settings whose default value is deprecated to a future-proof value
 FEED_EXPORT_ENCODING = "utf-8"
 
+# Reuse one keep-alive connection per county host and count reuse in the
+# downloader/connections_* stats. Sites with "http2": True in SHERIFF_SITES are
+# fetched over HTTP/2, which needs the h2 package.
+DOWNLOAD_HANDLERS = {
+    "http": "sheriffwebsites.downloadhandlers.RosterDownloadHandler",
+    "https": "sheriffwebsites.downloadhandlers.RosterDownloadHandler",
+}
+
+# Keep one connection pool for every crawl in the process, open between crawls.
+# The refresh daemon sets this.
+DOWNLOAD_SHARED_POOL = False
+
+# Roster vendor adapters by name. Each entry of SHERIFF_SITES may set "vendor"
+# to pick one; sites without it use "lighthouse".
+VENDOR_ADAPTERS = {"lighthouse": "sheriffwebsites.vendors.lighthouse.LighthouseAdapter"}
+
 SHERIFF_SITES = {
     "Bryan": {
         "site": "https://bryancountyso.com",
@@ -151,6 +193,69 @@ SHERIFF_SITES = {
     "Washington": {"site": "https://www.washingtoncosheriff.com", "key": "bookie"},
 }
 
+# Which requests the scheduler sends first: "pages_first" discovers the whole
+# roster quickly, "details_first" finishes fallback items sooner. Tune with the
+# scheduler/depth_max and item_latency stats from CountyStats.
+SCHEDULING_POLICY = "pages_first"
+
+# Decode and validate pages off the reactor thread: "inline", "thread", or
+# "process". Bodies smaller than BOOKING_OFFLOAD_MIN_BYTES are parsed inline.
+BOOKING_OFFLOAD_MODE = "thread"
+BOOKING_OFFLOAD_MAX_WORKERS = 0
+BOOKING_OFFLOAD_MIN_BYTES = 64 * 1024
+
+# Validate each booking on a results page as ijson parses it, instead of
+# decoding the whole page first. Requires the "stream" extra. Results pages
+# larger than BOOKING_PAGE_MAXSIZE bytes are cancelled; 0 means no limit.
+BOOKING_STREAM_PARSE = False
+BOOKING_PAGE_MAXSIZE = 0
+
+# Export bookings as unvalidated RawBooking rows and validate them after the
+# crawl with "python -m sheriffwebsites.normalize", which needs the "archive"
+# extra. Give raw rows a JSON Lines feed with item_classes set to
+# ["sheriffwebsites.items.RawBooking"], as CSV would lose their JSON types.
+# Only rows missing a required field fall back to a detail request; rows with
+# invalid values are rejected by the normalizer instead.
+BOOKING_RAW_CAPTURE = False
+
+# Checkpoint per-county offsets and pending detail requests to CHECKPOINT_FILE
+# so an interrupted crawl resumes where it stopped. Writes are batched.
+# Progress only counts once its items are stored, so set CHECKPOINT_FILE
+# together with FEED_EXPORT_BATCH_ITEM_COUNT, and a %(batch_id)d or
+# %(batch_time)s placeholder in each feed URI. Unbatched feeds are only stored
+# when the crawl ends, so nothing is checkpointed before then.
+CHECKPOINT_FILE = None
+CHECKPOINT_BATCH_SIZE = 50
+CHECKPOINT_INTERVAL = 30
+
+# Per-site metadata cached between crawls, such as probed page sizes.
+SITE_CACHE_FILE = ".scrapy/sitecache.json"
+
+# Reuse each host's robots.txt for ROBOTSTXT_CACHE_TTL seconds instead of
+# fetching it on every crawl.
+ROBOTSTXT_CACHE_TTL = 24 * 60 * 60
+
+# After a 429 or 503, keep the host's delay at its Retry-After (or double the
+# current delay), at most RATE_LIMIT_MAX_DELAY, for RATE_LIMIT_TTL seconds.
+RATE_LIMIT_TTL = 24 * 60 * 60
+RATE_LIMIT_MAX_DELAY = 300
+
+# Re-crawl intervals for the refresh daemon (python -m sheriffwebsites.daemon),
+# in seconds. A county's interval is divided by REFRESH_BACKOFF when a crawl
+# finds its bookings changed and multiplied by it when they did not, within
+# REFRESH_MIN_INTERVAL and REFRESH_MAX_INTERVAL. Intervals persist in the site
+# cache.
+REFRESH_MIN_INTERVAL = 900
+REFRESH_MAX_INTERVAL = 21600
+REFRESH_BACKOFF = 2.0
+
+# Probe for the largest page size each county's Read.php honors, trying
+# PAGE_SIZE_CANDIDATES in order and caching the result for PAGE_SIZE_TTL
+# seconds. Counties that accept none keep their configured limit.
+PAGE_SIZE_PROBE = False
+PAGE_SIZE_CANDIDATES = [1000, 500, 250]
+PAGE_SIZE_TTL = 7 * 24 * 60 * 60
+
 FEEDS = {
     "az://my-container/exports/%(name)s/%(time)s.csv": {
         "format": "csv",
@@ -160,3 +265,14 @@ FEEDS = {
 }
 
 FEED_STORAGES = {"az": "sheriffwebsites.feedstorages.azure_blob.AzureBlobFeedStorage"}
+
+# Export BookingItems to CSV without Scrapy's per-item adaptation. The output
+# is identical to CsvItemExporter's.
+FEED_EXPORTERS = {"csv": "sheriffwebsites.exporters.BookingCsvItemExporter"}
+
+# Upload feeds, including each FEED_EXPORT_BATCH_ITEM_COUNT batch, in a shared
+# pool of AZURE_UPLOAD_THREADS threads. Transient failures are retried with
+# exponential backoff starting at AZURE_UPLOAD_BACKOFF seconds.
+AZURE_UPLOAD_THREADS = 4
+AZURE_UPLOAD_RETRIES = 3
+AZURE_UPLOAD_BACKOFF = 1.0
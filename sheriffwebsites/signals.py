@@ -0,0 +1,5 @@
+"""Custom signals sent by the sheriff spiders."""
+
+# Sent after a response is parsed, with ``county``, ``response``, and
+# ``result`` (a ``parsing.PageResult`` or ``parsing.DetailResult``).
+response_parsed = object()
@@ -0,0 +1,93 @@
+"""Cache per-site metadata between crawls."""
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Self
+
+from scrapy.settings import BaseSettings
+
+from .checkpoint import atomic_write_json
+
+
+class SiteCache:
+    """Per-county metadata with expiry, persisted to a local JSON file.
+
+    Each value is stored with the time it was set, and is ignored once it is
+    older than the ``ttl`` given when reading it. Host-wide values, such as
+    robots.txt rules, are keyed by host instead of county. Without a path the
+    cache only lives for the current process.
+
+    Parameters
+    ----------
+    path : str | Path | None
+        The cache file, if any.
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path else None
+        self.entries: dict[str, dict[str, dict[str, Any]]] = {}
+        if self.path is not None and self.path.exists():
+            self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+
+    @classmethod
+    def from_settings(cls, settings: BaseSettings) -> Self:
+        """Create the cache from Scrapy settings.
+
+        Parameters
+        ----------
+        settings : BaseSettings
+            The crawler settings.
+
+        Returns
+        -------
+        Self
+            The cache, persisted to ``SITE_CACHE_FILE`` if set.
+        """
+        return cls(settings.get("SITE_CACHE_FILE"))
+
+    def get(self, county: str, key: str, ttl: float) -> Any:
+        """Get a cached value if it has not expired.
+
+        Parameters
+        ----------
+        county : str
+            The county.
+        key : str
+            The metadata key.
+        ttl : float
+            The maximum age of the value in seconds.
+
+        Returns
+        -------
+        Any
+            The cached value, or None.
+        """
+        entry = self.entries.get(county, {}).get(key)
+        if entry is None or time.time() - entry["stored"] > ttl:
+            return None
+        return entry["value"]
+
+    def set(self, county: str, key: str, value: Any) -> None:
+        """Cache a value and write the cache file.
+
+        The file is read again first, so several caches can share it.
+
+        Parameters
+        ----------
+        county : str
+            The county.
+        key : str
+            The metadata key.
+        value : Any
+            A JSON-serializable value.
+        """
+        if self.path is not None and self.path.exists():
+            # Reloaded so that values other instances have written are kept.
+            self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+        self.entries.setdefault(county, {})[key] = {
+            "value": value,
+            "stored": time.time(),
+        }
+        if self.path is not None:
+            atomic_write_json(self.path, self.entries)
@@ -1,78 +1,342 @@
 """A Scrapy Spider for scraping bookings."""
 
-from collections.abc import Iterator, AsyncIterator
-from typing import Any, cast
+import time
+from collections.abc import AsyncIterator, Iterator
+from typing import Any, Self
 
-from pydantic import ValidationError
 import scrapy
+from scrapy import signals
+from scrapy.crawler import Crawler
+from twisted.internet.defer import CancelledError
+from twisted.python.failure import Failure
 
-from sheriffwebsites.items import BookingItem
-from sheriffwebsites.utils import (
-    delist_maybe,
-    ensure_json_response,
-    get_booking_url,
-    get_county_info,
-    stringify_dict,
-)
 from sheriffwebsites import settings
+from sheriffwebsites.checkpoint import Checkpoint
+from sheriffwebsites.items import BookingItem, RawBooking, StringPool
+from sheriffwebsites.offload import Offloader
+from sheriffwebsites.parsing import PageResult, parse_detail, parse_page
+from sheriffwebsites.signals import response_parsed
+from sheriffwebsites.sitecache import SiteCache
+from sheriffwebsites.utils import ensure_json_body, get_county_info, stringify_dict
+from sheriffwebsites.vendors import VendorAdapter, get_adapter, load_adapters
+
+# Request priorities for results pages and detail pages under each policy.
+SCHEDULING_POLICIES = {"pages_first": (1, 0), "details_first": (0, 1)}
 
 
 class BookingSpider(scrapy.Spider):
-    """Scrape booking JSON data from jail rosters built by Lighthouse.
+    """Scrape booking JSON data from jail rosters.
+
+    Each site's ``vendor`` entry selects the adapter that builds its requests
+    and extracts its responses, so one crawl covers every vendor.
 
     Attributes
     ----------
     name: str
         The spider name.
+    offloader : Offloader
+        Runs response decoding and validation off the reactor thread.
+    checkpoint : Checkpoint | None
+        Persisted crawl progress, if ``CHECKPOINT_FILE`` is set.
+    site_cache : SiteCache
+        Metadata about each site, such as its largest accepted page size.
+    adapters : dict[str, VendorAdapter]
+        The vendor adapters, keyed by vendor name.
+    string_pool : StringPool
+        Shared copies of repeated item strings, such as agencies and cities.
+    page_priority : int
+        The priority of results page requests.
+    detail_priority : int
+        The priority of detail requests.
     """
 
     name: str = "sheriffwebsites"
+    counties: str | None = None
+    offloader: Offloader
+    checkpoint: Checkpoint | None = None
+    site_cache: SiteCache
+    adapters: dict[str, VendorAdapter]
+    string_pool: StringPool
+    page_priority: int = 0
+    detail_priority: int = 0
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler, *args: Any, **kwargs: Any) -> Self:
+        """Create the spider and its helpers.
+
+        Parameters
+        ----------
+        crawler : Crawler
+            The crawler running the spider.
+        *args : Any
+            Positional arguments for the spider.
+        **kwargs : Any
+            Keyword arguments for the spider.
+
+        Returns
+        -------
+        Self
+            The spider.
+
+        Raises
+        ------
+        ValueError
+            Raised if ``SCHEDULING_POLICY`` is not supported.
+        """
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        policy = crawler.settings.get("SCHEDULING_POLICY", "pages_first")
+        if policy not in SCHEDULING_POLICIES:
+            raise ValueError(f"Unsupported scheduling policy: {policy}.")
+        spider.page_priority, spider.detail_priority = SCHEDULING_POLICIES[policy]
+        spider.offloader = Offloader.from_settings(crawler.settings)
+        crawler.signals.connect(spider.offloader.close, signal=signals.spider_closed)
+        spider.checkpoint = Checkpoint.from_crawler(crawler)
+        spider.site_cache = SiteCache.from_settings(crawler.settings)
+        spider.adapters = load_adapters(crawler.settings)
+        spider.string_pool = StringPool()
+        spider.selected_counties()
+        return spider
+
+    def selected_counties(self) -> list[str]:
+        """Get the counties to crawl.
+
+        Returns
+        -------
+        list[str]
+            The counties named by the ``counties`` argument, or every county.
+
+        Raises
+        ------
+        ValueError
+            Raised if a named county is not in ``SHERIFF_SITES``.
+        """
+        if not self.counties:
+            return list(settings.SHERIFF_SITES)
+        selected = [county.strip() for county in self.counties.split(",")]
+        if unknown := [c for c in selected if c not in settings.SHERIFF_SITES]:
+            raise ValueError(f"Unknown counties: {', '.join(unknown)}.")
+        return selected
+
+    def adapter(self, county: str) -> VendorAdapter:
+        """Get the adapter for a county's vendor.
+
+        Parameters
+        ----------
+        county : str
+            The county.
+
+        Returns
+        -------
+        VendorAdapter
+            The adapter.
+        """
+        return get_adapter(self.adapters, county)
+
+    def page_limit(self, county: str) -> int:
+        """Get the page size to request from a county.
+
+        Parameters
+        ----------
+        county : str
+            The county.
+
+        Returns
+        -------
+        int
+            The probed page size if cached, or the configured one.
+        """
+        probed = self.site_cache.get(
+            county, "page_limit", self.settings.getfloat("PAGE_SIZE_TTL")
+        )
+        return int(probed or get_county_info(county, "limit", 100))
 
     def request_query(
-        self, county: str, formdata: None | dict[str, Any] = None
+        self, county: str, offset: int = 0, limit: int | None = None
     ) -> scrapy.FormRequest:
-        """Make a query request with the provided form data.
+        """Make a query request for a page of results.
 
         Parameters
         ----------
         county : str
             The county to query.
-        formdata : None | dict[str, Any]
-            The current form data.
+        offset : int
+            The offset of the page.
+        limit : int | None
+            The page size, if not the county's usual one.
 
         Returns
         -------
         scrapy.FormRequest
-            A new request.
+            A new request. With ``BOOKING_PAGE_MAXSIZE`` set, larger pages are
+            cancelled and handled by ``query_failed``.
         """
-        formdata = formdata or {}
-        root_site = get_county_info(county, "site")
-        api_endpoint = get_county_info(
-            county, "read_endpoint", "dmxConnect/api/Booking/Read.php"
-        )
-        limit = get_county_info(county, "limit", 100)
-        formdata.update({"limit": limit})
+        adapter = self.adapter(county)
+        limit = limit or self.page_limit(county)
+        meta: dict[str, Any] = {
+            "fingerprint_key": (county, "query", offset, limit),
+            "query_offset": offset,
+            "query_limit": limit,
+        }
+        errback = None
+        if maxsize := self.settings.getint("BOOKING_PAGE_MAXSIZE"):
+            meta["download_maxsize"] = maxsize
+            errback = self.query_failed
         return scrapy.FormRequest(
-            f"{root_site}/{api_endpoint}",
+            adapter.query_url(county),
+            method=adapter.query_method,
             callback=self.parse_results,
+            errback=errback,
             cb_kwargs={"county": county},
-            formdata=stringify_dict(formdata),
+            formdata=stringify_dict(adapter.query_formdata(county, offset, limit)),
+            meta=meta,
+            priority=self.page_priority,
+        )
+
+    def query_failed(self, failure: Failure) -> Iterator[scrapy.FormRequest]:
+        """Log a failed results page, and retry it smaller if it was too large.
+
+        Scrapy cancels downloads larger than ``download_maxsize``, so a page
+        that was cancelled is requested again at the same offset with half
+        the limit. Every failure is counted in ``bookings/page_failures``, and
+        each retry in ``bookings/page_retries``.
+
+        Parameters
+        ----------
+        failure : Failure
+            The download or HTTP failure.
+
+        Yields
+        ------
+        scrapy.FormRequest
+            The page again with a smaller limit, if it was cancelled.
+        """
+        request = failure.request  # type: ignore[attr-defined]
+        county = request.cb_kwargs["county"]
+        offset, limit = request.meta["query_offset"], request.meta["query_limit"]
+        assert self.crawler.stats
+        self.crawler.stats.inc_value("bookings/page_failures")
+        self.logger.warning(
+            f"{county} page at offset {offset} with limit {limit} failed: "
+            f"{failure.getErrorMessage()}"
         )
+        if isinstance(failure.value, CancelledError) and limit > 1:
+            self.crawler.stats.inc_value("bookings/page_retries")
+            yield self.request_query(county, offset, limit // 2)
 
     async def start(self) -> AsyncIterator[scrapy.Request]:
-        """Send initial requests to each site.
+        """Send initial requests to each selected site.
+
+        With a checkpoint, each county resumes at its saved offset, and its
+        pending detail requests are sent again. Counties starting from the
+        first page may have their page size probed first.
 
         Yields
         ------
         scrapy. Request
             The initial requests.
         """
-        for county in settings.SHERIFF_SITES:
-            yield self.request_query(county)
+        for county in self.selected_counties():
+            if self.checkpoint is None:
+                yield self.request_first_page(county)
+                continue
+            for booking in list(self.checkpoint.pending.get(county, {}).values()):
+                yield self.request_booking(booking, county)
+            offset = self.checkpoint.resume_offset(county)
+            if offset:
+                yield self.request_query(county, offset)
+            elif offset is not None:
+                yield self.request_first_page(county)
+
+    def request_first_page(self, county: str) -> scrapy.FormRequest:
+        """Request a county's first page, probing its page size if needed.
+
+        Parameters
+        ----------
+        county : str
+            The county to query.
+
+        Returns
+        -------
+        scrapy.FormRequest
+            A plain query, or a probe if ``PAGE_SIZE_PROBE`` is set and no
+            page size is cached for the county.
+        """
+        ttl = self.settings.getfloat("PAGE_SIZE_TTL")
+        if not self.settings.getbool("PAGE_SIZE_PROBE") or self.site_cache.get(
+            county, "page_limit", ttl
+        ):
+            return self.request_query(county)
+        candidates = [int(c) for c in self.settings.getlist("PAGE_SIZE_CANDIDATES")]
+        return self.request_probe(county, candidates)
+
+    def request_probe(self, county: str, candidates: list[int]) -> scrapy.FormRequest:
+        """Request the first page with the largest remaining page size.
+
+        Parameters
+        ----------
+        county : str
+            The county to query.
+        candidates : list[int]
+            Page sizes still to try, largest first.
+
+        Returns
+        -------
+        scrapy.FormRequest
+            The probe request, or a plain query if no candidates remain.
+        """
+        if not candidates:
+            self.site_cache.set(
+                county, "page_limit", get_county_info(county, "limit", 100)
+            )
+            return self.request_query(county)
+        limit, *remaining = candidates
+        request = self.request_query(county, limit=limit)
+        request.meta.update({"probe_limit": limit, "probe_remaining": remaining})
+        return request.replace(errback=self.probe_failed)
+
+    def probe_failed(self, failure: Failure) -> Iterator[scrapy.FormRequest]:
+        """Try the next page size after a probe fails outright.
 
-    def parse_results(
+        Parameters
+        ----------
+        failure : Failure
+            The download or HTTP failure.
+
+        Yields
+        ------
+        scrapy.FormRequest
+            The next probe.
+        """
+        request = failure.request  # type: ignore[attr-defined]
+        county = request.cb_kwargs["county"]
+        self.logger.info(f"{county} rejected limit {request.meta['probe_limit']}")
+        yield self.request_probe(county, request.meta["probe_remaining"])
+
+    @staticmethod
+    def probe_accepted(page: PageResult, limit: int) -> bool:
+        """Check that a site honored a probed page size.
+
+        Parameters
+        ----------
+        page : PageResult
+            The first page returned for the probe.
+        limit : int
+            The page size requested.
+
+        Returns
+        -------
+        bool
+            Whether the page reports the requested limit and a consistent
+            offset, total, and row count.
+        """
+        rows = len(page.items) + len(page.failed)
+        return (
+            page.offset == 0 and page.limit == limit and rows == min(limit, page.total)
+        )
+
+    async def parse_results(
         self, response: scrapy.http.Response, county: str
-    ) -> Iterator[scrapy.Request | BookingItem]:
+    ) -> AsyncIterator[scrapy.Request | BookingItem | RawBooking]:
         """Parse initial array of booking IDs and send requests for each.
 
         Parameters
@@ -84,20 +348,54 @@ class BookingSpider(scrapy.Spider):
 
         Yields
         ------
-        scrapy.Request | BookingItem
+        scrapy.Request | BookingItem | RawBooking
             A request for each individual booking, or the booking itself.
         """
-        results = self.get_results(response, county)
-        offset = results["offset"]
-        total = results["total"]
-        limit = results["limit"]
-        for booking in results["data"]:
-            try:
-                yield self.get_booking_item(booking, county)
-            except ValidationError:
-                yield self.request_booking(booking, county)
-        if offset + limit <= total:
-            yield self.request_query(county, {"offset": offset + limit})
+        # Item latency is measured from when a page's bookings are discovered.
+        discovered_at = response.meta["discovered_at"] = time.monotonic()
+        body, encoding = ensure_json_body(response)
+        page = await self.offloader.run(
+            len(body),
+            parse_page,
+            body,
+            county,
+            self.adapter(county),
+            encoding,
+            self.settings.getbool("BOOKING_STREAM_PARSE"),
+            self.settings.getbool("BOOKING_RAW_CAPTURE"),
+        )
+        self.crawler.signals.send_catch_log(
+            response_parsed, county=county, response=response, result=page
+        )
+        if "probe_limit" in response.meta:
+            if not self.probe_accepted(page, response.meta["probe_limit"]):
+                yield self.request_probe(county, response.meta["probe_remaining"])
+                return
+            self.site_cache.set(county, "page_limit", page.limit)
+        pending = {}
+        pending_requests = []
+        for booking in page.failed:
+            request = self.request_booking(booking, county)
+            request.meta["discovered_at"] = discovered_at
+            pending[request.meta["booking_id"]] = booking
+            pending_requests.append(request)
+        next_offset = page.offset + page.limit
+        if self.checkpoint is not None:
+            # Staged before any item is yielded, and kept until all are stored.
+            self.checkpoint.page_done(
+                county,
+                next_offset if next_offset <= page.total else None,
+                pending,
+                page.items,
+            )
+        for item in page.items:
+            self.string_pool.intern_item(item)
+            yield item
+        for request in pending_requests:
+            yield request
+        if next_offset <= page.total:
+            # Keep a limit that was reduced after a page was too large.
+            yield self.request_query(county, next_offset, response.meta["query_limit"])
 
     def request_booking(self, booking: dict[str, Any], county: str) -> scrapy.Request:
         """Request an individual booking.
@@ -114,15 +412,22 @@ class BookingSpider(scrapy.Spider):
         scrapy.Request
             A request for the individual booking.
         """
+        adapter = self.adapter(county)
+        booking_id = adapter.booking_id(county, booking)
         return scrapy.Request(
-            url=get_booking_url(county, booking),
+            url=adapter.booking_url(county, booking),
             callback=self.parse_booking,
             cb_kwargs={"county": county},
+            meta={
+                "fingerprint_key": (county, "booking", booking_id),
+                "booking_id": booking_id,
+            },
+            priority=self.detail_priority,
         )
 
-    def parse_booking(
+    async def parse_booking(
         self, response: scrapy.http.Response, county: str
-    ) -> Iterator[BookingItem]:
+    ) -> AsyncIterator[BookingItem | RawBooking]:
         """Parse an individual booking.
 
         Parameters
@@ -134,7 +439,7 @@ class BookingSpider(scrapy.Spider):
 
         Yields
         ------
-        BookingItem
+        BookingItem | RawBooking
             The parsed booking.
 
         Raises
@@ -142,44 +447,23 @@ class BookingSpider(scrapy.Spider):
         InvalidResponseError
             Raised if the response isn't the correct type.
         """
-        response_data = ensure_json_response(response)
-        data_key = get_county_info(county, "key")
-        person = delist_maybe(response_data[data_key])
-        yield self.get_booking_item(person, county)
-
-    @staticmethod
-    def get_results(response: scrapy.http.Response, county: str) -> dict[str, Any]:
-        """Get the query results from the response body.
-
-        Parameters
-        ----------
-        response : scrapy.http.Response
-            The initial response.
-        county : str
-            The county jail being scraped.
-
-        Returns
-        -------
-        dict[str, Any]
-            The results dictionary.
-        """
-        json_response = ensure_json_response(response)
-        results_key = get_county_info(county, "results_key", "bookings")
-        return cast(dict[str, Any], json_response[results_key])
-
-    def get_booking_item(self, data: dict[str, Any], county: str) -> BookingItem:
-        """Create a BookingItem from scraped data.
-
-        Parameters
-        ----------
-        data : dict[str, Any]
-            The scraped data.
-        county : str
-            The county from which the data was scraped.
-
-        Returns
-        -------
-        BookingItem
-            The booking item.
-        """
-        return BookingItem(**(data | {"county": county}))
+        body, encoding = ensure_json_body(response)
+        detail = await self.offloader.run(
+            len(body),
+            parse_detail,
+            body,
+            county,
+            self.adapter(county),
+            encoding,
+            self.settings.getbool("BOOKING_RAW_CAPTURE"),
+        )
+        self.crawler.signals.send_catch_log(
+            response_parsed, county=county, response=response, result=detail
+        )
+        if self.checkpoint is not None:
+            # Keyed by booking ID, which survives redirects unlike the URL.
+            self.checkpoint.detail_done(
+                county, response.meta["booking_id"], [detail.item]
+            )
+        self.string_pool.intern_item(detail.item)
+        yield detail.item
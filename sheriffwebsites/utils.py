@@ -1,6 +1,6 @@
 """Utility functions for the scraper."""
 
-from types import UnionType, NoneType
+from types import NoneType, UnionType
 from typing import Any, TypeVar, Union, get_args, get_origin, overload
 
 import scrapy
@@ -98,8 +98,8 @@ def get_county_info(county: str, key: str, default: Any = None) -> Any:
     return SHERIFF_SITES[county].get(key, default)
 
 
-def ensure_json_response(response: scrapy.http.Response) -> Any:
-    """Ensure response has JSON data and return it.
+def ensure_json_body(response: scrapy.http.Response) -> tuple[bytes, str]:
+    """Ensure response has JSON data and return the raw body.
 
     Parameters
     ----------
@@ -108,16 +108,17 @@ def ensure_json_response(response: scrapy.http.Response) -> Any:
 
     Returns
     -------
-    Any
-        The JSON data.
+    tuple[bytes, str]
+        The undecoded JSON body and the response encoding.
 
     Raises
     ------
     InvalidResponseError
+        Raised if the response isn't a text response.
     """
-    if not hasattr(response, "json"):
+    if not isinstance(response, scrapy.http.TextResponse):
         raise InvalidResponseError
-    return response.json()
+    return response.body, response.encoding
 
 
 def stringify_dict(dirty_dict: dict[str, Any]) -> dict[str, str]:
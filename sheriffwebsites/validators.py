@@ -1,12 +1,12 @@
 """Pydantic validators for parsing booking information."""
 
-from collections.abc import Callable
 import datetime as dt
-from typing import TypeVar
 import re
+from collections.abc import Callable
+from functools import cache
+from typing import TypeVar
 
 from pydantic import ValidationError
-from us.states import lookup
 
 X = TypeVar("X")
 Y = TypeVar("Y")
@@ -30,34 +30,77 @@ def validate_state(state_candidate: str) -> str:
     ValueError
         Raised if the string is not a valid state.
     """
-    state = lookup(state_candidate)
-    if state is not None:
-        return state.abbr
+    abbr = lookup_state(state_candidate)
+    if abbr is not None:
+        return abbr
     raise ValueError(f"{state_candidate} is not a valid state name.")
 
 
-def soft_validate(value: X, handler: Callable[[X], Y]) -> Y | None:
-    """Return None if validation fails."""
+@cache
+def lookup_state(state_candidate: str) -> str | None:
+    """Look up a state abbreviation, loading the ``us`` tables on first use.
+
+    Results are cached, since the same few states repeat across bookings.
+
+    Parameters
+    ----------
+    state_candidate : str
+        A state name or abbreviation.
+
+    Returns
+    -------
+    str | None
+        The state abbreviation, or None if the state is not recognized.
+    """
+    from us.states import lookup
+
+    state = lookup(state_candidate)
+    return state.abbr if state is not None else None
+
+
+def soft_validate(
+    value: X,
+    handler: Callable[[X], Y],
+    on_error: Callable[[ValidationError], None] | None = None,
+) -> Y | None:
+    """Return None if validation fails.
+
+    Parameters
+    ----------
+    value : X
+        The value to validate.
+    handler : Callable[[X], Y]
+        The validator handler for the current field.
+    on_error : Callable[[ValidationError], None] | None
+        Called with the error if validation fails.
+
+    Returns
+    -------
+    Y | None
+        The validated value, or None.
+    """
     try:
         return handler(value)
-    except ValidationError:
+    except ValidationError as exc:
+        if on_error is not None:
+            on_error(exc)
         return None
 
 
-def convert_date(value: str | dt.datetime) -> dt.datetime | str:
+def convert_date(value: X) -> dt.datetime | X:
     """Convert supported date formats.
 
     Parameters
     ----------
-    value : str | dt.datetime
-        The date string to convert (or a datetime).
+    value : X
+        The date string to convert, or any other value to leave to pydantic.
 
     Returns
     -------
-    dt.datetime | str
-        The converted date, or the string if not converted.
+    dt.datetime | X
+        The converted date, or the value if not converted.
     """
-    if isinstance(value, dt.datetime):
+    if not isinstance(value, str):
         return value
     if re.match(r"\d{2}/\d{2}/\d{4}", value):
         return dt.datetime.strptime(value, "%m/%d/%Y")
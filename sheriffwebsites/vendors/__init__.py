@@ -0,0 +1,57 @@
+"""Adapters for the roster vendors behind each sheriff site."""
+
+from scrapy.settings import BaseSettings
+from scrapy.utils.misc import load_object
+
+from sheriffwebsites.utils import get_county_info
+
+from .base import PageInfo, VendorAdapter
+
+__all__ = ["PageInfo", "VendorAdapter", "get_adapter", "load_adapters"]
+
+
+def load_adapters(settings: BaseSettings) -> dict[str, VendorAdapter]:
+    """Load the adapters named in ``VENDOR_ADAPTERS``.
+
+    Parameters
+    ----------
+    settings : BaseSettings
+        The crawler settings.
+
+    Returns
+    -------
+    dict[str, VendorAdapter]
+        Adapters keyed by vendor name.
+    """
+    return {
+        name: load_object(path)()
+        for name, path in settings.getdict("VENDOR_ADAPTERS").items()
+    }
+
+
+def get_adapter(adapters: dict[str, VendorAdapter], county: str) -> VendorAdapter:
+    """Get the adapter for a county's vendor.
+
+    Parameters
+    ----------
+    adapters : dict[str, VendorAdapter]
+        Adapters keyed by vendor name.
+    county : str
+        The county.
+
+    Returns
+    -------
+    VendorAdapter
+        The adapter named by the county's ``vendor`` entry, which defaults to
+        ``"lighthouse"``.
+
+    Raises
+    ------
+    ValueError
+        Raised if no adapter is registered for the vendor.
+    """
+    vendor = get_county_info(county, "vendor", "lighthouse")
+    try:
+        return adapters[vendor]
+    except KeyError:
+        raise ValueError(f"No adapter registered for vendor {vendor}.") from None
@@ -0,0 +1,201 @@
+"""The interface every roster vendor adapter implements."""
+
+import json
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any, ClassVar
+
+
+@dataclass
+class PageInfo:
+    """The pagination state and rows of a results page.
+
+    Attributes
+    ----------
+    offset : int
+        The offset of the page.
+    total : int
+        The total number of bookings available.
+    limit : int
+        The page size used by the site.
+    rows : Iterable[dict[str, Any]]
+        The raw bookings on the page. Streamed pages yield them as they are
+        parsed.
+    """
+
+    offset: int
+    total: int
+    limit: int
+    rows: Iterable[dict[str, Any]]
+
+
+class VendorAdapter(ABC):
+    """Translate between BookingSpider and one roster vendor's API.
+
+    Adapters are stateless and picklable, so they can be handed to the
+    process pool along with the response body. Subclasses must implement
+    every abstract method, or they cannot be created.
+
+    Attributes
+    ----------
+    name : str
+        The vendor name used in the ``vendor`` entry of ``SHERIFF_SITES``.
+    query_method : str
+        The HTTP method for results queries.
+    field_aliases : dict[str, str]
+        Vendor field names mapped to ``BookingItem`` field names, for fields
+        that ``BookingItem`` does not already accept.
+    """
+
+    name: ClassVar[str]
+    query_method: ClassVar[str] = "POST"
+    field_aliases: ClassVar[dict[str, str]] = {}
+
+    @abstractmethod
+    def query_url(self, county: str) -> str:
+        """Get the URL for results queries.
+
+        Parameters
+        ----------
+        county : str
+            The county to query.
+
+        Returns
+        -------
+        str
+            The query URL.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def query_formdata(self, county: str, offset: int, limit: int) -> dict[str, Any]:
+        """Get the form data for a results query.
+
+        Parameters
+        ----------
+        county : str
+            The county to query.
+        offset : int
+            The offset of the page.
+        limit : int
+            The page size.
+
+        Returns
+        -------
+        dict[str, Any]
+            The form data.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def extract_page(self, data: Any, county: str) -> PageInfo:
+        """Extract pagination state and rows from a decoded results page.
+
+        Parameters
+        ----------
+        data : Any
+            The decoded response.
+        county : str
+            The county being scraped.
+
+        Returns
+        -------
+        PageInfo
+            The page.
+        """
+        raise NotImplementedError
+
+    def stream_page(self, body: bytes, county: str) -> PageInfo:
+        """Parse a UTF-8 results page incrementally.
+
+        Adapters that support streaming return a page whose rows are parsed
+        one at a time, so the whole decoded page never sits in memory. By
+        default the whole body is decoded and passed to ``extract_page``.
+
+        Parameters
+        ----------
+        body : bytes
+            The raw response body.
+        county : str
+            The county being scraped.
+
+        Returns
+        -------
+        PageInfo
+            The page.
+        """
+        return self.extract_page(json.loads(body), county)
+
+    @abstractmethod
+    def booking_id(self, county: str, booking: dict[str, Any]) -> str:
+        """Get the ID that identifies a booking's detail page.
+
+        Parameters
+        ----------
+        county : str
+            The county being scraped.
+        booking : dict[str, Any]
+            The raw booking from a results page.
+
+        Returns
+        -------
+        str
+            The booking ID.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def booking_url(self, county: str, booking: dict[str, Any]) -> str:
+        """Get the detail URL for a booking.
+
+        Parameters
+        ----------
+        county : str
+            The county being scraped.
+        booking : dict[str, Any]
+            The raw booking from a results page.
+
+        Returns
+        -------
+        str
+            The detail URL.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def extract_booking(self, data: Any, county: str) -> dict[str, Any]:
+        """Extract the raw booking from a decoded detail response.
+
+        Parameters
+        ----------
+        data : Any
+            The decoded response.
+        county : str
+            The county being scraped.
+
+        Returns
+        -------
+        dict[str, Any]
+            The raw booking.
+        """
+        raise NotImplementedError
+
+    def normalize(self, booking: dict[str, Any]) -> dict[str, Any]:
+        """Rename vendor fields so ``BookingItem`` can validate them.
+
+        Parameters
+        ----------
+        booking : dict[str, Any]
+            The raw booking.
+
+        Returns
+        -------
+        dict[str, Any]
+            The booking with ``field_aliases`` applied.
+        """
+        if not self.field_aliases:
+            return booking
+        return {
+            self.field_aliases.get(key, key): value for key, value in booking.items()
+        }
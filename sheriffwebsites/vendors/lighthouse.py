@@ -0,0 +1,174 @@
+"""Adapter for jail rosters built by Lighthouse on dmxConnect."""
+
+from collections.abc import Iterator
+from typing import Any, cast
+
+from sheriffwebsites.utils import delist_maybe, get_booking_url, get_county_info
+
+from .base import PageInfo, VendorAdapter
+
+
+class LighthouseAdapter(VendorAdapter):
+    """Query ``Read.php`` and ``getbookie.php`` on Lighthouse sites.
+
+    Per-county quirks (``results_key``, ``key``, ``booking_key``,
+    ``read_endpoint``, and ``booking_endpoint``) come from ``SHERIFF_SITES``.
+    """
+
+    name = "lighthouse"
+
+    def query_url(self, county: str) -> str:
+        """Get the ``Read.php`` URL.
+
+        Parameters
+        ----------
+        county : str
+            The county to query.
+
+        Returns
+        -------
+        str
+            The query URL.
+        """
+        root_site = get_county_info(county, "site")
+        api_endpoint = get_county_info(
+            county, "read_endpoint", "dmxConnect/api/Booking/Read.php"
+        )
+        return f"{root_site}/{api_endpoint}"
+
+    def query_formdata(self, county: str, offset: int, limit: int) -> dict[str, Any]:
+        """Get the form data for a ``Read.php`` query.
+
+        Parameters
+        ----------
+        county : str
+            The county to query.
+        offset : int
+            The offset of the page.
+        limit : int
+            The page size.
+
+        Returns
+        -------
+        dict[str, Any]
+            The form data.
+        """
+        if offset:
+            return {"offset": offset, "limit": limit}
+        return {"limit": limit}
+
+    def extract_page(self, data: Any, county: str) -> PageInfo:
+        """Extract the results under the county's ``results_key``.
+
+        Parameters
+        ----------
+        data : Any
+            The decoded response.
+        county : str
+            The county being scraped.
+
+        Returns
+        -------
+        PageInfo
+            The page.
+        """
+        results = data[get_county_info(county, "results_key", "bookings")]
+        return PageInfo(
+            offset=results["offset"],
+            total=results["total"],
+            limit=results["limit"],
+            rows=results["data"],
+        )
+
+    def stream_page(self, body: bytes, county: str) -> PageInfo:
+        """Stream the rows under the county's ``results_key`` with ijson.
+
+        The offset, limit, and total are read in a first pass that builds no
+        rows, and stops early when, as usual, they precede the data.
+
+        Parameters
+        ----------
+        body : bytes
+            The raw response body.
+        county : str
+            The county being scraped.
+
+        Returns
+        -------
+        PageInfo
+            The page, whose rows are parsed as they are iterated.
+        """
+        import ijson
+
+        key = get_county_info(county, "results_key", "bookings")
+        wanted = {f"{key}.{name}": name for name in ("offset", "limit", "total")}
+        found: dict[str, int] = {}
+        for prefix, event, value in ijson.parse(body):
+            if prefix in wanted and event == "number":
+                found[wanted[prefix]] = int(value)
+                if len(found) == len(wanted):
+                    break
+        return PageInfo(
+            offset=found["offset"],
+            total=found["total"],
+            limit=found["limit"],
+            rows=self._stream_rows(body, f"{key}.data.item"),
+        )
+
+    @staticmethod
+    def _stream_rows(body: bytes, prefix: str) -> Iterator[dict[str, Any]]:
+        """Yield the objects at a prefix, with floats rather than decimals."""
+        import ijson
+
+        yield from ijson.items(body, prefix, use_float=True)
+
+    def booking_id(self, county: str, booking: dict[str, Any]) -> str:
+        """Get the booking's value for the county's ``booking_key``.
+
+        Parameters
+        ----------
+        county : str
+            The county being scraped.
+        booking : dict[str, Any]
+            The raw booking from a results page.
+
+        Returns
+        -------
+        str
+            The booking ID.
+        """
+        return str(booking[get_county_info(county, "booking_key", "BookingID")])
+
+    def booking_url(self, county: str, booking: dict[str, Any]) -> str:
+        """Get the ``getbookie.php`` URL for a booking.
+
+        Parameters
+        ----------
+        county : str
+            The county being scraped.
+        booking : dict[str, Any]
+            The raw booking from a results page.
+
+        Returns
+        -------
+        str
+            The detail URL.
+        """
+        return get_booking_url(county, booking)
+
+    def extract_booking(self, data: Any, county: str) -> dict[str, Any]:
+        """Extract the booking under the county's ``key``.
+
+        Parameters
+        ----------
+        data : Any
+            The decoded response.
+        county : str
+            The county being scraped.
+
+        Returns
+        -------
+        dict[str, Any]
+            The raw booking.
+        """
+        return cast(dict[str, Any], delist_maybe(data[get_county_info(county, "key")]))
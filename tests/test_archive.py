@@ -0,0 +1,181 @@
+"""Tests for the booking archive."""
+
+import datetime as dt
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+pytest.importorskip("pyarrow")
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from sheriffwebsites.archive import BookingArchive, main, read_export
+from sheriffwebsites.items import BookingItem
+
+HEADER = ",".join(BookingItem.model_fields)
+
+
+def booking_row(county: str, booking_id: str, person_id: str, **fields: str) -> str:
+    """Build a CSV row, leaving unset fields empty."""
+    values = {"county": county, "booking_id": booking_id, "person_id": person_id}
+    values.update(fields)
+    return ",".join(values.get(name, "") for name in BookingItem.model_fields)
+
+
+@pytest.fixture
+def export(tmp_path: Path) -> Path:
+    """Write a feed with a repeated header, as concatenated exports have."""
+    rows = [
+        HEADER,
+        booking_row("Payne", "1", "10", booking_date="2025-01-05 08:00:00"),
+        booking_row(
+            "Payne",
+            "2",
+            "11",
+            booking_date="2025-01-20 09:30:00",
+            release_date="2025-02-02 12:00:00",
+            bond_total="500.0",
+        ),
+        HEADER,
+        booking_row("Payne", "3", "10", booking_date="2025-02-10 10:00:00"),
+        booking_row("Cimarron", "4", "10", booking_date="2025-01-07 07:00:00"),
+    ]
+    path = tmp_path / "bookings.csv"
+    path.write_text("\n".join(rows) + "\n")
+    return path
+
+
+def test_read_export(export: Path) -> None:
+    """Test that header rows are dropped and columns are typed."""
+    table = read_export(export)
+    assert table.num_rows == 4
+    assert table.column_names == list(BookingItem.model_fields)
+    assert table["bond_total"].to_pylist()[1] == 500.0
+    assert table["booking_date"][0].as_py() == dt.datetime(2025, 1, 5, 8)
+
+
+def test_append_partitions_and_dedupes(tmp_path: Path, export: Path) -> None:
+    """Test that appends are partitioned and keep one row per booking."""
+    archive = BookingArchive(tmp_path / "archive")
+    assert archive.append(read_export(export)) == 3
+    assert archive.partition_path("Payne", "2025-01").exists()
+    assert archive.partition_path("Cimarron", "2025-01").exists()
+
+    archive.append(read_export(export))
+    payne = archive.bookings_for("Payne", "10")
+    assert payne["booking_id"].to_pylist() == ["1", "3"]
+    assert payne["county"].to_pylist() == ["Payne", "Payne"]
+
+
+def test_repeated_columns_are_dictionary_encoded(tmp_path: Path, export: Path) -> None:
+    """Test that repeated columns stay encoded, even over older partitions."""
+    archive = BookingArchive(tmp_path / "archive")
+    bookings = read_export(export)
+    assert pa.types.is_dictionary(bookings.schema.field("city").type)
+    cimarron = bookings.filter(pc.equal(bookings["county"], "Cimarron"))
+    path = archive.partition_path("Cimarron", "2025-01")
+    path.parent.mkdir(parents=True)
+    # Partitions written before encoding hold plain strings.
+    legacy = pa.Table.from_pylist(cimarron.drop_columns(["county"]).to_pylist())
+    assert not any(pa.types.is_dictionary(field.type) for field in legacy.schema)
+    pq.write_table(legacy, path)
+
+    archive.append(bookings)
+    assert pa.types.is_dictionary(pq.read_schema(path).field("city").type)
+    assert archive.bookings_for("Cimarron", "10")["booking_id"].to_pylist() == ["4"]
+
+
+def test_in_custody(tmp_path: Path, export: Path) -> None:
+    """Test point-in-time lookups of who was held."""
+    archive = BookingArchive(tmp_path / "archive")
+    archive.append(read_export(export))
+
+    held = archive.in_custody("Payne", dt.datetime(2025, 1, 25))
+    assert held["booking_id"].to_pylist() == ["1", "2"]
+    held = archive.in_custody("Payne", dt.datetime(2025, 2, 15))
+    assert held["booking_id"].to_pylist() == ["1", "3"]
+    assert archive.in_custody("Payne", dt.datetime(2024, 12, 1)).num_rows == 0
+    assert archive.in_custody("Tulsa", dt.datetime(2025, 2, 15)).num_rows == 0
+
+
+def test_in_custody_with_long_and_open_stays(tmp_path: Path) -> None:
+    """Test that lookups find open bookings from before the longest stay."""
+    rows = [
+        HEADER,
+        booking_row("Payne", "1", "10", booking_date="2024-01-01 00:00:00"),
+        booking_row(
+            "Payne",
+            "2",
+            "11",
+            booking_date="2024-06-01 00:00:00",
+            release_date="2024-06-05 00:00:00",
+        ),
+        booking_row(
+            "Payne",
+            "3",
+            "12",
+            booking_date="2025-01-01 00:00:00",
+            release_date="2025-01-10 00:00:00",
+        ),
+    ]
+    path = tmp_path / "bookings.csv"
+    path.write_text("\n".join(rows) + "\n")
+    archive = BookingArchive(tmp_path / "archive")
+    archive.append(read_export(path))
+
+    held = archive.in_custody("Payne", dt.datetime(2025, 1, 5))
+    assert held["booking_id"].to_pylist() == ["1", "3"]
+    held = archive.in_custody("Payne", dt.datetime(2024, 6, 3))
+    assert held["booking_id"].to_pylist() == ["1", "2"]
+
+
+def test_append_reads_only_new_partitions(
+    tmp_path: Path, export: Path, mocker: MockerFixture
+) -> None:
+    """Test that appends update the indexes from rewritten partitions only."""
+    archive = BookingArchive(tmp_path / "archive")
+    archive.append(read_export(export))
+    path = tmp_path / "later.csv"
+    path.write_text(
+        "\n".join(
+            [
+                HEADER,
+                booking_row("Payne", "5", "10", booking_date="2025-03-01 08:00:00"),
+            ]
+        )
+    )
+    spy = mocker.spy(BookingArchive, "_partition_keys")
+    archive.append(read_export(path))
+    assert [call.args[1:] for call in spy.call_args_list] == [("Payne", "2025-03")]
+    payne = archive.bookings_for("Payne", "10")
+    assert payne["booking_id"].to_pylist() == ["1", "3", "5"]
+    assert archive.bookings_for("Cimarron", "10")["booking_id"].to_pylist() == ["4"]
+
+
+def test_lookups_read_row_groups(
+    tmp_path: Path, export: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that rows are found across row groups of a partition."""
+    monkeypatch.setattr("sheriffwebsites.archive.ROW_GROUP_SIZE", 1)
+    archive = BookingArchive(tmp_path / "archive")
+    archive.append(read_export(export))
+    path = archive.partition_path("Payne", "2025-01")
+    assert pq.ParquetFile(path).num_row_groups == 2
+    assert archive.bookings_for("Payne", "11")["booking_id"].to_pylist() == ["2"]
+    held = archive.in_custody("Payne", dt.datetime(2025, 1, 25))
+    assert held["booking_id"].to_pylist() == ["1", "2"]
+
+
+def test_cli(
+    tmp_path: Path, export: Path, capsysbinary: pytest.CaptureFixture[bytes]
+) -> None:
+    """Test appending and querying from the command line."""
+    root = str(tmp_path / "archive")
+    assert main([root, "append", str(export)]) == 0
+    assert main([root, "person", "Cimarron", "10"]) == 0
+    lines = capsysbinary.readouterr().out.decode().splitlines()
+    assert len(lines) == 2
+    assert lines[1].startswith('"Cimarron","4","10"')
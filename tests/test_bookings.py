@@ -0,0 +1,215 @@
+"""Tests for the booking spider."""
+
+import json
+from pathlib import Path
+
+import pytest
+import pytest_twisted
+import scrapy
+from pytest_mock import MockerFixture
+from scrapy.http import Response, TextResponse
+from scrapy.spidermiddlewares.httperror import HttpError
+from scrapy.utils.test import get_crawler
+from twisted.internet.defer import CancelledError
+from twisted.python.failure import Failure
+
+from sheriffwebsites import settings
+from sheriffwebsites.parsing import PageResult
+from sheriffwebsites.sitecache import SiteCache
+from sheriffwebsites.spiders.bookings import BookingSpider
+
+BOOKING = {
+    "BookingID": "13826",
+    "InmateID": "40730",
+    "BookingDate": "2025-01-22T02:44:00",
+    "FName": "TESTFIRST",
+    "LName": "TESTLAST",
+    "Sex": "M",
+    "Race": "W",
+    "Charges": "TEST CHARGE",
+    "dob": "01/01/1976",
+}
+
+
+def test_probe_accepted() -> None:
+    """Test that probes require the site to honor the requested limit."""
+    full = PageResult(0, 1200, 500, failed=[{}] * 500)
+    assert BookingSpider.probe_accepted(full, 500)
+    assert not BookingSpider.probe_accepted(full, 1000)
+    short = PageResult(0, 300, 1000, failed=[{}] * 300)
+    assert BookingSpider.probe_accepted(short, 1000)
+    truncated = PageResult(0, 1200, 1000, failed=[{}] * 500)
+    assert not BookingSpider.probe_accepted(truncated, 1000)
+
+
+@pytest.mark.parametrize(
+    ("policy", "page_first"), [("pages_first", True), ("details_first", False)]
+)
+def test_scheduling_policy(policy: str, page_first: bool) -> None:
+    """The policy decides whether pages or details are sent first."""
+    crawler = get_crawler(
+        BookingSpider,
+        {
+            "SCHEDULING_POLICY": policy,
+            "VENDOR_ADAPTERS": settings.VENDOR_ADAPTERS,
+            "SITE_CACHE_FILE": None,
+        },
+    )
+    spider = BookingSpider.from_crawler(crawler)
+    page = spider.request_query("Caddo", 100)
+    detail = spider.request_booking({"BookingID": "1"}, "Caddo")
+    assert (page.priority > detail.priority) is page_first
+
+
+def test_unknown_scheduling_policy() -> None:
+    """Unknown policies are rejected."""
+    crawler = get_crawler(BookingSpider, {"SCHEDULING_POLICY": "random"})
+    with pytest.raises(ValueError):
+        BookingSpider.from_crawler(crawler)
+
+
+def test_selected_counties() -> None:
+    """The counties argument restricts the crawl to known counties."""
+    crawler = get_crawler(BookingSpider, {"SITE_CACHE_FILE": None})
+    spider = BookingSpider.from_crawler(crawler, counties="Creek, Caddo")
+    assert spider.selected_counties() == ["Creek", "Caddo"]
+    assert BookingSpider.from_crawler(crawler).selected_counties() == list(
+        settings.SHERIFF_SITES
+    )
+    with pytest.raises(ValueError, match="Nowhere"):
+        BookingSpider.from_crawler(crawler, counties="Creek,Nowhere")
+
+
+def test_oversized_pages_are_retried_smaller(mocker: MockerFixture) -> None:
+    """Pages cancelled for exceeding the size ceiling are retried smaller."""
+    crawler = get_crawler(
+        BookingSpider,
+        {
+            "VENDOR_ADAPTERS": settings.VENDOR_ADAPTERS,
+            "SITE_CACHE_FILE": None,
+            "BOOKING_PAGE_MAXSIZE": 1024,
+        },
+    )
+    spider = BookingSpider.from_crawler(crawler)
+    assert crawler.stats
+    request = spider.request_query("Caddo", 200, 100)
+    assert request.errback == spider.query_failed
+    cancelled = mocker.Mock(spec=Failure, request=request, value=CancelledError())
+    (retry,) = spider.query_failed(cancelled)
+    assert retry.meta["query_offset"] == 200
+    assert retry.meta["query_limit"] == 50
+    timeout = mocker.Mock(spec=Failure, request=request, value=TimeoutError())
+    assert list(spider.query_failed(timeout)) == []
+    assert crawler.stats.get_value("bookings/page_failures") == 2
+    assert crawler.stats.get_value("bookings/page_retries") == 1
+
+
+@pytest_twisted.ensureDeferred
+async def test_redirected_details_leave_the_checkpoint(tmp_path: Path) -> None:
+    """Pending details are cleared by booking ID, even after a redirect."""
+    crawler = get_crawler(
+        BookingSpider,
+        {
+            "VENDOR_ADAPTERS": settings.VENDOR_ADAPTERS,
+            "SITE_CACHE_FILE": None,
+            "CHECKPOINT_FILE": str(tmp_path / "checkpoint.json"),
+        },
+    )
+    spider = BookingSpider.from_crawler(crawler)
+    checkpoint = spider.checkpoint
+    assert checkpoint is not None
+    booking = BOOKING
+    request = spider.request_booking(booking, "Caddo")
+    checkpoint.page_done("Caddo", None, {request.meta["booking_id"]: booking})
+    redirected = request.replace(url=request.url.replace("http:", "https:"))
+    response = TextResponse(
+        redirected.url,
+        body=json.dumps({"bookie": [booking]}).encode(),
+        encoding="utf-8",
+        request=redirected,
+    )
+    items = [item async for item in spider.parse_booking(response, "Caddo")]
+    checkpoint.item_scraped(items[0])
+    assert "Caddo" not in checkpoint.pending
+
+
+def probing_spider(tmp_path: Path) -> BookingSpider:
+    """Create a spider that probes page sizes 4 and 2."""
+    crawler = get_crawler(
+        BookingSpider,
+        {
+            "VENDOR_ADAPTERS": settings.VENDOR_ADAPTERS,
+            "SITE_CACHE_FILE": str(tmp_path / "sitecache.json"),
+            "PAGE_SIZE_PROBE": True,
+            "PAGE_SIZE_CANDIDATES": [4, 2],
+            "PAGE_SIZE_TTL": 60,
+        },
+    )
+    return BookingSpider.from_crawler(crawler)
+
+
+def results_page(
+    request: scrapy.Request, offset: int, limit: int, total: int, rows: int
+) -> TextResponse:
+    """Make a results page response for a request."""
+    page = {"offset": offset, "limit": limit, "total": total, "data": [BOOKING] * rows}
+    return TextResponse(
+        request.url,
+        body=json.dumps({"bookings": page}).encode(),
+        encoding="utf-8",
+        request=request,
+    )
+
+
+def test_probes_fall_back_to_configured_limit(
+    tmp_path: Path, mocker: MockerFixture
+) -> None:
+    """Failed probes try each candidate in order, then the configured limit."""
+    spider = probing_spider(tmp_path)
+    request = spider.request_first_page("Caddo")
+    tried = []
+    for error in (HttpError(Response(request.url, status=500)), TimeoutError()):
+        tried.append(request.meta["probe_limit"])
+        assert request.errback == spider.probe_failed
+        failure = mocker.Mock(spec=Failure, request=request, value=error)
+        (request,) = spider.probe_failed(failure)
+    assert tried == [4, 2]
+    assert "probe_limit" not in request.meta
+    assert request.meta["query_limit"] == 100
+    assert SiteCache(tmp_path / "sitecache.json").get("Caddo", "page_limit", 60) == 100
+
+
+@pytest.mark.parametrize(("offset", "limit", "rows"), [(0, 2, 2), (4, 4, 4), (0, 4, 3)])
+@pytest_twisted.ensureDeferred
+async def test_inconsistent_probes_are_rejected(
+    tmp_path: Path, offset: int, limit: int, rows: int
+) -> None:
+    """A page reporting another limit, offset or row count tries the next size."""
+    spider = probing_spider(tmp_path)
+    request = spider.request_first_page("Caddo")
+    response = results_page(request, offset, limit, 10, rows)
+    (retry,) = [item async for item in spider.parse_results(response, "Caddo")]
+    assert isinstance(retry, scrapy.Request)
+    assert retry.meta["probe_limit"] == 2
+    assert spider.site_cache.get("Caddo", "page_limit", 60) is None
+
+
+@pytest_twisted.ensureDeferred
+async def test_accepted_probe_is_reused(tmp_path: Path, mocker: MockerFixture) -> None:
+    """An accepted page size is cached and reused until it expires."""
+    clock = mocker.patch("sheriffwebsites.sitecache.time.time", return_value=1000.0)
+    spider = probing_spider(tmp_path)
+    request = spider.request_first_page("Caddo")
+    response = results_page(request, 0, 4, 10, 4)
+    output = [item async for item in spider.parse_results(response, "Caddo")]
+    (next_page,) = [out for out in output if isinstance(out, scrapy.FormRequest)]
+    assert next_page.meta["query_offset"] == 4
+    assert next_page.meta["query_limit"] == 4
+
+    clock.return_value = 1050.0
+    reused = probing_spider(tmp_path).request_first_page("Caddo")
+    assert "probe_limit" not in reused.meta
+    assert reused.meta["query_limit"] == 4
+    clock.return_value = 1100.0
+    expired = probing_spider(tmp_path).request_first_page("Caddo")
+    assert expired.meta["probe_limit"] == 4
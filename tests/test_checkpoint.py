@@ -0,0 +1,116 @@
+"""Tests for crawl checkpoints."""
+
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+from scrapy.extensions.feedexport import ItemFilter
+from scrapy.statscollectors import MemoryStatsCollector
+from scrapy.utils.test import get_crawler
+
+from sheriffwebsites.checkpoint import Checkpoint, atomic_write_json
+
+
+def test_atomic_write_json(tmp_path: Path) -> None:
+    """Test that JSON is written without leaving temporary files."""
+    path = tmp_path / "state" / "checkpoint.json"
+    atomic_write_json(path, {"a": 1})
+    assert path.read_text() == '{"a": 1}'
+    assert [p.name for p in path.parent.iterdir()] == ["checkpoint.json"]
+
+
+def test_checkpoint_batches_and_resumes(tmp_path: Path) -> None:
+    """Test that progress is written in batches and restored."""
+    path = tmp_path / "checkpoint.json"
+    checkpoint = Checkpoint(path, batch_size=2, interval=3600)
+    checkpoint.page_done("Caddo", 100, {"1": {"BookingID": "1"}})
+    assert not path.exists()
+    checkpoint.page_done("Logan", None, {})
+    assert path.exists()
+
+    resumed = Checkpoint(path)
+    assert resumed.resume_offset("Caddo") == 100
+    assert resumed.resume_offset("Logan") is None
+    assert resumed.resume_offset("Payne") == 0
+    assert resumed.pending["Caddo"] == {"1": {"BookingID": "1"}}
+    resumed.detail_done("Caddo", "1")
+    assert "Caddo" not in resumed.pending
+
+
+def test_checkpoint_close(tmp_path: Path) -> None:
+    """Test that the checkpoint is kept on interruption and removed when done."""
+    path = tmp_path / "checkpoint.json"
+    checkpoint = Checkpoint(path)
+    checkpoint.page_done("Caddo", 100, {})
+    checkpoint.close("shutdown")
+    assert path.exists()
+    checkpoint.close("finished")
+    assert not path.exists()
+
+
+def test_checkpoint_reset(tmp_path: Path) -> None:
+    """Test that reset counties start over, and an empty checkpoint is removed."""
+    path = tmp_path / "checkpoint.json"
+    checkpoint = Checkpoint(path)
+    checkpoint.page_done("Caddo", None, {})
+    checkpoint.page_done("Logan", 100, {"1": {"BookingID": "1"}})
+    checkpoint.reset(["Caddo"])
+    assert Checkpoint(path).resume_offset("Caddo") == 0
+    assert Checkpoint(path).resume_offset("Logan") == 100
+    checkpoint.reset(["Logan"])
+    assert not path.exists()
+
+
+def test_checkpoint_waits_for_stored_items(
+    tmp_path: Path, mocker: MockerFixture
+) -> None:
+    """Test that a page is only recorded once its items are stored."""
+    feed = "az://bookings/%(batch_id)d.csv"
+    stats = MemoryStatsCollector(mocker.Mock())
+    checkpoint = Checkpoint(
+        tmp_path / "checkpoint.json", feeds={feed: ItemFilter({})}, stats=stats
+    )
+    first, second = {"booking_id": "1"}, {"booking_id": "2"}
+    checkpoint.page_done("Caddo", 100, {}, [first])
+    checkpoint.page_done("Caddo", 200, {}, [second])
+    checkpoint.item_scraped(first)
+    checkpoint.item_scraped(second)
+    assert checkpoint.resume_offset("Caddo") == 0
+
+    # The second batch is stored first, so neither page counts yet.
+    checkpoint.feed_slot_closed(mocker.Mock(uri_template=feed, batch_id=2, itemcount=1))
+    assert checkpoint.resume_offset("Caddo") == 0
+    checkpoint.feed_slot_closed(mocker.Mock(uri_template=feed, batch_id=1, itemcount=1))
+    assert checkpoint.resume_offset("Caddo") == 200
+
+
+def test_checkpoint_skips_failed_batches(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Test that items in a batch that failed to store are crawled again."""
+    feed = "az://bookings/%(batch_id)d.csv"
+    stats = MemoryStatsCollector(mocker.Mock())
+    path = tmp_path / "checkpoint.json"
+    checkpoint = Checkpoint(path, feeds={feed: ItemFilter({})}, stats=stats)
+    item = {"booking_id": "1"}
+    checkpoint.page_done("Caddo", None, {}, [item])
+    checkpoint.item_scraped(item)
+    checkpoint.close("finished")
+    stats.inc_value("feedexport/failed_count/AzureBlobFeedStorage")
+    checkpoint.feed_slot_closed(mocker.Mock(uri_template=feed, batch_id=1, itemcount=1))
+    assert path.exists()
+    assert Checkpoint(path).resume_offset("Caddo") == 0
+
+
+def test_checkpoint_warns_about_unbatched_feeds(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test that feeds stored only at the end of the crawl are reported."""
+    settings = {
+        "CHECKPOINT_FILE": str(tmp_path / "checkpoint.json"),
+        "FEEDS": {
+            "az://bookings/%(batch_id)d.csv": {"batch_item_count": 100},
+            "az://bookings/all.csv": {},
+        },
+    }
+    assert Checkpoint.from_crawler(get_crawler(settings_dict=settings))
+    assert "az://bookings/all.csv are not batched" in caplog.text
+    assert "%(batch_id)d" not in caplog.text
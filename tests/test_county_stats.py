@@ -0,0 +1,93 @@
+"""Tests for the per-county stats extension."""
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Request, TextResponse
+from scrapy.utils.test import get_crawler
+
+from sheriffwebsites.extensions.county_stats import (
+    LATENCY_SAMPLES,
+    CountyCounters,
+    CountyStats,
+    percentile,
+    render_prometheus,
+)
+from sheriffwebsites.parsing import PageResult
+
+
+def test_percentile() -> None:
+    """Test percentile calculation."""
+    assert percentile([], 50) is None
+    assert percentile([2.0], 99) == 2.0
+    assert percentile([1.0, 2.0, 3.0], 50) == 2.0
+
+
+def test_latency_reservoir_is_bounded() -> None:
+    """Test that latency samples stay bounded."""
+    counters = CountyCounters()
+    for latency in range(LATENCY_SAMPLES * 2):
+        counters.add_latency(float(latency))
+    assert len(counters.latencies) == LATENCY_SAMPLES
+    assert counters.latency_count == LATENCY_SAMPLES * 2
+
+
+def test_disabled() -> None:
+    """Test that the extension can be disabled."""
+    crawler = get_crawler(settings_dict={"COUNTY_STATS_ENABLED": False})
+    with pytest.raises(NotConfigured):
+        CountyStats(crawler)
+
+
+def test_county_stats(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Test that county stats are recorded and dumped."""
+    output = tmp_path / "stats.json"
+    crawler = get_crawler(
+        settings_dict={"COUNTY_STATS_ENABLED": True, "COUNTY_STATS_FILE": str(output)}
+    )
+    crawler.stats = stats = mocker.Mock()
+    stats.get_value.side_effect = {
+        "scheduler/enqueued": 5,
+        "scheduler/dequeued": 2,
+    }.get
+    extension = CountyStats(crawler)
+    request = Request(
+        "https://example.com",
+        cb_kwargs={"county": "Caddo"},
+        meta={"download_latency": 0.5},
+    )
+    response = TextResponse(request.url, body=b"{}", request=request)
+    extension.bytes_received(b"{}", request)
+    extension.response_received(response, request)
+    extension.response_received(response, Request("https://example.com/robots.txt"))
+    page = PageResult(
+        0, 2, 100, items=[], failed=[{}], decode_time=0.1, validate_time=0.2
+    )
+    page.fallback_failures[("person_id", "missing")] += 1
+    extension.response_parsed("Caddo", page)
+    extension.item_scraped(mocker.Mock(county="Caddo"))
+    response.meta["discovered_at"] = time.monotonic() - 1
+    extension.item_scraped(mocker.Mock(county="Caddo"), response)
+    extension.spider_closed()
+
+    summary = json.loads(output.read_text())
+    assert summary["Caddo"]["pages"] == 1
+    assert summary["Caddo"]["bytes"] == 2
+    assert summary["Caddo"]["latency_p50"] == 0.5
+    assert summary["Caddo"]["fallback_rate"] == 1.0
+    assert summary["Caddo"]["items"] == 2
+    assert summary["Caddo"]["item_latency_p50"] >= 1
+    stats.set_value.assert_any_call("county_stats/Caddo/items", 2)
+    stats.max_value.assert_any_call("scheduler/depth_max", 3)
+    stats.inc_value.assert_any_call("validation/Caddo/fallback/person_id/missing", 1)
+    metrics = render_prometheus(summary, extension.queue_depth)
+    assert "# TYPE sheriffwebsites_county_pages_total counter" in metrics
+    assert 'sheriffwebsites_county_pages_total{county="Caddo"} 1' in metrics
+    assert 'sheriffwebsites_county_fallbacks_total{county="Caddo"} 1' in metrics
+    assert "# TYPE sheriffwebsites_county_fallback_rate gauge" in metrics
+    assert "# TYPE sheriffwebsites_queue_depth gauge" in metrics
+    assert "sheriffwebsites_queue_depth 3" in metrics
@@ -0,0 +1,151 @@
+"""Tests for the refresh daemon."""
+
+from pathlib import Path
+from typing import Any
+
+import pytest_twisted
+from pytest_mock import MockerFixture
+from scrapy import signals
+from scrapy.signalmanager import SignalManager
+from twisted.internet import defer, reactor
+
+from sheriffwebsites import daemon
+from sheriffwebsites.checkpoint import Checkpoint
+from sheriffwebsites.daemon import RefreshDaemon, RefreshSchedule, item_digest
+from sheriffwebsites.items import RawBooking
+
+
+def test_item_digest() -> None:
+    """Test that digests depend only on content."""
+    booking = RawBooking(county="Creek", booking_id="1")
+    assert item_digest(booking) == item_digest(
+        RawBooking(booking_id="1", county="Creek")
+    )
+    assert item_digest(booking) != item_digest(booking | {"booking_id": "2"})
+
+
+def test_intervals_follow_changes(tmp_path: Path) -> None:
+    """Test that intervals shrink on change, grow otherwise, and persist."""
+    cache = tmp_path / "sitecache.json"
+    schedule = RefreshSchedule(
+        ["Creek", "Caddo"], cache, min_interval=10, max_interval=40, backoff=2
+    )
+    assert schedule.due_counties(0) == ["Creek", "Caddo"]
+
+    schedule.record("Creek", 1, now=100)
+    assert schedule.intervals["Creek"] == 10
+    for _ in range(3):
+        schedule.record("Creek", 1, now=100)
+    assert schedule.intervals["Creek"] == 40
+    schedule.record("Creek", 2, now=100)
+    assert schedule.intervals["Creek"] == 20
+    schedule.record("Caddo", None, now=100)
+    assert schedule.due == {"Creek": 120, "Caddo": 110}
+    assert schedule.next_due() == 110
+
+    restarted = RefreshSchedule(["Creek", "Caddo"], cache, min_interval=10)
+    assert restarted.intervals == {"Creek": 20, "Caddo": 10}
+    assert restarted.digests == {"Creek": 2, "Caddo": None}
+    assert restarted.due_counties(0) == ["Creek", "Caddo"]
+
+
+class Crawler:
+    """A stand-in crawler with real signals."""
+
+    def __init__(self) -> None:
+        self.signals = SignalManager(self)
+
+
+class Runner:
+    """A stand-in runner that scrapes one item per county."""
+
+    def __init__(self, daemon: "list[RefreshDaemon]", reason: str = "finished"):
+        self.daemon = daemon
+        self.reason = reason
+        self.crawls: list[str] = []
+
+    def create_crawler(self, spider: str) -> Crawler:
+        return Crawler()
+
+    def crawl(self, crawler: Crawler, counties: str) -> defer.Deferred[None]:
+        self.crawls.append(counties)
+        for county in counties.split(","):
+            item = RawBooking(county=county, booking_id=str(len(self.crawls)))
+            crawler.signals.send_catch_log(signals.item_scraped, item=item)
+        crawler.signals.send_catch_log(
+            signals.spider_closed, spider=None, reason=self.reason
+        )
+        reactor.callLater(0, self.daemon[0].stop)  # type: ignore[attr-defined]
+        return defer.succeed(None)
+
+    def stop(self) -> defer.Deferred[Any]:
+        return defer.succeed(None)
+
+
+@pytest_twisted.ensureDeferred
+async def test_daemon_crawls_due_counties(tmp_path: Path) -> None:
+    """Test that due counties are crawled together and rescheduled."""
+    daemons: list[RefreshDaemon] = []
+    runner = Runner(daemons)
+    schedule = RefreshSchedule(["Creek", "Caddo"], tmp_path / "cache.json")
+    daemons.append(RefreshDaemon(runner, schedule))  # type: ignore[arg-type]
+    await daemons[0].run()
+    assert runner.crawls == ["Creek,Caddo"]
+    assert schedule.digests["Creek"] == item_digest(
+        RawBooking(county="Creek", booking_id="1")
+    )
+    assert schedule.due_counties(0) == []
+
+
+@pytest_twisted.ensureDeferred
+async def test_daemon_skips_interrupted_crawls(tmp_path: Path) -> None:
+    """Test that a crawl that did not finish keeps the interval."""
+    daemons: list[RefreshDaemon] = []
+    runner = Runner(daemons, reason="shutdown")
+    schedule = RefreshSchedule(["Creek"], tmp_path / "cache.json")
+    daemons.append(RefreshDaemon(runner, schedule))  # type: ignore[arg-type]
+    await daemons[0].run()
+    assert schedule.digests["Creek"] is None
+    assert schedule.due["Creek"] > 0
+
+
+@pytest_twisted.ensureDeferred
+async def test_daemon_clears_checkpoint(tmp_path: Path) -> None:
+    """Test that crawled counties start from the top despite a checkpoint."""
+    path = tmp_path / "checkpoint.json"
+    checkpoint = Checkpoint(path)
+    checkpoint.offsets.update({"Creek": None, "Caddo": 100})
+    checkpoint.flush()
+    daemons: list[RefreshDaemon] = []
+    runner = Runner(daemons)
+    schedule = RefreshSchedule(["Creek"], tmp_path / "cache.json")
+    daemons.append(
+        RefreshDaemon(runner, schedule, checkpoint_path=path)  # type: ignore[arg-type]
+    )
+    await daemons[0].run()
+    resumed = Checkpoint(path)
+    assert resumed.resume_offset("Creek") == 0
+    assert resumed.resume_offset("Caddo") == 100
+
+
+def test_main_reports_failures(mocker: MockerFixture) -> None:
+    """Test that a failed daemon is logged and exits with a non-zero status."""
+    for name in ("install_reactor", "configure_logging", "install_shutdown_handlers"):
+        mocker.patch(f"sheriffwebsites.daemon.{name}")
+    mocker.patch.object(reactor, "run")
+    stop = mocker.patch.object(reactor, "stop")
+    error = mocker.patch.object(daemon.logger, "error")
+
+    async def fail(self: RefreshDaemon) -> None:
+        raise OSError("disk full")
+
+    mocker.patch.object(RefreshDaemon, "run", fail)
+    assert daemon.main(["--counties", "Creek"]) == 1
+    stop.assert_called_once()
+    assert error.call_args.kwargs["exc_info"][0] is OSError
+
+    async def succeed(self: RefreshDaemon) -> None:
+        pass
+
+    mocker.patch.object(RefreshDaemon, "run", succeed)
+    assert daemon.main(["--counties", "Creek"]) == 0
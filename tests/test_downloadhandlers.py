@@ -0,0 +1,89 @@
+"""Tests for the roster download handler."""
+
+from collections.abc import Generator
+from typing import Any
+
+import pytest
+import pytest_twisted
+from scrapy import Request, Spider
+from scrapy.statscollectors import StatsCollector
+from scrapy.utils.defer import maybe_deferred_to_future
+from scrapy.utils.test import get_crawler
+from twisted.internet import reactor
+from twisted.web.resource import Resource
+from twisted.web.server import Request as WebRequest
+from twisted.web.server import Site
+
+from sheriffwebsites import downloadhandlers
+from sheriffwebsites.downloadhandlers import RosterDownloadHandler
+
+
+class Ok(Resource):
+    """Respond to every request with a short body."""
+
+    isLeaf = True
+
+    def render_GET(self, request: WebRequest) -> bytes:
+        return b"ok"
+
+
+def listen() -> Any:
+    """Serve ``Ok`` on a local port, returning the listening port."""
+    site = Site(Ok())  # type: ignore[no-untyped-call]
+    return reactor.listenTCP(0, site, interface="127.0.0.1")  # type: ignore[attr-defined]
+
+
+@pytest_twisted.inlineCallbacks
+def test_connections_are_reused() -> Generator[Any, Any]:
+    """Sequential requests to one host share a connection."""
+    port = listen()
+    crawler = get_crawler(
+        Spider,
+        {
+            "SHERIFF_SITES": {
+                "Tulsa": {"site": "https://tulsa.example.com", "http2": True},
+                "Creek": {"site": "https://creek.example.com"},
+            }
+        },
+    )
+    handler = RosterDownloadHandler.from_crawler(crawler)
+    assert handler.h2_hosts == {"tulsa.example.com"}
+    url = f"http://127.0.0.1:{port.getHost().port}/"
+    try:
+        for _ in range(3):
+            response = yield handler.download_request(Request(url), Spider("test"))
+            assert response.body == b"ok"
+    finally:
+        yield handler.close()
+        yield port.stopListening()
+    assert crawler.stats
+    assert crawler.stats.get_value("downloader/connections_opened") == 1
+    assert crawler.stats.get_value("downloader/connections_reused") == 2
+
+
+@pytest_twisted.ensureDeferred
+async def test_shared_pool_outlives_crawls(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Crawls sharing the pool reuse each other's idle connections."""
+    monkeypatch.setattr("sheriffwebsites.downloadhandlers._shared_pool", None)
+    port = listen()
+    url = f"http://127.0.0.1:{port.getHost().port}/"
+    stats: list[StatsCollector] = []
+    try:
+        for _ in range(2):
+            crawler = get_crawler(Spider, {"DOWNLOAD_SHARED_POOL": True})
+            handler = RosterDownloadHandler.from_crawler(crawler)
+            response = await maybe_deferred_to_future(
+                handler.download_request(Request(url), Spider("test"))
+            )
+            assert response.body == b"ok"
+            await maybe_deferred_to_future(handler.close())
+            assert crawler.stats
+            stats.append(crawler.stats)
+    finally:
+        assert downloadhandlers._shared_pool is not None
+        pool = downloadhandlers._shared_pool
+        await pool.closeCachedConnections()  # type: ignore[no-untyped-call]
+        await port.stopListening()
+    assert stats[0].get_value("downloader/connections_opened") == 1
+    assert stats[1].get_value("downloader/connections_opened") is None
+    assert stats[1].get_value("downloader/connections_reused") == 1
@@ -0,0 +1,48 @@
+"""Tests for roster request fingerprints and duplicate filtering."""
+
+from pathlib import Path
+
+import scrapy
+
+from sheriffwebsites.dupefilters import CompactDupeFilter, RosterRequestFingerprinter
+
+
+def test_fingerprint_uses_key() -> None:
+    """Requests for the same page match however their bodies are built."""
+    fingerprinter = RosterRequestFingerprinter()
+    key = ("Creek", "query", 100, 100)
+    first = scrapy.FormRequest(
+        "https://example.com/Read.php",
+        formdata={"offset": "100", "limit": "100"},
+        meta={"fingerprint_key": key},
+    )
+    second = scrapy.FormRequest(
+        "https://example.com/Read.php",
+        formdata={"limit": "100", "offset": "100"},
+        meta={"fingerprint_key": key},
+    )
+    assert fingerprinter.fingerprint(first) == fingerprinter.fingerprint(second)
+    other = first.replace(meta={"fingerprint_key": ("Creek", "query", 100, 500)})
+    assert fingerprinter.fingerprint(first) != fingerprinter.fingerprint(other)
+    plain = scrapy.Request("https://example.com/robots.txt")
+    assert len(fingerprinter.fingerprint(plain)) == 20
+
+
+def test_dupefilter_drops_repeated_bookings(tmp_path: Path) -> None:
+    """Detail requests for the same booking are only seen once."""
+    dupefilter = CompactDupeFilter(
+        str(tmp_path), fingerprinter=RosterRequestFingerprinter()
+    )
+    request = scrapy.Request(
+        "https://example.com/getbookie.php?bookingid=1",
+        meta={"fingerprint_key": ("Creek", "booking", "1")},
+    )
+    assert not dupefilter.request_seen(request)
+    assert dupefilter.request_seen(request.replace())
+    dupefilter.close("finished")
+
+    resumed = CompactDupeFilter(
+        str(tmp_path), fingerprinter=RosterRequestFingerprinter()
+    )
+    assert resumed.request_seen(request)
+    resumed.close("finished")
@@ -0,0 +1,76 @@
+"""Tests for the booking CSV exporter."""
+
+import datetime as dt
+import io
+from pathlib import Path
+from typing import Any
+
+import pytest
+from scrapy.exporters import CsvItemExporter
+
+from sheriffwebsites.exporters import BookingCsvItemExporter
+from sheriffwebsites.items import BookingItem, RawBooking
+from sheriffwebsites.middlewares.replay import load_bookings_csv, to_lighthouse
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="module")
+def items() -> list[BookingItem]:
+    """Validate bookings.csv, plus values that exercise each formatter."""
+    items = [
+        BookingItem(**to_lighthouse(row), county=row["county"])
+        for row in load_bookings_csv(ROOT / "bookings.csv")
+    ]
+    first = items[0]
+    return items + [
+        first.model_copy(
+            update={
+                "booking_date": dt.datetime(2025, 1, 22, 2, 44, 0, 500, tzinfo=dt.UTC),
+                "bond_total": 0.1 + 0.2,
+                "middle_name": 'Say "hi",\nthen go',
+            }
+        ),
+        first.model_copy(update={"bond_total": 1e20, "release_date": None}),
+    ]
+
+
+def export(
+    exporter_class: type[CsvItemExporter], items: list[Any], **kwargs: Any
+) -> bytes:
+    """Export items with an exporter class."""
+    output = io.BytesIO()
+    exporter = exporter_class(output, encoding="utf-8", **kwargs)
+    exporter.start_exporting()
+    for item in items:
+        exporter.export_item(item)
+    exporter.finish_exporting()
+    return output.getvalue()
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 1000])
+def test_matches_csv_exporter(items: list[BookingItem], batch_size: int) -> None:
+    """Test that the output is byte for byte Scrapy's."""
+    expected = export(CsvItemExporter, items)
+    assert export(BookingCsvItemExporter, items, batch_size=batch_size) == expected
+
+
+def test_other_items(items: list[BookingItem]) -> None:
+    """Test that other items keep their place in the output."""
+    raw = RawBooking(items[1].model_dump())
+    mixed = [items[0], raw, items[2]]
+    assert export(BookingCsvItemExporter, mixed) == export(CsvItemExporter, mixed)
+
+
+def test_fields_to_export(items: list[BookingItem]) -> None:
+    """Test that other field selections use the generic path."""
+    fields = ["last_name", "county"]
+    assert export(BookingCsvItemExporter, items[:5], fields_to_export=fields) == export(
+        CsvItemExporter, items[:5], fields_to_export=fields
+    )
+
+
+def test_dict_before_booking_item(items: list[BookingItem]) -> None:
+    """Test that items after a dict keep the columns the dict set."""
+    mixed = [{"county": "Payne", "last_name": "SMITH"}, items[0], items[1]]
+    assert export(BookingCsvItemExporter, mixed) == export(CsvItemExporter, mixed)
@@ -2,7 +2,9 @@
 
 import io
 import types
+from typing import Any
 
+import pytest
 
 from sheriffwebsites.feedstorages.azure_blob import AzureBlobFeedStorage
 
@@ -51,3 +53,59 @@ def test_store_uploads_csv(monkeypatch):
     assert stub.uploaded == b"col1,col2\n1,2\n"
     assert stub.overwrite is True
     assert stub.content_type.startswith("text/csv")
+
+
+def test_store_uploads_large_csv_in_blocks(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that feeds larger than the block size are staged in blocks."""
+    storage = AzureBlobFeedStorage(
+        "az://myc/exports/tests.csv",
+        feed_options={
+            "account_url": "https://acct.blob.core.windows.net",
+            "block_size": 4,
+        },
+    )
+    staged: list[tuple[str, bytes]] = []
+    committed: dict[str, Any] = {}
+    stub = StubBlob()
+    stub._blob.stage_block = lambda block_id, data: staged.append((block_id, data))
+    stub._blob.commit_block_list = lambda blocks, content_settings: committed.update(
+        ids=[block.id for block in blocks], content_type=content_settings.content_type
+    )
+    monkeypatch.setattr(storage, "_get_service", lambda: stub)
+
+    storage._store_in_thread(io.BytesIO(b"col1,col2\n1,2\n"))
+
+    assert stub.uploaded is None
+    assert b"".join(data for _, data in staged) == b"col1,col2\n1,2\n"
+    assert [len(data) for _, data in staged] == [4, 4, 4, 2]
+    assert committed["ids"] == [block_id for block_id, _ in staged]
+    assert committed["content_type"].startswith("text/csv")
+
+
+def test_store_retries_transient_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that uploads are retried after transient errors only."""
+    storage = AzureBlobFeedStorage(
+        "az://myc/exports/tests.csv",
+        feed_options={"account_url": "https://acct.blob.core.windows.net"},
+    )
+    storage.retries = 2
+    stub = StubBlob()
+    attempts: list[Any] = []
+
+    def flaky_upload(data: bytes, overwrite: bool, content_settings: Any) -> None:
+        attempts.append(data)
+        if len(attempts) < 3:
+            raise ConnectionResetError("reset")
+        stub.upload_blob(data, overwrite, content_settings)
+
+    stub._blob.upload_blob = flaky_upload
+    monkeypatch.setattr(storage, "_get_service", lambda: stub)
+
+    storage._store_with_retries(io.BytesIO(b"col1,col2\n1,2\n"))
+    assert len(attempts) == 3
+    assert stub.uploaded == b"col1,col2\n1,2\n"
+
+    stub._blob.upload_blob = lambda *args, **kwargs: attempts.append(1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        storage._store_with_retries(io.BytesIO(b"col1,col2\n1,2\n"))
+    assert len(attempts) == 3
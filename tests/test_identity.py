@@ -0,0 +1,90 @@
+"""Tests for cross-county identity resolution."""
+
+import datetime as dt
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from sheriffwebsites.identity import (
+    IdentityIndex,
+    blocking_key,
+    main,
+    normalize_name,
+    read_bookings,
+)
+
+
+def person(
+    county: str, person_id: str, first: str, last: str, dob: str | None
+) -> dict[str, Any]:
+    """Build the fields of a booking used for linking."""
+    return {
+        "county": county,
+        "person_id": person_id,
+        "first_name": first,
+        "last_name": last,
+        "birth_date": dob,
+    }
+
+
+def test_normalize_name() -> None:
+    """Test that names are compared without punctuation or suffixes."""
+    assert normalize_name("O'Neal Jr.") == "ONEAL"
+    assert normalize_name("José") == "JOSE"
+    assert normalize_name(None) == ""
+
+
+def test_blocking_key() -> None:
+    """Test that dates as strings or datetimes give the same block."""
+    booking = person("Payne", "1", "John", "Smith", "1980-02-03 00:00:00")
+    assert blocking_key(booking) == "SMITH|1980-02-03|J"
+    booking["birth_date"] = dt.datetime(1980, 2, 3)
+    assert blocking_key(booking) == "SMITH|1980-02-03|J"
+    booking["last_name"] = None
+    assert blocking_key(booking) is None
+
+
+def test_link_across_counties(tmp_path: Path) -> None:
+    """Test that matching people in different counties share a number."""
+    with IdentityIndex(tmp_path / "identity.sqlite") as index:
+        added = index.link(
+            [
+                person("Payne", "1", "JOHN", "SMITH", "1980-02-03 00:00:00"),
+                person("Payne", "1", "JOHN", "SMITH", "1980-02-03 00:00:00"),
+                person("Creek", "7", "J", "Smith Jr", "1980-02-03 00:00:00"),
+                person("Payne", "2", "JOHN", "SMITH", "1980-02-03 00:00:00"),
+                person("Creek", "8", "JANE", "SMITH", "1980-02-03 00:00:00"),
+                person("Bryan", "3", "JOHN", "SMITH", None),
+            ],
+            batch_size=2,
+        )
+        assert added == 5
+        john = index.person_for("Payne", "1")
+        assert john is not None
+        assert index.members(john) == [("Creek", "7"), ("Payne", "1")]
+        # Counties already distinguish their own people.
+        assert index.person_for("Payne", "2") != john
+        assert index.person_for("Creek", "8") != john
+        assert index.person_for("Bryan", "3") != john
+
+    with IdentityIndex(tmp_path / "identity.sqlite") as index:
+        assert index.person_for("Payne", "1") == john
+        index.link([person("Tulsa", "9", "JOHNNY", "SMITH", "1980-02-03")])
+        assert index.person_for("Tulsa", "9") == john
+
+
+def test_cli(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test linking a feed with repeated headers from the command line."""
+    header = "county,person_id,first_name,last_name,birth_date"
+    feed = tmp_path / "bookings.csv"
+    feed.write_text(
+        f"{header}\nPayne,1,JOHN,SMITH,1980-02-03 00:00:00\n"
+        f"{header}\nCreek,7,JOHN,SMITH,1980-02-03 00:00:00\n"
+    )
+    assert len(list(read_bookings(feed))) == 2
+    database = str(tmp_path / "identity.sqlite")
+    assert main([database, "link", str(feed)]) == 0
+    assert main([database, "person", "Creek", "7"]) == 0
+    assert capsys.readouterr().out.splitlines()[1:] == ["1", "Creek\t7", "Payne\t1"]
+    assert main([database, "person", "Creek", "8"]) == 1
@@ -0,0 +1,16 @@
+"""Tests for lazily loaded dependencies."""
+
+import subprocess
+import sys
+
+
+def test_spider_import_is_lazy() -> None:
+    """Importing the spider doesn't load state tables, dotenv, or Azure."""
+    code = (
+        "import sys, sheriffwebsites.spiders.bookings; "
+        "print(sorted({'us', 'dotenv', 'azure'} & sys.modules.keys()))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    )
+    assert completed.stdout.strip() == "[]"
@@ -1,7 +1,7 @@
 """Test suite for items."""
 
 import pytest
-from sheriffwebsites.items import BookingItem
+from sheriffwebsites.items import BookingItem, RawBooking, StringPool
 
 
 @pytest.fixture
@@ -47,3 +47,24 @@ def test_full_name(booking_item: BookingItem) -> None:
 def test_mailing_address(booking_item: BookingItem) -> None:
     """Test that we can get the person's full address."""
     assert booking_item.mailing_address == "PO BOX 502\nEAKLY, OK"
+
+
+def test_string_pool(booking_item: BookingItem) -> None:
+    """Test that repeated strings are shared across items."""
+    pool = StringPool()
+    other = booking_item.model_copy(update={"city": "eakly".upper()})
+    raw = RawBooking(county="caddo".title(), city=None)
+    for item in (booking_item, other, raw):
+        pool.intern_item(item)
+    assert other.city is booking_item.city
+    assert raw["county"] is booking_item.county
+    assert raw["city"] is None
+
+
+def test_string_pool_drops_distinct_fields() -> None:
+    """Test that fields with mostly distinct values stop being pooled."""
+    pool = StringPool(fields=("city", "county"), sample_size=4)
+    for number in range(8):
+        pool.intern_item(RawBooking(city=str(number), county="Caddo"))
+    assert pool.fields == ("county",)
+    assert len(pool.strings) == 5
@@ -0,0 +1,109 @@
+"""Tests for the local blob storage backend."""
+
+from collections.abc import Generator
+from pathlib import Path
+from typing import Any
+
+import pytest
+import pytest_twisted
+from pytest_mock import MockerFixture
+from scrapy.crawler import Crawler
+from scrapy.extensions.feedexport import FeedExporter
+from scrapy.settings import Settings
+
+from sheriffwebsites.feedstorages.local_blob import LocalBlobService
+
+
+@pytest.mark.parametrize("block_size", [4 * 1024 * 1024, 8])
+@pytest_twisted.inlineCallbacks
+def test_feed_exporter_writes_local_blob(
+    tmp_path: Path, mocker: MockerFixture, block_size: int
+) -> Generator[Any, Any]:
+    """Test that az:// feeds can be stored in a local directory."""
+    mock_spider = mocker.Mock()
+    settings = Settings(
+        {
+            "FEED_STORAGES": {
+                "az": "sheriffwebsites.feedstorages.azure_blob.AzureBlobFeedStorage"
+            },
+            "FEEDS": {
+                "az://myc/exports/test.csv": {
+                    "format": "csv",
+                    "fields": ["id", "name"],
+                    "local_dir": str(tmp_path),
+                    "block_size": block_size,
+                }
+            },
+        }
+    )
+    crawler = Crawler(spidercls=mock_spider, settings=settings)
+    mock_spider.crawler = crawler
+    exporter = FeedExporter.from_crawler(crawler)
+    exporter.open_spider(spider=mock_spider)
+    for item in [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]:
+        exporter.item_scraped(item, spider=mock_spider)
+    yield exporter.close_spider(spider=mock_spider)
+
+    blob = LocalBlobService(tmp_path).get_blob_client("myc", "exports/test.csv")
+    assert blob.exists()
+    assert blob.path.read_bytes() == b"id,name\r\n1,a\r\n2,b\r\n"
+    properties = blob.get_blob_properties()
+    assert properties["content_settings"]["content_type"].startswith("text/csv")
+    assert not blob.blocks_dir.exists()
+
+
+def test_local_blob_semantics(tmp_path: Path) -> None:
+    """Test container creation, overwriting, and uncommitted blocks."""
+    service = LocalBlobService(tmp_path)
+    service.get_container_client("myc").create_container()
+    with pytest.raises(FileExistsError):
+        service.get_container_client("myc").create_container()
+
+    blob = service.get_blob_client("myc", "data.csv")
+    blob.upload_blob(b"old")
+    with pytest.raises(FileExistsError):
+        blob.upload_blob(b"new")
+
+    blob.stage_block("1", b"new")
+    assert blob.path.read_bytes() == b"old"
+    blob.upload_blob(b"newer", overwrite=True)
+    assert blob.path.read_bytes() == b"newer"
+    assert sorted(p.name for p in (tmp_path / "myc").iterdir()) == [
+        ".blocks",
+        ".metadata",
+        "data.csv",
+    ]
+
+
+@pytest_twisted.inlineCallbacks
+def test_batches_upload_in_pool(
+    tmp_path: Path, mocker: MockerFixture
+) -> Generator[Any, Any]:
+    """Test that every batch is uploaded before the exporter closes."""
+    mock_spider = mocker.Mock()
+    settings = Settings(
+        {
+            "FEED_STORAGES": {
+                "az": "sheriffwebsites.feedstorages.azure_blob.AzureBlobFeedStorage"
+            },
+            "FEEDS": {
+                "az://myc/exports/%(batch_id)d.csv": {
+                    "format": "csv",
+                    "fields": ["id"],
+                    "local_dir": str(tmp_path),
+                    "batch_item_count": 1,
+                }
+            },
+        }
+    )
+    crawler = Crawler(spidercls=mock_spider, settings=settings)
+    mock_spider.crawler = crawler
+    exporter = FeedExporter.from_crawler(crawler)
+    exporter.open_spider(spider=mock_spider)
+    for item in [{"id": 1}, {"id": 2}, {"id": 3}]:
+        exporter.item_scraped(item, spider=mock_spider)
+    yield exporter.close_spider(spider=mock_spider)
+
+    exports = tmp_path / "myc" / "exports"
+    assert sorted(p.name for p in exports.iterdir()) == ["1.csv", "2.csv", "3.csv"]
+    assert (exports / "3.csv").read_bytes() == b"id\r\n3\r\n"
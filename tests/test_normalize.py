@@ -0,0 +1,119 @@
+"""Tests for bulk normalization of raw bookings."""
+
+import datetime as dt
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from pydantic import ValidationError
+from scrapy.exporters import CsvItemExporter
+
+from sheriffwebsites.items import BookingItem
+from sheriffwebsites.middlewares.replay import load_bookings_csv, to_lighthouse
+from sheriffwebsites.normalize import main, normalize_bookings, write_csv
+from sheriffwebsites.parsing import raw_booking
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Values on and off the vectorized path, for every field.
+EDGE_VALUES = [
+    "",
+    "  padded 　",
+    "\x1cx",
+    5,
+    2.5,
+    True,
+    None,
+    2**60,
+    "+1.5",
+    "1_000",
+    "2025-01-22",
+    "2025-01-22 02:44",
+    "2025-01-22T02",
+    "2025-01-22T02:44:00.1234567",
+    "2025-02-30",
+    "0999-01-01",
+    "1700000000",
+    "01/01/1976",
+    "02/30/1976",
+    "1/1/1976",
+    "12345abc",
+    "1234",
+    "Oklahoma",
+    "okla",
+    " F ",
+    "m",
+    [1],
+]
+
+
+@pytest.fixture(scope="module")
+def raw_rows() -> list[dict]:
+    """Load bookings.csv as raw captured rows."""
+    return [
+        raw_booking(to_lighthouse(row), row["county"])
+        for row in load_bookings_csv(ROOT / "bookings.csv")
+    ]
+
+
+def validate(row: dict) -> dict | None:
+    """Validate a row with BookingItem, with aware dates in naive UTC."""
+    try:
+        item = BookingItem.model_validate(row)
+    except ValidationError:
+        return None
+    booking = {}
+    for name in BookingItem.model_fields:
+        value = getattr(item, name)
+        if isinstance(value, dt.datetime) and value.tzinfo is not None:
+            value = value.astimezone(dt.UTC).replace(tzinfo=None)
+        booking[name] = value
+    return booking
+
+
+def test_clean_rows_are_vectorized(raw_rows: list[dict]) -> None:
+    """Test that clean rows never fall back to BookingItem."""
+    result = normalize_bookings(raw_rows)
+    assert result.fallback_rows == 0
+    assert result.table.to_pylist() == [validate(row) for row in raw_rows]
+
+
+@pytest.mark.parametrize("name", list(BookingItem.model_fields))
+def test_matches_booking_item(raw_rows: list[dict], name: str) -> None:
+    """Test that every edge value gives the same result as BookingItem."""
+    rows = [raw_rows[0] | {name: value} for value in EDGE_VALUES]
+    rows.append({key: value for key, value in raw_rows[0].items() if key != name})
+    result = normalize_bookings(rows)
+    expected = [validate(row) for row in rows]
+    assert result.table.to_pylist() == [row for row in expected if row is not None]
+    assert result.rejected == [row for row, item in zip(rows, expected) if not item]
+
+
+def test_write_csv_matches_exporter(raw_rows: list[dict]) -> None:
+    """Test that the CSV is byte for byte what the crawl exports."""
+    rows = raw_rows[:50] + [raw_rows[0] | {"booking_date": "2025-01-22T02:44:00.5"}]
+    exported = io.BytesIO()
+    exporter = CsvItemExporter(exported, encoding="utf-8")
+    exporter.start_exporting()
+    for row in rows:
+        exporter.export_item(BookingItem.model_validate(row))
+    exporter.finish_exporting()
+
+    written = io.BytesIO()
+    write_csv(normalize_bookings(rows).table, written)
+    assert written.getvalue() == exported.getvalue()
+
+
+def test_cli(tmp_path: Path, raw_rows: list[dict]) -> None:
+    """Test normalizing a JSON Lines feed from the command line."""
+    raw = tmp_path / "raw.jsonl"
+    rows = raw_rows[:3] + [raw_rows[0] | {"sex": "?"}]
+    raw.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    output, rejected = tmp_path / "bookings.csv", tmp_path / "rejected.jsonl"
+    assert main([str(raw), str(output), "--rejected", str(rejected)]) == 0
+    assert len(output.read_text().splitlines()) == 4
+    assert [json.loads(line) for line in rejected.read_text().splitlines()] == rows[3:]
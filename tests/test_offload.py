@@ -0,0 +1,38 @@
+"""Tests for offloading parsing work."""
+
+import threading
+
+import pytest
+import pytest_twisted
+
+from sheriffwebsites.offload import Offloader
+
+
+def test_invalid_mode() -> None:
+    """Test that unknown modes are rejected."""
+    with pytest.raises(ValueError):
+        Offloader("fibers")
+
+
+@pytest_twisted.ensureDeferred
+async def test_small_bodies_run_inline() -> None:
+    """Test that small bodies are parsed on the calling thread."""
+    offloader = Offloader("thread", min_bytes=100)
+    assert await offloader.run(10, threading.get_ident) == threading.get_ident()
+
+
+@pytest_twisted.ensureDeferred
+async def test_thread_mode() -> None:
+    """Test that large bodies are parsed in another thread."""
+    offloader = Offloader("thread", min_bytes=100)
+    assert await offloader.run(1000, threading.get_ident) != threading.get_ident()
+
+
+@pytest_twisted.ensureDeferred
+async def test_process_mode() -> None:
+    """Test that process mode uses a process pool."""
+    offloader = Offloader("process", max_workers=1)
+    try:
+        assert await offloader.run(1000, pow, 2, 10) == 1024
+    finally:
+        offloader.close()
@@ -0,0 +1,132 @@
+"""Tests for response parsing."""
+
+import json
+
+import pytest
+
+from sheriffwebsites.items import BookingItem, RawBooking
+from sheriffwebsites.parsing import parse_detail, parse_page
+from sheriffwebsites.vendors.lighthouse import LighthouseAdapter
+
+
+@pytest.fixture
+def booking() -> dict[str, str]:
+    """Create raw booking data."""
+    return {
+        "BookingID": "13826",
+        "InmateID": "40730",
+        "BookingDate": "2025-01-22T02:44:00",
+        "FName": "TESTFIRST",
+        "LName": "TESTLAST",
+        "Sex": "M",
+        "Race": "W",
+        "Charges": "TEST CHARGE",
+        "dob": "01/01/1976",
+    }
+
+
+def test_parse_page(booking: dict[str, str]) -> None:
+    """Test that we can split a page into items and fallbacks."""
+    broken = booking | {"InmateID": None}
+    body = json.dumps(
+        {
+            "bookings": {
+                "offset": 0,
+                "limit": 100,
+                "total": 2,
+                "data": [booking, broken],
+            }
+        }
+    ).encode()
+    page = parse_page(body, "Caddo", LighthouseAdapter())
+    assert (page.offset, page.limit, page.total) == (0, 100, 2)
+    (item,) = page.items
+    assert isinstance(item, BookingItem)
+    assert item.person_id == "40730"
+    assert item.county == "Caddo"
+    assert page.failed == [broken]
+
+
+def test_parse_detail(booking: dict[str, str]) -> None:
+    """Test that we can parse a detail response."""
+    body = json.dumps({"bookie": [booking]}).encode()
+    detail = parse_detail(body, "Caddo", LighthouseAdapter())
+    assert isinstance(detail.item, BookingItem)
+    assert detail.item.booking_id == "13826"
+    assert detail.decode_time >= 0 and detail.validate_time >= 0
+
+
+def test_parse_page_counts_failures(booking: dict[str, str]) -> None:
+    """Test that validation failures are counted by field and error type."""
+    soft = booking | {"Zip": "7"}
+    hard = {key: value for key, value in soft.items() if key != "InmateID"}
+    body = json.dumps(
+        {"bookings": {"offset": 0, "limit": 100, "total": 2, "data": [soft, hard]}}
+    ).encode()
+    page = parse_page(body, "Caddo", LighthouseAdapter())
+    assert page.soft_failures == {("zipcode", "string_pattern_mismatch"): 1}
+    assert page.fallback_failures == {("person_id", "missing"): 1}
+
+
+def test_parse_detail_declared_encoding(booking: dict[str, str]) -> None:
+    """Test that non-UTF bodies are decoded with the declared encoding."""
+    body = json.dumps({"bookie": booking | {"LName": "PEÑA"}}, ensure_ascii=False)
+    detail = parse_detail(body.encode("cp1252"), "Caddo", LighthouseAdapter(), "cp1252")
+    assert isinstance(detail.item, BookingItem)
+    assert detail.item.last_name == "PEÑA"
+
+
+def test_empty_context(booking: dict[str, str]) -> None:
+    """Test that soft validation works with a context lacking a counter."""
+    item = BookingItem.model_validate(
+        booking | {"Zip": "7", "county": "Caddo"}, context={}
+    )
+    assert item.zipcode is None
+
+
+@pytest.mark.parametrize("data_first", [False, True])
+def test_parse_page_streaming(booking: dict[str, str], data_first: bool) -> None:
+    """Test that streamed pages parse like fully decoded ones."""
+    rows = [booking | {"BondTotal": 1.5}, booking | {"InmateID": None}]
+    results = {"offset": 0, "limit": 100, "total": 2, "data": rows}
+    if data_first:
+        results = {"data": rows, "offset": 0, "limit": 100, "total": 2}
+    body = json.dumps({"querybookings": results}).encode()
+    adapter = LighthouseAdapter()
+    streamed = parse_page(body, "Creek", adapter, stream=True)
+    decoded = parse_page(body, "Creek", adapter)
+    assert (streamed.offset, streamed.limit, streamed.total) == (0, 100, 2)
+    assert streamed.items == decoded.items
+    assert streamed.failed == decoded.failed
+    assert streamed.fallback_failures == decoded.fallback_failures
+
+
+def test_parse_page_raw(booking: dict[str, str]) -> None:
+    """Test that raw capture keeps field values and checks only presence."""
+    broken = booking | {"InmateID": None}
+    body = json.dumps(
+        {"bookings": {"offset": 0, "limit": 100, "total": 2, "data": [booking, broken]}}
+    ).encode()
+    page = parse_page(body, "Caddo", LighthouseAdapter(), raw=True)
+    assert page.items == [
+        {
+            "county": "Caddo",
+            "booking_id": "13826",
+            "person_id": "40730",
+            "booking_date": "2025-01-22T02:44:00",
+            "first_name": "TESTFIRST",
+            "last_name": "TESTLAST",
+            "sex": "M",
+            "race": "W",
+            "charges": "TEST CHARGE",
+            "birth_date": "01/01/1976",
+        }
+    ]
+    assert isinstance(page.items[0], RawBooking)
+    assert page.failed == [broken]
+    assert page.fallback_failures == {("person_id", "missing"): 1}
+    detail = parse_detail(
+        json.dumps({"bookie": broken}).encode(), "Caddo", LighthouseAdapter(), raw=True
+    )
+    assert isinstance(detail.item, RawBooking)
+    assert detail.item["person_id"] is None
@@ -0,0 +1,127 @@
+"""Tests for the callback profiling extension."""
+
+import asyncio
+import pstats
+import threading
+from collections.abc import AsyncIterator, Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Request, TextResponse
+from scrapy.statscollectors import MemoryStatsCollector
+from scrapy.utils.spider import DefaultSpider
+from scrapy.utils.test import get_crawler
+
+from sheriffwebsites.extensions.profiling import CallbackProfiler
+from sheriffwebsites.offload import Offloader
+
+
+def parse(text: str) -> tuple[str, str]:
+    """Parse text, noting the thread that parsed it."""
+    return text.upper(), threading.current_thread().name
+
+
+class Spider:
+    """A stand-in spider with an async callback."""
+
+    offloader = Offloader("thread")
+
+    async def parse_results(
+        self, response: TextResponse, county: str
+    ) -> AsyncIterator[tuple[str, str]]:
+        """Yield the parsed body twice, waiting between them."""
+        yield await self.offloader.run(len(response.text), parse, response.text)
+        await asyncio.sleep(0)
+        yield await self.offloader.run(len(response.text), parse, county)
+
+    async def fail(self, response: TextResponse, county: str) -> AsyncIterator[None]:
+        """Raise after waiting."""
+        await asyncio.sleep(0)
+        if county:
+            raise RuntimeError(county)
+        yield None
+
+
+@pytest.fixture
+def profiler(tmp_path: Path) -> CallbackProfiler:
+    """Create a profiler that samples every call."""
+    crawler = get_crawler(
+        settings_dict={
+            "PROFILE_ENABLED": True,
+            "PROFILE_SAMPLE_RATE": 1.0,
+            "PROFILE_DIR": str(tmp_path),
+        }
+    )
+    crawler.stats = MemoryStatsCollector(crawler)
+    return CallbackProfiler(crawler)
+
+
+def response(
+    callback: Callable[..., AsyncIterator[Any]], county: str = "Tulsa"
+) -> tuple[Request, TextResponse]:
+    """Make a response for a county request."""
+    request = Request(
+        "https://example.com", callback=callback, cb_kwargs={"county": county}
+    )
+    return request, TextResponse(
+        request.url, body=b"body", encoding="utf-8", request=request
+    )
+
+
+async def collect(request: Request, response: TextResponse) -> list[Any]:
+    """Collect a callback's output."""
+    assert request.callback
+    return [item async for item in request.callback(response, **request.cb_kwargs)]
+
+
+def test_disabled() -> None:
+    """Test that the extension is not loaded unless enabled."""
+    with pytest.raises(NotConfigured):
+        CallbackProfiler(get_crawler())
+
+
+def test_profile_callback(profiler: CallbackProfiler, tmp_path: Path) -> None:
+    """Test that sampled callbacks run inline and are profiled per county."""
+    request, tulsa = response(Spider().parse_results)
+    profiler.response_received(tulsa, request)
+    assert asyncio.run(collect(request, tulsa)) == [
+        ("BODY", "MainThread"),
+        ("TULSA", "MainThread"),
+    ]
+    assert profiler.crawler.stats
+    assert profiler.crawler.stats.get_value("profile/callbacks") == 1
+
+    profiler.spider_closed(DefaultSpider())
+    stats = pstats.Stats(str(tmp_path / "Tulsa.prof"))
+    assert any(name == "parse" for _, _, name in stats.stats)  # type: ignore[attr-defined]
+    assert "function calls" in (tmp_path / "summary.txt").read_text()
+
+
+def test_unsampled_callback(profiler: CallbackProfiler) -> None:
+    """Test that unsampled callbacks are left alone."""
+    profiler.sample_rate = 0.0
+    spider = Spider()
+    request, tulsa = response(spider.parse_results)
+    profiler.response_received(tulsa, request)
+    assert request.callback == spider.parse_results
+
+
+def test_callback_error(profiler: CallbackProfiler) -> None:
+    """Test that errors in profiled callbacks are raised as usual."""
+    request, tulsa = response(Spider().fail)
+    profiler.response_received(tulsa, request)
+    with pytest.raises(RuntimeError, match="Tulsa"):
+        asyncio.run(collect(request, tulsa))
+
+
+def test_profile_item(profiler: CallbackProfiler) -> None:
+    """Test that item processing is profiled between the two handlers."""
+    item = {"county": "Creek"}
+    profiler.item_scraped(item)
+    sorted([1, 2])
+    profiler.item_exported(item)
+    assert profiler.crawler.stats
+    assert profiler.crawler.stats.get_value("profile/items") == 1
+    assert "Creek" in profiler.stats
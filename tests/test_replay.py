@@ -0,0 +1,138 @@
+"""Tests for recording and replaying Lighthouse responses."""
+
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+import scrapy
+from pytest_mock import MockerFixture
+from scrapy.downloadermiddlewares.httpcompression import HttpCompressionMiddleware
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Response, TextResponse
+from scrapy.utils.test import get_crawler
+
+from sheriffwebsites import settings
+from sheriffwebsites.items import BookingItem
+from sheriffwebsites.middlewares.replay import (
+    RecordMiddleware,
+    ReplayMiddleware,
+    recording_path,
+    to_lighthouse,
+    write_recordings,
+)
+from sheriffwebsites.parsing import parse_detail, parse_page
+from sheriffwebsites.vendors.lighthouse import LighthouseAdapter
+
+ROW = {
+    "county": "Creek",
+    "booking_id": "2478",
+    "person_id": "5889",
+    "booking_num": "25-0014",
+    "booking_date": "2025-03-17 16:02:00",
+    "release_date": "",
+    "first_name": "TESTFIRST",
+    "last_name": "TESTLAST",
+    "sex": "M",
+    "race": "W",
+    "charges": "TEST CHARGE",
+    "birth_date": "1976-12-29 00:00:00",
+}
+
+
+def test_to_lighthouse() -> None:
+    """Test that exported rows map back to Lighthouse names."""
+    record = to_lighthouse(ROW)
+    assert record["InmateID"] == "5889"
+    assert record["FName"] == "TESTFIRST"
+    assert record["dob"] == "12/29/1976"
+    assert "county" not in record
+
+
+def test_replay(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Test that recorded pages and bookings are served."""
+    assert write_recordings([ROW], tmp_path) == 1
+    middleware = ReplayMiddleware(tmp_path)
+    spider = mocker.Mock()
+
+    query = scrapy.FormRequest(
+        "https://example.com/Read.php",
+        formdata={"offset": "0", "limit": "100"},
+        cb_kwargs={"county": "Creek"},
+    )
+    response = middleware.process_request(query, spider)
+    assert isinstance(response, TextResponse)
+    page = parse_page(response.body, "Creek", LighthouseAdapter())
+    assert isinstance(page.items[0], BookingItem)
+    assert page.items[0].person_id == "5889"
+
+    detail = scrapy.Request(
+        "https://example.com/getbookie.php?inmateid=5889",
+        cb_kwargs={"county": "Creek"},
+    )
+    response = middleware.process_request(detail, spider)
+    item = parse_detail(response.body, "Creek", LighthouseAdapter()).item
+    assert isinstance(item, BookingItem)
+    assert item.booking_id == "2478"
+
+    assert response.flags == ["replayed"]
+
+    robots = scrapy.Request("https://example.com/robots.txt")
+    missing = middleware.process_request(robots, spider)
+    assert missing.status == 404
+    assert missing.flags == ["replayed"]
+
+
+def test_record_gzip(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Test that compressed responses are recorded after decompression."""
+    crawler = get_crawler(
+        settings_dict={"REPLAY_DIR": str(tmp_path), "REPLAY_RECORD": True}
+    )
+    crawler.spider = spider = mocker.Mock()
+    assert RecordMiddleware.from_crawler(crawler)
+    with pytest.raises(NotConfigured):
+        ReplayMiddleware.from_crawler(crawler)
+    record_priority = settings.DOWNLOADER_MIDDLEWARES[
+        "sheriffwebsites.middlewares.replay.RecordMiddleware"
+    ]
+    compression_priority = crawler.settings.getdict("DOWNLOADER_MIDDLEWARES_BASE")[
+        "scrapy.downloadermiddlewares.httpcompression.HttpCompressionMiddleware"
+    ]
+    assert record_priority < compression_priority
+
+    request = scrapy.FormRequest(
+        "https://example.com/Read.php",
+        formdata={"offset": "100", "limit": "100"},
+        cb_kwargs={"county": "Caddo"},
+    )
+    body = json.dumps({"bookings": {}}).encode()
+    response = Response(
+        request.url,
+        body=gzip.compress(body),
+        headers={"Content-Encoding": "gzip", "Content-Type": "application/json"},
+        request=request,
+    )
+    # process_response runs from the downloader outward: compression first.
+    inflated = HttpCompressionMiddleware.from_crawler(crawler).process_response(
+        request, response, spider
+    )
+    assert isinstance(inflated, Response)
+    RecordMiddleware.from_crawler(crawler).process_response(request, inflated, spider)
+    assert (tmp_path / "Caddo" / "read-100-100.json").read_bytes() == body
+
+
+def test_recording_path_includes_limit(tmp_path: Path) -> None:
+    """Test that first pages fetched at different page sizes do not collide."""
+    paths = {
+        recording_path(
+            tmp_path,
+            scrapy.FormRequest(
+                "https://example.com/Read.php",
+                formdata={"limit": limit},
+                cb_kwargs={"county": "Creek"},
+            ),
+        )
+        for limit in ("1000", "500", "100")
+    }
+    assert len(paths) == 3
+    assert tmp_path / "Creek" / "read-0-100.json" in paths
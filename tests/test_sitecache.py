@@ -0,0 +1,148 @@
+"""Tests for the site metadata cache."""
+
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+from scrapy import Request, Spider
+from scrapy.crawler import Crawler
+from scrapy.http import Response
+from scrapy.statscollectors import MemoryStatsCollector
+from scrapy.utils.test import get_crawler
+
+from sheriffwebsites import settings
+from sheriffwebsites.middlewares.sitecache import (
+    RateLimitMiddleware,
+    RobotsTxtCacheMiddleware,
+)
+from sheriffwebsites.sitecache import SiteCache
+
+CACHE_SETTINGS = ("ROBOTSTXT_CACHE_TTL", "RATE_LIMIT_TTL", "RATE_LIMIT_MAX_DELAY")
+
+
+def test_site_cache_persists(tmp_path: Path) -> None:
+    """Test that cached values survive a reload."""
+    path = tmp_path / "sitecache.json"
+    SiteCache(path).set("Caddo", "page_limit", 500)
+    assert SiteCache(path).get("Caddo", "page_limit", ttl=60) == 500
+    assert SiteCache(path).get("Logan", "page_limit", ttl=60) is None
+
+
+def test_site_cache_expires(mocker: MockerFixture) -> None:
+    """Test that values older than the TTL are ignored."""
+    cache = SiteCache()
+    mocker.patch("sheriffwebsites.sitecache.time.time", return_value=1000.0)
+    cache.set("Caddo", "page_limit", 500)
+    mocker.patch("sheriffwebsites.sitecache.time.time", return_value=1100.0)
+    assert cache.get("Caddo", "page_limit", ttl=200) == 500
+    assert cache.get("Caddo", "page_limit", ttl=50) is None
+
+
+@pytest.fixture
+def crawler(tmp_path: Path, mocker: MockerFixture) -> Crawler:
+    """Create a crawler with a site cache file and a stand-in downloader."""
+    crawler = get_crawler(
+        settings_dict={
+            "ROBOTSTXT_OBEY": True,
+            "SITE_CACHE_FILE": str(tmp_path / "sitecache.json"),
+            "DOWNLOAD_DELAY": 2,
+            **{name: getattr(settings, name) for name in CACHE_SETTINGS},
+        }
+    )
+    crawler.stats = MemoryStatsCollector(crawler)
+    engine = mocker.Mock()
+    engine.downloader.slots = {}
+    engine.downloader.per_slot_settings = {}
+    engine.downloader.get_slot_key.return_value = "example.com"
+    crawler.engine = engine
+    return crawler
+
+
+@pytest.fixture
+def spider() -> Spider:
+    """Create a spider to pass to the middlewares."""
+    return Spider("test")
+
+
+def robots_txt_request(url: str = "https://example.com/robots.txt") -> Request:
+    """Make a request like the ones RobotsTxtMiddleware sends."""
+    return Request(url, meta={"dont_obey_robotstxt": True})
+
+
+def test_robots_txt_is_cached(crawler: Crawler, spider: Spider) -> None:
+    """Test that fetched robots.txt rules are reused by the next crawl."""
+    middleware = RobotsTxtCacheMiddleware(crawler)
+    request = robots_txt_request()
+    assert middleware.process_request(request, spider) is None
+    robots = Response(request.url, body=b"User-agent: *\nDisallow: /jail\n")
+    assert middleware.process_response(request, robots, spider) is robots
+
+    cached = RobotsTxtCacheMiddleware(crawler).process_request(request, spider)
+    assert cached is not None
+    assert cached.body == robots.body
+    assert cached.flags == ["cached"]
+    assert crawler.stats
+    assert crawler.stats.get_value("robotstxt/cache_hit") == 1
+    # Other requests to the host are left to RobotsTxtMiddleware.
+    page = Request("https://example.com/robots.txt")
+    assert middleware.process_request(page, spider) is None
+
+
+@pytest.mark.parametrize(
+    ("status", "flags", "cached"),
+    [
+        (404, [], True),
+        (410, [], True),
+        (401, [], False),
+        (403, [], False),
+        (429, [], False),
+        (503, [], False),
+        (404, ["replayed"], False),
+        (200, ["replayed"], False),
+    ],
+)
+def test_robots_txt_caching_by_status(
+    crawler: Crawler, spider: Spider, status: int, flags: list[str], cached: bool
+) -> None:
+    """Test that only genuine successes and missing files are cached."""
+    middleware = RobotsTxtCacheMiddleware(crawler)
+    request = robots_txt_request()
+    response = Response(request.url, status=status, flags=flags)
+    middleware.process_response(request, response, spider)
+    hit = RobotsTxtCacheMiddleware(crawler).process_request(request, spider)
+    assert (hit is not None) is cached
+    if hit is not None:
+        assert hit.status == status
+
+
+def test_rate_limit_is_remembered(crawler: Crawler, spider: Spider) -> None:
+    """Test that Retry-After delays apply now and to the next crawl."""
+    assert crawler.engine
+    downloader = crawler.engine.downloader
+    request = Request("https://example.com/Read.php")
+    middleware = RateLimitMiddleware(crawler)
+    middleware.process_request(request, spider)
+    assert downloader.per_slot_settings == {}
+    limited = Response(request.url, status=429, headers={"Retry-After": "30"})
+    assert middleware.process_response(request, limited, spider) is limited
+    assert downloader.per_slot_settings["example.com"]["delay"] == 30
+
+    downloader.per_slot_settings = {}
+    RateLimitMiddleware(crawler).process_request(request, spider)
+    assert downloader.per_slot_settings["example.com"]["delay"] == 30
+
+
+def test_rate_limit_without_retry_after(
+    crawler: Crawler, spider: Spider, mocker: MockerFixture
+) -> None:
+    """Test that limits without Retry-After double the slot's delay."""
+    assert crawler.engine
+    request = Request("https://example.com/Read.php")
+    slot = mocker.Mock(delay=2.0)
+    crawler.engine.downloader.slots = {"example.com": slot}
+    middleware = RateLimitMiddleware(crawler)
+    middleware.process_request(request, spider)
+    middleware.process_response(request, Response(request.url, status=503), spider)
+    assert slot.delay == 4.0
+    middleware.process_response(request, Response(request.url, status=200), spider)
+    assert slot.delay == 4.0
@@ -24,8 +24,12 @@ def test_soft_validate() -> None:
 
     assert soft_validate("foo", handler) == "FOO"
     assert soft_validate("bar", handler) is None
+    errors: list[ValidationError] = []
+    assert soft_validate("bar", handler, errors.append) is None
+    assert len(errors) == 1
 
 
 def test_convert_date() -> None:
     """Test date conversion."""
     assert convert_date("09/06/1993") == dt.datetime(1993, 9, 6)
+    assert convert_date(1700000000) == 1700000000
@@ -0,0 +1,75 @@
+"""Tests for roster vendor adapters."""
+
+import json
+from typing import ClassVar
+
+import pytest
+from scrapy.settings import Settings
+
+from sheriffwebsites import settings
+from sheriffwebsites.parsing import build_booking_item
+from sheriffwebsites.vendors import VendorAdapter, get_adapter, load_adapters
+from sheriffwebsites.vendors.lighthouse import LighthouseAdapter
+
+
+class RenamingAdapter(LighthouseAdapter):
+    """An adapter whose vendor uses its own field names."""
+
+    name = "renaming"
+    field_aliases: ClassVar[dict[str, str]] = {
+        "InmateNumber": "booking_id",
+        "Surname": "last_name",
+    }
+
+
+def test_load_adapters() -> None:
+    """Each site gets the adapter named by its vendor entry."""
+    adapters = load_adapters(Settings({"VENDOR_ADAPTERS": settings.VENDOR_ADAPTERS}))
+    assert isinstance(get_adapter(adapters, "Creek"), LighthouseAdapter)
+    with pytest.raises(ValueError):
+        get_adapter({}, "Creek")
+
+
+def test_incomplete_adapter() -> None:
+    """Adapters missing a required method fail when they are created."""
+
+    class IncompleteAdapter(VendorAdapter):
+        name = "incomplete"
+
+    with pytest.raises(TypeError, match="abstract"):
+        IncompleteAdapter()  # type: ignore[abstract]
+
+
+def test_default_stream_page() -> None:
+    """Adapters that cannot stream decode the whole page instead."""
+    body = json.dumps(
+        {"bookings": {"offset": 0, "limit": 100, "total": 1, "data": [{"a": 1}]}}
+    ).encode()
+    page = VendorAdapter.stream_page(LighthouseAdapter(), body, "Caddo")
+    assert (page.offset, page.limit, page.total) == (0, 100, 1)
+    assert list(page.rows) == [{"a": 1}]
+
+
+def test_lighthouse_query_formdata() -> None:
+    """The first page omits the offset, as the sites expect."""
+    adapter = LighthouseAdapter()
+    assert adapter.query_formdata("Creek", 0, 100) == {"limit": 100}
+    assert adapter.query_formdata("Creek", 100, 100) == {"offset": 100, "limit": 100}
+
+
+def test_field_aliases() -> None:
+    """Vendor field names are mapped onto BookingItem fields."""
+    booking = {
+        "InmateNumber": "1",
+        "InmateID": "2",
+        "BookingDate": "2025-01-22T02:44:00",
+        "FName": "TESTFIRST",
+        "Surname": "TESTLAST",
+        "Sex": "M",
+        "Race": "W",
+        "Charges": "TEST CHARGE",
+        "dob": "01/01/1976",
+    }
+    item = build_booking_item(RenamingAdapter().normalize(booking), "Creek")
+    assert item.booking_id == "1"
+    assert item.last_name == "TESTLAST"